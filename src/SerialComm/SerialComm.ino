@@ -1,3 +1,5 @@
+#include <util/crc16.h>
+
 //variables for back sensor
 boolean sendDistanceBack = false;
 const int inputPinBack = A0; // define ultrasonic receive pin (Echo)
@@ -12,6 +14,32 @@ const int outputPinFront = A3; // define ultrasonic send pin(Trig)
 boolean sendPhotocell = false;
 const int inputPinPhotocell = A4;
 
+//the pi asks for the ready banner if it didn't get it after the reset
+boolean sendReady = false;
+
+//variables for reading several sensors with one command, like "read front,back,photocell"
+boolean sendReadings = false;
+String requestedSensors = "";
+
+//variables for the binary protocol, where the readings are sent in frames of
+//[sync byte][message type][6 byte payload][crc-16 of the type and payload], see binaryProtocol.py
+const byte syncByte = 0xA5;
+const int frameSize = 10;
+const byte readRequestType = 0x01; //payload is a byte with a bit for each sensor to read
+const byte readingsType = 0x02; //payload is front and back distance in 1/100 cm, and the photocell value
+const unsigned int missingReading = 0xFFFF; //a sensor that wasn't read, or a distance sensor without an echo
+const byte frontSensorBit = 0x01;
+const byte backSensorBit = 0x02;
+const byte photocellBit = 0x04;
+
+boolean binaryProtocol = false; //the pi switches to frames with the command "binary", and back to text with "ping"
+boolean sendBinaryAnswer = false;
+boolean sendReadingsFrame = false;
+byte requestedSensorBits = 0;
+byte frameBuffer[frameSize];
+int frameLength = 0;
+String binaryModeTextCommand = "";
+
 const long baudrate = 115200; // the highest speed a pi can communicate with an arduino
 
 void setup() {
@@ -26,11 +54,18 @@ void setup() {
 
   //start serial communication
   Serial.begin(baudrate);
+
+  //tell the pi that commands can be sent, instead of it waiting a fixed time after the reset
+  write_ready_to_serial();
 }
 
 void loop() {
   //listen for incoming commands from pi
-  listen_for_commands();
+  if (binaryProtocol) {
+    listen_for_frames();
+  } else {
+    listen_for_commands();
+  }
 
   // write sensor values to pi
   if (sendDistanceBack) {
@@ -39,12 +74,24 @@ void loop() {
     write_distance_to_serial(inputPinFront, outputPinFront);
   } else if (sendPhotocell) {
     write_photocell_value_to_serial(inputPinPhotocell);
+  } else if (sendReady) {
+    write_ready_to_serial();
+  } else if (sendReadings) {
+    write_readings_to_serial(requestedSensors);
+  } else if (sendBinaryAnswer) {
+    Serial.println("binary");
+  } else if (sendReadingsFrame) {
+    write_readings_frame_to_serial(requestedSensorBits);
   }
 
   //reset boolean values
   sendDistanceBack = false;
   sendDistanceFront = false;
   sendPhotocell = false;
+  sendReady = false;
+  sendReadings = false;
+  sendBinaryAnswer = false;
+  sendReadingsFrame = false;
 }
 
 void listen_for_commands() {
@@ -56,11 +103,61 @@ void listen_for_commands() {
       sendDistanceFront = true;
     } else if (command == "photocell"){
       sendPhotocell = true;
+    } else if (command == "ping"){
+      sendReady = true;
+    } else if (command.startsWith("read ")){
+      requestedSensors = command.substring(5);
+      sendReadings = true;
+    } else if (command == "binary"){
+      binaryProtocol = true;
+      sendBinaryAnswer = true;
     }
   }
 }
 
 void write_distance_to_serial(int inputPin, int outputPin) {
+  float distance = read_distance(inputPin, outputPin);
+
+  Serial.println(String(distance)); //sending data
+}
+
+void write_photocell_value_to_serial(int inputPin) {
+  int photocellValue = analogRead(inputPinPhotocell);
+
+  Serial.println(String(photocellValue));
+}
+
+void write_readings_to_serial(String sensors) {
+  //one line with a reading for each requested sensor, in the order they were asked for, separated by commas.
+  //An unknown sensor gets an empty reading
+  String readings = "";
+  int sensorStart = 0;
+  while (sensorStart <= sensors.length()) {
+    int sensorEnd = sensors.indexOf(',', sensorStart);
+    if (sensorEnd == -1) {
+      sensorEnd = sensors.length();
+    }
+
+    String sensor = sensors.substring(sensorStart, sensorEnd);
+    if (sensorStart > 0) {
+      readings += ",";
+    }
+
+    if (sensor == "front") {
+      readings += String(read_distance(inputPinFront, outputPinFront));
+    } else if (sensor == "back") {
+      readings += String(read_distance(inputPinBack, outputPinBack));
+    } else if (sensor == "photocell") {
+      readings += String(analogRead(inputPinPhotocell));
+    }
+
+    sensorStart = sensorEnd + 1;
+  }
+
+  Serial.println(readings);
+}
+
+float read_distance(int inputPin, int outputPin) {
   digitalWrite(outputPin, LOW); //send no signal
   delayMicroseconds(2); // wait 2 microseconds
   digitalWrite(outputPin, HIGH); //send signal for 10 microseconds
@@ -69,11 +166,113 @@ void write_distance_to_serial(int inputPin, int outputPin) {
   float distance = pulseIn(inputPin, HIGH); //get distance by listening for signal
   distance= distance/5.8/10;
 
-  Serial.println(String(distance)); //sending data
+  return distance;
 }
 
-void write_photocell_value_to_serial(int inputPin) {
-  int photocellValue = analogRead(inputPinPhotocell);
+void write_ready_to_serial() {
+  Serial.println("ready");
+}
 
-  Serial.println(String(photocellValue));
+void listen_for_frames() {
+  while (Serial.available()) {
+    byte nextByte = Serial.read();
+
+    //bytes outside a frame are text commands, so the pi can always switch back to text
+    if (frameLength == 0 && nextByte != syncByte) {
+      handle_text_in_binary_mode(nextByte);
+      continue;
+    }
+
+    frameBuffer[frameLength] = nextByte;
+    frameLength++;
+    if (frameLength < frameSize) {
+      continue;
+    }
+
+    //the crc of the type and payload followed by their crc is 0
+    if (crc16(frameBuffer + 1, frameSize - 1) == 0) {
+      frameLength = 0;
+      if (frameBuffer[1] == readRequestType) {
+        requestedSensorBits = frameBuffer[2];
+        sendReadingsFrame = true;
+        return;
+      }
+      continue;
+    }
+
+    //not a frame, so look for the next sync byte in the bytes that were read
+    int nextSync = 1;
+    while (nextSync < frameSize && frameBuffer[nextSync] != syncByte) {
+      nextSync++;
+    }
+    frameLength = frameSize - nextSync;
+    memmove(frameBuffer, frameBuffer + nextSync, frameLength);
+  }
+}
+
+void handle_text_in_binary_mode(byte nextByte) {
+  if (nextByte != '\n') {
+    binaryModeTextCommand += (char) nextByte;
+    return;
+  }
+
+  if (binaryModeTextCommand == "ping") {
+    binaryProtocol = false;
+    sendReady = true;
+  } else if (binaryModeTextCommand == "binary") {
+    sendBinaryAnswer = true;
+  }
+  binaryModeTextCommand = "";
+}
+
+void write_readings_frame_to_serial(byte sensorBits) {
+  unsigned int front = missingReading;
+  unsigned int back = missingReading;
+  unsigned int photocell = missingReading;
+
+  if (sensorBits & frontSensorBit) {
+    front = distance_to_frame_value(read_distance(inputPinFront, outputPinFront));
+  }
+  if (sensorBits & backSensorBit) {
+    back = distance_to_frame_value(read_distance(inputPinBack, outputPinBack));
+  }
+  if (sensorBits & photocellBit) {
+    photocell = analogRead(inputPinPhotocell);
+  }
+
+  //the values are sent with the low byte first
+  byte frame[frameSize] = {
+    syncByte, readingsType,
+    lowByte(front), highByte(front),
+    lowByte(back), highByte(back),
+    lowByte(photocell), highByte(photocell),
+    0, 0
+  };
+
+  //the crc is sent with the high byte first
+  unsigned int crc = crc16(frame + 1, frameSize - 3);
+  frame[frameSize - 2] = highByte(crc);
+  frame[frameSize - 1] = lowByte(crc);
+
+  Serial.write(frame, frameSize);
+}
+
+unsigned int distance_to_frame_value(float distance) {
+  //pulseIn gives 0 when no echo came back before its timeout, which isn't an obstacle at 0 cm
+  if (distance <= 0) {
+    return missingReading;
+  }
+
+  //1/100 cm, where the largest value means that there is no reading
+  return (unsigned int) min(distance * 100, (float) (missingReading - 1));
+}
+
+unsigned int crc16(const byte *data, int length) {
+  //the xmodem crc, which binaryProtocol.py computes with crc_hqx
+  unsigned int crc = 0;
+  for (int i = 0; i < length; i++) {
+    crc = _crc_xmodem_update(crc, data[i]);
+  }
+
+  return crc;
 }
@@ -1,17 +1,23 @@
 from os import path
 from serial import Serial
-from time import sleep, time
+from time import time, monotonic
 from honker import Honker
 from photocellManager import PhotocellManager
 import RPi.GPIO as GPIO
+from roboCarHelper import StartupError
+from binaryProtocol import BinaryProtocol
 
 class ArduinoCommunicator:
-    def __init__(self, port, baudrate, waitTime = 0.1):
+    def __init__(self, port, baudrate, waitTime = 0.1, readTimeout = 1.0, readyTimeout = 5.0):
         if not self._port_exists(port):
             raise InvalidPortError(f"Port {port} not found. Check connection.")
 
-        self._serialObj = Serial(port, baudrate)
-        sleep(3)  # give the serial object some time to start communication
+        self._encodingType = 'utf-8'
+
+        # readline blocks until the arduino has answered, or the timeout has passed
+        self._serialObj = Serial(port, baudrate, timeout=readTimeout)
+        self._readTimeout = readTimeout
+        self._wait_until_arduino_is_ready(readyTimeout)
 
         self._waitTime = waitTime
 
@@ -20,16 +26,30 @@ class ArduinoCommunicator:
         self._honker = None
         self._frontSensorReading = None
         self._backSensorReading = None
+        self._obstacleDetector = None
 
         self._photocellLightsActive = False
         self._photocellLightsManager = None
         self._photocellReading = None
 
-        self._encodingType = 'utf-8'
+        # all activated sensors are read with one command, instead of one command each
+        self._batchedReadings = False
+
+        # the readings are sent in binary frames if the arduino agrees to it when it is set up,
+        # the text commands are used otherwise
+        self._binaryProtocolRequested = False
+        self._binaryProtocol = None
 
         self._lastReadTime = None
 
     def setup(self):
+        # the port is opened before the worker starts and stays open if the worker is restarted, so
+        # the arduino isn't reset again. Answers a crashed worker never read are thrown away
+        self._serialObj.reset_input_buffer()
+
+        if self._binaryProtocolRequested:
+            self._binaryProtocol = self._negotiate_binary_protocol()
+
         GPIO.setmode(GPIO.BOARD)
 
         if self._photocellLightsActive:
@@ -44,23 +64,30 @@ class ArduinoCommunicator:
 
         self._honker = Honker(buzzerPin)
 
+    def add_obstacle_detector(self, obstacleDetector):
+        self._obstacleDetector = obstacleDetector
+
     def activate_photocell_lights(self, lightPins):
         self._photocellLightsActive = True
         self._photocellLightsManager = PhotocellManager(lightPins)
 
+    def set_batched_readings_enabled(self):
+        self._batchedReadings = True
+
+    def set_binary_protocol_enabled(self):
+        self._binaryProtocolRequested = True
+
     def start(self):
         # if it's been more than the specified wait time since last reading, then
         # do a new reading
         if not self._lastReadTime or (time() - self._lastReadTime) > self._waitTime:
 
-            if self._frontSensorActive:
-                self._frontSensorReading = self._send_command_and_read_response("front")
-
-            if self._backSensorActive:
-                self._backSensorReading = self._send_command_and_read_response("back")
-
-            if self._photocellLightsActive:
-                self._photocellReading = self._send_command_and_read_response("photocell")
+            if self._binaryProtocol:
+                self._read_active_sensors_in_frame()
+            elif self._batchedReadings:
+                self._read_active_sensors()
+            else:
+                self._read_active_sensors_one_by_one()
 
             # run objects that only need to be updated per reading
             self._run_arduino_connected_objects_per_reading()
@@ -70,6 +97,20 @@ class ArduinoCommunicator:
         # run objects that need to be updated continuously
         self._run_arduino_connected_objects_continuously()
 
+    def get_time_until_next_update(self):
+        if not self._lastReadTime:
+            return 0.0
+
+        timeUntilUpdate = max(self._lastReadTime + self._waitTime - time(), 0.0)
+
+        # the buzzer has to be switched on and off between the readings
+        if self._frontSensorActive or self._backSensorActive:
+            timeUntilHonkChange = self._honker.get_time_until_next_honk_change()
+            if timeUntilHonkChange is not None:
+                timeUntilUpdate = min(timeUntilUpdate, timeUntilHonkChange)
+
+        return timeUntilUpdate
+
     def cleanup(self):
         self._serialObj.close()
 
@@ -77,6 +118,83 @@ class ArduinoCommunicator:
             self._photocellLightsManager.cleanup()
         GPIO.cleanup()
 
+    def _read_active_sensors_one_by_one(self):
+        if self._frontSensorActive:
+            self._frontSensorReading = self._send_command_and_read_response("front")
+
+        if self._backSensorActive:
+            self._backSensorReading = self._send_command_and_read_response("back")
+
+        if self._photocellLightsActive:
+            self._photocellReading = self._send_command_and_read_response("photocell")
+
+    def _read_active_sensors(self):
+        # one round trip to the arduino for all sensors, which answers with their readings in the same order
+        sensors = self._get_active_sensors()
+        if not sensors:
+            return
+
+        readings = self._send_command_and_read_responses("read " + ",".join(sensors), len(sensors))
+        readings = dict(zip(sensors, readings))
+
+        self._frontSensorReading = readings.get("front")
+        self._backSensorReading = readings.get("back")
+        self._photocellReading = readings.get("photocell")
+
+    def _read_active_sensors_in_frame(self):
+        sensors = self._get_active_sensors()
+        if not sensors:
+            return
+
+        # bytes left over from an earlier reply mean that the replies are out of step with the requests,
+        # so they're thrown away with everything else that has come, like a partial text line
+        if self._binaryProtocol.get_buffered_bytes():
+            self._binaryProtocol.reset()
+            self._serialObj.reset_input_buffer()
+
+        self._serialObj.write(self._binaryProtocol.encode_read_request(sensors))
+
+        # noise before the reply shifts the frame, so the rest of it is read until the readings frame
+        # has come. read returns fewer bytes when the timeout passes, and there is a deadline for when
+        # noise keeps coming
+        readings = (None, None, None)
+        readingsReceived = False
+        deadline = monotonic() + self._readTimeout
+        while not readingsReceived and monotonic() < deadline:
+            bytesToRead = BinaryProtocol.frameSize - self._binaryProtocol.get_buffered_bytes()
+            data = self._serialObj.read(bytesToRead)
+
+            for messageType, payload in self._binaryProtocol.decode_frames(data):
+                if messageType == BinaryProtocol.readingsType:
+                    readings = self._binaryProtocol.decode_readings(payload)
+                    readingsReceived = True
+
+            if len(data) < bytesToRead:
+                break
+
+        self._frontSensorReading, self._backSensorReading, self._photocellReading = readings
+
+    def _get_active_sensors(self):
+        sensors = []
+        if self._frontSensorActive:
+            sensors.append("front")
+        if self._backSensorActive:
+            sensors.append("back")
+        if self._photocellLightsActive:
+            sensors.append("photocell")
+
+        return sensors
+
+    def _negotiate_binary_protocol(self):
+        # the arduino answers in text before it switches to frames. If the answer doesn't come,
+        # the text commands are kept
+        self._serialObj.write(self._make_commands_arduino_readable("binary"))
+        if self._serialObj.readline().strip() == b"binary":
+            return BinaryProtocol()
+
+        print("Arduino doesn't support the binary protocol, using text commands")
+        return None
+
     def _run_arduino_connected_objects_continuously(self):
         if self._frontSensorActive or self._backSensorActive:
             self._honker.alert_if_too_close()
@@ -86,40 +204,87 @@ class ArduinoCommunicator:
         if self._frontSensorActive or self._backSensorActive:
             self._honker.prepare_for_honking(
                 [self._frontSensorReading,
-                 self._backSensorReading]
+                 self._backSensorReading],
+                self._get_obstacle_score()
             )
 
-        if self._photocellLightsActive:
+        if self._photocellLightsActive and self._photocellReading is not None:
             self._photocellLightsManager.adjust_lights(self._photocellReading)
 
+    def _get_obstacle_score(self):
+        if not self._obstacleDetector:
+            return None
+
+        # the score is written by the detector's own process, and is None when it is outdated
+        return self._obstacleDetector.get_obstacle_score()
+
+    def _wait_until_arduino_is_ready(self, readyTimeout):
+        # opening the port resets the arduino, which sends a banner when its setup is done. An arduino
+        # that wasn't reset has sent its banner already, so it is asked again whenever nothing comes
+        deadline = monotonic() + readyTimeout
+        while monotonic() < deadline:
+            response = self._serialObj.readline()
+            if response.strip() == b"ready":
+                return
+
+            if not response:
+                self._serialObj.write(self._make_commands_arduino_readable("ping"))
+
+        self._serialObj.close()
+        raise ArduinoNotReadyError(f"Arduino didn't answer within {readyTimeout} s. Check that SerialComm.ino is uploaded.")
+
     def _send_command_and_read_response(self, command):
         # send command to arduino
         self._serialObj.write(self._make_commands_arduino_readable(command))
 
         # wait for arduino response
-        self._wait_for_arduino_input()
+        response = self._read_response_line()
+
+        # an empty response means that the arduino didn't answer before the timeout
+        if not response:
+            return None
 
-        # print out arduino response
-        reading = float(self._make_arduino_response_readable(self._serialObj.readline()))
+        reading = float(response)
 
         return reading
 
+    def _send_command_and_read_responses(self, command, numberOfReadings):
+        self._serialObj.write(self._make_commands_arduino_readable(command))
+
+        response = self._read_response_line()
+
+        return self._parse_readings(response, numberOfReadings)
+
+    def _read_response_line(self):
+        # readline returns what it has got when the timeout passes, which can be the start of a line.
+        # The rest of it would be read as the answer to the next command, so it's thrown away with
+        # everything else that has come, and the reading is skipped
+        response = self._serialObj.readline()
+        if not response.endswith(b"\n"):
+            self._serialObj.reset_input_buffer()
+            return ""
+
+        return self._make_arduino_response_readable(response)
+
+    def _parse_readings(self, response, numberOfReadings):
+        # a reply without a reading for every sensor can't be matched to the sensors, so none are used
+        values = response.split(",")
+        if not response or len(values) != numberOfReadings:
+            return [None] * numberOfReadings
+
+        return [float(value) if value else None for value in values]
+
     def _make_commands_arduino_readable(self, command):
         return (command + "\n").encode(self._encodingType)
 
     def _make_arduino_response_readable(self, response):
         return response.decode(self._encodingType).rstrip()
 
-    def _wait_for_arduino_input(self):
-        while self._serialObj.in_waiting <= 0:
-            sleep(0.01)
-
     def _port_exists(self, portPath):
         return path.exists(portPath)
 
-class InvalidPortError(Exception):
+class InvalidPortError(StartupError):
     pass
 
-
-
-
+class ArduinoNotReadyError(StartupError):
+    pass
@@ -0,0 +1,166 @@
+import os
+import struct
+import tty
+import numpy as np
+from argparse import ArgumentParser
+from threading import Thread
+from time import perf_counter, process_time, sleep
+from benchmarkInputLatency import ActuatorRecorder, install_fake_backends
+from binaryProtocol import BinaryProtocol
+
+# measures how long the arduino loop takes to read the front and back distance sensors and the photocell,
+# with a text command for each sensor, with one text command for all of them and with binary frames, and
+# how many bytes that sends. The arduino is emulated on a pseudo terminal, and takes as long as a real one
+# to send and receive the bytes at the baud rate and to measure the sensors. Every round trip also waits
+# for the USB link and the arduino loop, which is the round trip latency
+
+def emulate_arduino(masterFd, baudrate, distance, roundTripLatency, byteCounts):
+    # an ultrasonic sensor waits for the echo, which takes 58 us for each cm to the obstacle and back
+    sensorTimes = {"front": distance * 58e-6, "back": distance * 58e-6, "photocell": 1e-4}
+    sensorReadings = {"front": f"{distance:.2f}", "back": f"{distance:.2f}", "photocell": "512"}
+    byteTime = 10 / baudrate # a start bit, 8 data bits and a stop bit
+
+    # the port isn't opened yet, so the banner is thrown away when it is, and the communicator asks for it again
+    os.write(masterFd, b"ready\r\n")
+
+    binaryProtocol = None
+    receivedBytes = bytearray()
+    while True:
+        try:
+            data = os.read(masterFd, 1024)
+        except OSError:
+            return
+        if not data:
+            return
+
+        receivedBytes += data
+        requests = []
+        if binaryProtocol:
+            for messageType, payload in binaryProtocol.decode_frames(bytes(receivedBytes)):
+                sensors = [sensor for sensor, sensorBit in BinaryProtocol.sensorBits.items() if payload[0] & sensorBit]
+                requests.append((BinaryProtocol.frameSize, sensors, None))
+            receivedBytes.clear()
+        else:
+            while b"\n" in receivedBytes:
+                lineEnd = receivedBytes.index(b"\n") + 1
+                command = receivedBytes[:lineEnd].decode("utf-8").strip()
+                del receivedBytes[:lineEnd]
+
+                if command.startswith("read "):
+                    requests.append((lineEnd, command[len("read "):].split(","), None))
+                elif command in ("ping", "binary"):
+                    requests.append((lineEnd, [], command))
+                else:
+                    requests.append((lineEnd, [command], None))
+
+        for requestSize, sensors, textCommand in requests:
+            if textCommand == "ping":
+                reply = b"ready\r\n"
+            elif textCommand == "binary":
+                reply = b"binary\r\n"
+                binaryProtocol = BinaryProtocol()
+            elif binaryProtocol:
+                values = [int(float(sensorReadings[sensor]) * 100) if sensor in sensors else BinaryProtocol.missingReading
+                          for sensor in ("front", "back")]
+                values.append(int(sensorReadings["photocell"]) if "photocell" in sensors else BinaryProtocol.missingReading)
+                reply = binaryProtocol.encode_frame(BinaryProtocol.readingsType, struct.pack("<HHH", *values))
+            else:
+                reply = (",".join(sensorReadings.get(sensor, "") for sensor in sensors) + "\r\n").encode("utf-8")
+
+            sensorTime = sum(sensorTimes.get(sensor, 0.0) for sensor in sensors)
+            sleep(roundTripLatency + (requestSize + len(reply)) * byteTime + sensorTime)
+            os.write(masterFd, reply)
+
+            byteCounts["received"] += requestSize
+            byteCounts["sent"] += len(reply)
+
+
+def measure_reading_cycles(port, protocol, cycles, byteCounts):
+    from arduinoCommunicator import ArduinoCommunicator
+
+    arduinoCommunicator = ArduinoCommunicator(port, 115200, waitTime=0.0)
+    arduinoCommunicator.activate_distance_sensors(29)
+    arduinoCommunicator.activate_photocell_lights([36, 31])
+    if protocol == "one":
+        arduinoCommunicator.set_batched_readings_enabled()
+    elif protocol == "binary":
+        arduinoCommunicator.set_binary_protocol_enabled()
+    arduinoCommunicator.setup()
+
+    # only the bytes of the readings are counted
+    byteCounts.update({"received": 0, "sent": 0})
+
+    cycleTimes = []
+    for cycle in range(cycles):
+        startTime = perf_counter()
+        arduinoCommunicator.start()
+        cycleTimes.append(perf_counter() - startTime)
+
+    arduinoCommunicator.cleanup()
+
+    return np.array(cycleTimes) * 1000, (byteCounts["received"] + byteCounts["sent"]) / cycles
+
+
+def measure_parsing(repeats):
+    # the CPU time to turn a reply of all three sensors into readings, on the pi
+    from arduinoCommunicator import ArduinoCommunicator
+
+    arduinoCommunicator = ArduinoCommunicator.__new__(ArduinoCommunicator)
+    arduinoCommunicator._encodingType = "utf-8"
+    textReply = b"100.00,100.00,512\r\n"
+
+    startTime = process_time()
+    for repeat in range(repeats):
+        arduinoCommunicator._parse_readings(arduinoCommunicator._make_arduino_response_readable(textReply), 3)
+    textTime = (process_time() - startTime) / repeats
+
+    binaryProtocol = BinaryProtocol()
+    binaryReply = binaryProtocol.encode_frame(BinaryProtocol.readingsType, struct.pack("<HHH", 10000, 10000, 512))
+
+    startTime = process_time()
+    for repeat in range(repeats):
+        for messageType, payload in binaryProtocol.decode_frames(binaryReply):
+            binaryProtocol.decode_readings(payload)
+    binaryTime = (process_time() - startTime) / repeats
+
+    return textTime * 1e6, binaryTime * 1e6
+
+
+def main():
+    parser = ArgumentParser(description="Compare reading the arduino sensors with a text command each, "
+                                        "one text command for all and binary frames")
+    parser.add_argument("--cycles", type=int, default=300)
+    parser.add_argument("--baudrate", type=int, default=115200)
+    parser.add_argument("--distance", type=float, default=100, help="cm from the distance sensors to the obstacles")
+    parser.add_argument("--latency", type=float, default=2.0,
+                        help="ms each round trip waits for the USB link and the arduino loop, on top of the bytes")
+    parser.add_argument("--parse-repeats", type=int, default=100000)
+    args = parser.parse_args()
+
+    install_fake_backends(ActuatorRecorder())
+
+    print(f"{args.cycles} reading cycles of front, back and photocell, {args.baudrate} baud, "
+          f"{args.latency:.1f} ms round trip latency, obstacles at {args.distance:.0f} cm")
+    print(f"{'Commands':<10} {'mean ms':>8} {'p50 ms':>7} {'p99 ms':>7} {'reads/s':>8} {'bytes':>6}")
+
+    for protocol in ["each", "one", "binary"]:
+        # raw, so the banner isn't echoed back or changed before the port is opened
+        masterFd, slaveFd = os.openpty()
+        tty.setraw(slaveFd)
+
+        byteCounts = {"received": 0, "sent": 0}
+        Thread(target=emulate_arduino, args=(masterFd, args.baudrate, args.distance, args.latency / 1000, byteCounts),
+               daemon=True).start()
+
+        cycleTimes, bytesPerCycle = measure_reading_cycles(os.ttyname(slaveFd), protocol, args.cycles, byteCounts)
+        p50, p99 = np.percentile(cycleTimes, [50, 99])
+
+        print(f"{protocol:<10} {cycleTimes.mean():>8.2f} {p50:>7.2f} {p99:>7.2f} {1000 / cycleTimes.mean():>8.0f} "
+              f"{bytesPerCycle:>6.0f}")
+
+    textTime, binaryTime = measure_parsing(args.parse_repeats)
+    print()
+    print(f"Parsing a reply of all three sensors: text {textTime:.2f} us, binary {binaryTime:.2f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import numpy as np
+from argparse import ArgumentParser
+from time import perf_counter
+from camera import Camera
+from stateBus import StateBus
+from frameSources import SyntheticSource, VideoFileSource
+
+# pushes frames through Camera.show_camera_feed without a camera or a display, so the
+# zoom and HUD part of the pipeline can be profiled on any linux machine
+
+def parse_resolution(text):
+    width, height = text.split("x")
+    return int(width), int(height)
+
+def create_camera(resolution, videoFile, threadedCapture):
+    camera = Camera(resolution)
+    camera.add_frame_source(VideoFileSource(videoFile) if videoFile else SyntheticSource())
+    camera.set_display_disabled()
+    camera.set_car_enabled()
+    camera.set_servo_enabled()
+
+    if threadedCapture:
+        camera.set_threaded_capture_enabled()
+
+    return camera
+
+def run_frames(camera, stateBus, stateSubscriber, numberOfFrames, zoomValue, hudActive):
+    stateBus.publish({"HUD": float(hudActive), "Zoom": zoomValue})
+
+    # let caches and buffers settle before measuring
+    for _ in range(10):
+        camera.show_camera_feed(stateSubscriber)
+
+    frameTimes = np.empty(numberOfFrames)
+    startTime = perf_counter()
+    for frameNumber in range(numberOfFrames):
+        frameStartTime = perf_counter()
+        camera.show_camera_feed(stateSubscriber)
+        frameTimes[frameNumber] = perf_counter() - frameStartTime
+
+    return numberOfFrames / (perf_counter() - startTime), frameTimes
+
+def main():
+    parser = ArgumentParser(description="Benchmark the camera pipeline with a synthetic or recorded frame source")
+    parser.add_argument("--resolutions", nargs="+", type=parse_resolution,
+                        default=[(320, 240), (384, 288), (640, 480), (1280, 720)])
+    parser.add_argument("--zoom", nargs="+", type=float, default=[1.0, 1.5, 2.0, 2.5, 3.0])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--video", default="", help="use frames from a video file instead of a synthetic pattern")
+    parser.add_argument("--no-hud", action="store_true")
+    parser.add_argument("--threaded", action="store_true", help="capture frames in a separate thread")
+    args = parser.parse_args()
+
+    print(f"{'Resolution':>11} {'Zoom':>5} {'FPS':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for resolution in args.resolutions:
+        camera = create_camera(resolution, args.video, args.threaded)
+        camera.setup()
+        stateBus = StateBus({"speed": 40.0, "turn": 1.0, "servo": 15.0, "HUD": 0.0, "Zoom": 1.0})
+        stateSubscriber = stateBus.subscribe()
+
+        for zoomValue in args.zoom:
+            fps, frameTimes = run_frames(camera, stateBus, stateSubscriber, args.frames, zoomValue, not args.no_hud)
+            p50, p90, p99 = np.percentile(frameTimes, [50, 90, 99]) * 1000
+
+            print(f"{resolution[0]:>5}x{resolution[1]:<5} {zoomValue:>5.1f} {fps:>9.1f} "
+                  f"{p50:>8.2f} {p90:>8.2f} {p99:>8.2f} {frameTimes.max() * 1000:>8.2f}")
+
+        camera.cleanup()
+
+if __name__ == "__main__":
+    main()
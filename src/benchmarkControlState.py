@@ -0,0 +1,88 @@
+import numpy as np
+from argparse import ArgumentParser
+from multiprocessing import Array, Process, Value
+from time import perf_counter, sleep
+from controlState import ControlState
+
+# floods the shared control values with controller events from one process while another
+# process reads them like the camera does, and compares the old locked Array with ControlState
+
+fields = ["speed", "turn", "servo", "HUD", "Zoom"]
+
+class LockedArrayState:
+    # the way the control values were shared before, one locked access per value
+    def __init__(self):
+        self._array = Array('d', len(fields))
+        self._arrayDict = {field: index for index, field in enumerate(fields)}
+
+    def write(self, values):
+        for field, value in values.items():
+            self._array[self._arrayDict[field]] = value
+
+    def read(self):
+        return 0, {field: self._array[index] for field, index in self._arrayDict.items()}
+
+
+def flood_with_events(state, eventRate, running, eventCount):
+    # every event sets all values to the same number, so readers can tell if they got a mix
+    waitTime = 1 / eventRate if eventRate else 0
+    event = 0
+    while running.value:
+        event += 1
+        state.write({field: float(event) for field in fields})
+        if waitTime:
+            sleep(waitTime)
+
+    eventCount.value = event
+
+
+def read_while_flooding(state, duration, eventRate, readRate):
+    running = Value('b', True, lock=False)
+    eventCount = Value('Q', 0, lock=False)
+    writer = Process(target=flood_with_events, args=(state, eventRate, running, eventCount))
+    writer.start()
+
+    readTimes = []
+    tornReads = 0
+    waitTime = 1 / readRate if readRate else 0
+    endTime = perf_counter() + duration
+    while perf_counter() < endTime:
+        startTime = perf_counter()
+        version, values = state.read()
+        readTimes.append(perf_counter() - startTime)
+
+        if len(set(values.values())) > 1:
+            tornReads += 1
+
+        if waitTime:
+            sleep(waitTime)
+
+    running.value = False
+    writer.join()
+
+    return np.array(readTimes), tornReads, eventCount.value / duration
+
+
+def main():
+    parser = ArgumentParser(description="Compare the locked Array with ControlState under a flood of controller events")
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--event-rate", type=float, default=0, help="controller events per second, 0 is as fast as possible")
+    parser.add_argument("--read-rate", type=float, default=0, help="camera reads per second, 0 is as fast as possible")
+    args = parser.parse_args()
+
+    initialValues = {field: 0.0 for field in fields}
+    states = {
+        "locked Array": LockedArrayState(),
+        "ControlState": ControlState(initialValues)
+    }
+
+    print(f"{'State':<14} {'events/s':>10} {'reads/s':>10} {'p50 us':>8} {'p99 us':>8} {'max us':>9} {'torn':>8}")
+    for name, state in states.items():
+        readTimes, tornReads, eventRate = read_while_flooding(state, args.duration, args.event_rate, args.read_rate)
+        p50, p99 = np.percentile(readTimes, [50, 99]) * 1e6
+
+        print(f"{name:<14} {eventRate:>10.0f} {len(readTimes) / args.duration:>10.0f} {p50:>8.1f} "
+              f"{p99:>8.1f} {readTimes.max() * 1e6:>9.1f} {tornReads:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import numpy as np
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from functools import partial
+from time import perf_counter_ns
+from benchmarkInputLatency import ActuatorRecorder, install_fake_backends, install_fake_joystick, \
+    create_car_control, create_pygame_event, eventTypes
+
+# measures the cost of dispatching one controller event, from the pygame event to the handler
+# of the component, through the button names and through the compiled dispatch table
+
+def create_object_dict(carControl):
+    # the way events were dispatched before, with a button name for every event
+    buttonToObjectDict = {}
+    for roboObject in [carControl._car] + carControl._servos + [carControl._cameraHelper]:
+        for button in roboObject.get_button_handlers():
+            buttonToObjectDict[button] = roboObject
+
+    return buttonToObjectDict
+
+
+def dispatch_by_name(xboxControl, buttonToObjectDict, event):
+    button, pressValue = xboxControl.get_button_and_press_value_from_event(event)
+    if xboxControl.check_for_exit_event(button):
+        return
+
+    try:
+        buttonToObjectDict[button].handle_xbox_input(button, pressValue)
+    except KeyError:
+        pass
+
+
+def dispatch_by_table(xboxControl, event):
+    if xboxControl.dispatch_event(event):
+        xboxControl.is_exit_requested()
+
+
+def time_dispatch(dispatchers, events, repeats):
+    # each round is timed as a whole, so the timer itself doesn't dominate the result, and
+    # the dispatchers take turns so they are measured under the same conditions
+    roundTimes = np.empty((len(dispatchers), repeats))
+    for repeat in range(repeats):
+        for dispatcherNumber, dispatch in enumerate(dispatchers):
+            startTime = perf_counter_ns()
+            for event in events:
+                dispatch(event)
+            roundTimes[dispatcherNumber, repeat] = (perf_counter_ns() - startTime) / len(events)
+
+    # the fastest round is the one least disturbed by other processes
+    return roundTimes.min(axis=1)
+
+
+def main():
+    parser = ArgumentParser(description="Compare the per event cost of dispatching by button name and by dispatch table")
+    parser.add_argument("--events", type=int, default=200, help="events of each type in one round")
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    import pygame
+
+    recorder = ActuatorRecorder()
+    install_fake_backends(recorder)
+    install_fake_joystick(pygame)
+
+    with redirect_stdout(open(os.devnull, "w")):
+        carControl = create_car_control(recorder)
+        carControl._car.setup()
+        carControl._compile_dispatch_table()
+
+    xboxControl = carControl._xboxControl
+    buttonToObjectDict = create_object_dict(carControl)
+
+    print(f"{'Event':<15} {'names ns':>9} {'table ns':>9} {'speedup':>8}")
+    for eventName in eventTypes:
+        events = [create_pygame_event(pygame, eventName, eventNumber) for eventNumber in range(args.events)]
+
+        dispatchers = [partial(dispatch_by_name, xboxControl, buttonToObjectDict), partial(dispatch_by_table, xboxControl)]
+        nameTime, tableTime = time_dispatch(dispatchers, events, args.repeats)
+
+        print(f"{eventName:<15} {nameTime:>9.0f} {tableTime:>9.0f} {nameTime / tableTime:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import os
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # pygame needs a video driver for its event queue
+from argparse import ArgumentParser
+from multiprocessing import Process, Event, Value, RawArray
+from threading import Thread
+from time import sleep, monotonic, process_time
+
+# runs the old polling loops and the new event driven loops while the car is idle, and
+# measures the CPU time they use and how long it takes them to notice that the program exits
+
+def start_measuring(measurements):
+    measurements[0] = process_time()
+    measurements[1] = monotonic()
+
+def stop_measuring(measurements):
+    # cpu time and wall time spent in the loop, and the time the loop ended
+    measurements[2] = monotonic()
+    measurements[0] = process_time() - measurements[0]
+    measurements[1] = measurements[2] - measurements[1]
+
+def xbox_loop_polling(exitFlag, measurements):
+    import pygame
+    pygame.init()
+
+    start_measuring(measurements)
+    while not exitFlag.value:
+        for event in pygame.event.get():
+            pass
+
+    stop_measuring(measurements)
+
+
+def xbox_loop_waiting(exitEvent, measurements):
+    import pygame
+    pygame.init()
+
+    def wake_up_on_exit():
+        exitEvent.wait()
+        pygame.event.post(pygame.event.Event(pygame.USEREVENT))
+
+    Thread(target=wake_up_on_exit, daemon=True).start()
+
+    start_measuring(measurements)
+    while not exitEvent.is_set():
+        event = pygame.event.wait(1000)
+        if event.type != pygame.NOEVENT:
+            pygame.event.get()
+
+    stop_measuring(measurements)
+
+
+def arduino_loop_polling(exitFlag, measurements):
+    lastReadTime = None
+    start_measuring(measurements)
+    while not exitFlag.value:
+        if not lastReadTime or monotonic() - lastReadTime > 0.1:
+            lastReadTime = monotonic()
+        sleep(0.01)
+
+    stop_measuring(measurements)
+
+
+def arduino_loop_waiting(exitEvent, measurements):
+    lastReadTime = None
+    start_measuring(measurements)
+    while not exitEvent.is_set():
+        if not lastReadTime or monotonic() - lastReadTime > 0.1:
+            lastReadTime = monotonic()
+        exitEvent.wait(max(lastReadTime + 0.1 - monotonic(), 0.0))
+
+    stop_measuring(measurements)
+
+
+def main_loop_polling(exitFlag, measurements):
+    start_measuring(measurements)
+    while not exitFlag.value:
+        sleep(0.5)
+
+    stop_measuring(measurements)
+
+
+def main_loop_waiting(exitEvent, measurements):
+    start_measuring(measurements)
+    exitEvent.wait()
+
+    stop_measuring(measurements)
+
+
+def measure(loop, exitSignal, idleTime):
+    measurements = RawArray('d', 3)
+
+    process = Process(target=loop, args=(exitSignal, measurements))
+    process.start()
+    sleep(idleTime)
+
+    exitStartTime = monotonic()
+    if hasattr(exitSignal, "set"):
+        exitSignal.set()
+    else:
+        exitSignal.value = True
+
+    process.join()
+
+    cpuTime, loopTime, exitTime = measurements
+    return cpuTime / loopTime, exitTime - exitStartTime
+
+
+def main():
+    parser = ArgumentParser(description="Measure idle CPU use and exit latency of the polling and the event driven loops")
+    parser.add_argument("--idle", type=float, default=5.0, help="seconds to let each loop run idle")
+    args = parser.parse_args()
+
+    loops = [
+        ("xbox", xbox_loop_polling, xbox_loop_waiting),
+        ("arduino", arduino_loop_polling, arduino_loop_waiting),
+        ("main", main_loop_polling, main_loop_waiting)
+    ]
+
+    print(f"{'Loop':<8} {'Style':<8} {'CPU %':>7} {'exit ms':>9}")
+    for name, pollingLoop, waitingLoop in loops:
+        for style, loop, exitSignal in (("polling", pollingLoop, Value('b', False)),
+                                        ("waiting", waitingLoop, Event())):
+            cpuShare, exitLatency = measure(loop, exitSignal, args.idle)
+            print(f"{name:<8} {style:<8} {cpuShare * 100:>7.1f} {exitLatency * 1000:>9.1f}")
+
+if __name__ == "__main__":
+    main()
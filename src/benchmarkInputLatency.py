@@ -0,0 +1,312 @@
+import os
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # pygame needs a video driver for its event queue
+import sys
+import math
+import numpy as np
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from threading import Thread, Event, get_ident
+from time import perf_counter, sleep
+from types import ModuleType
+
+# runs the real CarControl dispatch path against fake GPIO, pigpio and joystick backends, and
+# measures the time from a synthetic controller event entering the pygame queue until the last
+# GPIO or servo call it caused
+
+class ActuatorRecorder:
+    def __init__(self):
+        self._currentEvent = None
+        self._currentCalls = 0
+        self._lastCallTime = None
+        self._dispatchThread = None
+
+        self._latencies = {}
+        self._actuatorCalls = {}
+        self._dispatchedEvents = {}
+        self._lastEventEndTime = None
+
+    def start_event(self, event):
+        # the previous event has been fully dispatched once the next one is picked up
+        self.finish_event()
+
+        if hasattr(event, "injectTime"):
+            self._currentEvent = event
+            self._dispatchThread = get_ident()
+
+    def record_call(self):
+        # other components, like the buzzer, can share the process, so only the calls made
+        # while dispatching the event count
+        if self._currentEvent and get_ident() == self._dispatchThread:
+            self._currentCalls += 1
+            self._lastCallTime = perf_counter()
+
+    def finish_event(self):
+        event = self._currentEvent
+        if not event:
+            return
+
+        self._dispatchedEvents[event.name] = self._dispatchedEvents.get(event.name, 0) + 1
+        self._actuatorCalls[event.name] = self._actuatorCalls.get(event.name, 0) + self._currentCalls
+        if self._currentCalls:
+            self._latencies.setdefault(event.name, []).append(self._lastCallTime - event.injectTime)
+            self._lastEventEndTime = self._lastCallTime
+
+        self._currentEvent = None
+        self._currentCalls = 0
+
+    def get_latencies(self):
+        return self._latencies
+
+    def get_actuator_calls(self):
+        return self._actuatorCalls
+
+    def get_dispatched_events(self):
+        return self._dispatchedEvents
+
+    def get_last_event_end_time(self):
+        return self._lastEventEndTime
+
+
+def install_fake_backends(recorder):
+    # fake RPi.GPIO, where every output and duty cycle change counts as an actuator call
+    fakeGpio = ModuleType("RPi.GPIO")
+    fakeGpio.BOARD, fakeGpio.BCM, fakeGpio.OUT, fakeGpio.HIGH, fakeGpio.LOW = 10, 11, 0, 1, 0
+    fakeGpio.setmode = lambda mode: None
+    fakeGpio.setup = lambda pin, mode, initial=0: None
+    fakeGpio.output = lambda pin, value: recorder.record_call()
+    fakeGpio.cleanup = lambda: None
+
+    class FakePwm:
+        def __init__(self, pin, frequency):
+            pass
+
+        def start(self, dutyCycle):
+            pass
+
+        def ChangeDutyCycle(self, dutyCycle):
+            recorder.record_call()
+
+        def stop(self):
+            pass
+
+    fakeGpio.PWM = FakePwm
+
+    fakeRPi = ModuleType("RPi")
+    fakeRPi.GPIO = fakeGpio
+
+    # fake pigpio, where every servo pulse width counts as an actuator call
+    class FakePi:
+        def set_mode(self, pin, mode):
+            pass
+
+        def set_PWM_frequency(self, pin, frequency):
+            pass
+
+        def set_PWM_dutycycle(self, pin, dutyCycle):
+            pass
+
+        def set_servo_pulsewidth(self, pin, pulseWidth):
+            recorder.record_call()
+
+    fakePigpio = ModuleType("pigpio")
+    fakePigpio.OUTPUT = 1
+    fakePigpio.pi = FakePi
+
+    sys.modules["RPi"] = fakeRPi
+    sys.modules["RPi.GPIO"] = fakeGpio
+    sys.modules["pigpio"] = fakePigpio
+
+
+class FakeJoystick:
+    # the d-pad state can be read from the joystick as well as from the hat event
+    hatValue = (0, 0)
+
+    def __init__(self, index):
+        pass
+
+    def init(self):
+        pass
+
+    def get_name(self):
+        return "Fake controller"
+
+    def get_hat(self, hat):
+        return FakeJoystick.hatValue
+
+
+def install_fake_joystick(pygame):
+    pygame.joystick.get_count = lambda: 1
+    pygame.joystick.Joystick = FakeJoystick
+
+
+# event types that can be injected, with the pygame event they are sent as
+eventTypes = {
+    "RT": ("axis", 4),
+    "LT": ("axis", 5),
+    "RSB horizontal": ("axis", 2),
+    "RSB vertical": ("axis", 3),
+    "LSB vertical": ("axis", 1),
+    "D-PAD left": ("hat", -1),
+    "D-PAD right": ("hat", 1),
+    "RB": ("button", 7),
+    "A": ("button", 0)
+}
+
+def create_event_schedule(eventNames, rate, duration):
+    # events of every type are spread evenly over the duration, and merged into one timeline
+    schedule = []
+    numberOfEvents = max(int(rate * duration), 1)
+    for typeNumber, eventName in enumerate(eventNames):
+        offset = typeNumber / (rate * len(eventNames))
+        for eventNumber in range(numberOfEvents):
+            schedule.append((offset + eventNumber / rate, eventName, eventNumber))
+
+    schedule.sort()
+    return schedule
+
+
+def create_pygame_event(pygame, eventName, eventNumber):
+    kind, number = eventTypes[eventName]
+    attributes = {"joy": 0, "instance_id": 0, "name": eventName}
+
+    if kind == "axis":
+        # sweep the axis slowly back and forth, like a finger on a trigger or stick
+        attributes.update({"axis": number, "value": math.sin(eventNumber / 20)})
+        return pygame.event.Event(pygame.JOYAXISMOTION, attributes)
+
+    pressed = eventNumber % 2 == 0
+    if kind == "hat":
+        FakeJoystick.hatValue = (number if pressed else 0, 0)
+        attributes.update({"hat": 0, "value": FakeJoystick.hatValue})
+        return pygame.event.Event(pygame.JOYHATMOTION, attributes)
+
+    attributes["button"] = number
+    return pygame.event.Event(pygame.JOYBUTTONDOWN if pressed else pygame.JOYBUTTONUP, attributes)
+
+
+def inject_events(pygame, schedule, exitEvent, drainTime):
+    startTime = perf_counter()
+    for eventTime, eventName, eventNumber in schedule:
+        waitTime = startTime + eventTime - perf_counter()
+        if waitTime > 0:
+            sleep(waitTime)
+
+        event = create_pygame_event(pygame, eventName, eventNumber)
+        event.injectTime = perf_counter()
+        pygame.event.post(event)
+
+    # give the dispatch loop time to handle the last events before stopping it
+    sleep(drainTime)
+    exitEvent.set()
+
+
+def create_car_control(recorder, carControlClass=None):
+    from carControl import CarControl
+    from carHandling import CarHandling
+    from servoHandling import ServoHandling
+    from cameraHelper import CameraHelper
+
+    carControl = (carControlClass or CarControl)(x11Required=False)
+
+    car = CarHandling(1, 2, 3, 4, 5, 6, 0, 100)
+    servo = ServoHandling(7, "horizontal")
+    cameraHelper = CameraHelper()
+    cameraHelper.add_car(car)
+    cameraHelper.add_servo(servo)
+
+    carControl.add_car(car)
+    carControl.add_servo(servo)
+    carControl.add_camera_helper(cameraHelper)
+
+    # find out which event is being dispatched when an actuator is called
+    xboxControl = carControl._xboxControl
+    dispatchEvent = xboxControl.dispatch_event
+
+    def dispatch_event(event):
+        recorder.start_event(event)
+        return dispatchEvent(event)
+
+    xboxControl.dispatch_event = dispatch_event
+
+    return carControl
+
+
+def run_benchmark(eventNames, rate, duration, drainTime):
+    import pygame
+    from stateBus import StateBus
+
+    recorder = ActuatorRecorder()
+    install_fake_backends(recorder)
+    install_fake_joystick(pygame)
+
+    schedule = create_event_schedule(eventNames, rate, duration)
+
+    with redirect_stdout(open(os.devnull, "w")):
+        carControl = create_car_control(recorder)
+
+        stateBus = StateBus({"speed": 0.0, "turn": 0.0, "servo": 0.0, "HUD": 0.0, "Zoom": 1.0})
+        exitEvent = Event()
+
+        injector = Thread(target=inject_events, args=(pygame, schedule, exitEvent, drainTime))
+        startTime = perf_counter()
+        injector.start()
+
+        # the dispatch loop runs in the main thread, like it does in its own process on the car
+        carControl._start_listening_for_xbox_commands(stateBus, exitEvent)
+        injector.join()
+
+    recorder.finish_event()
+
+    injectedEvents = {}
+    for eventTime, eventName, eventNumber in schedule:
+        injectedEvents[eventName] = injectedEvents.get(eventName, 0) + 1
+
+    endTime = recorder.get_last_event_end_time() or perf_counter()
+
+    return recorder, injectedEvents, endTime - startTime
+
+
+def main():
+    parser = ArgumentParser(description="Measure the latency from controller event to GPIO and servo call")
+    parser.add_argument("--events", nargs="+", default=["RT", "RSB horizontal", "D-PAD left", "RB"],
+                        choices=list(eventTypes))
+    parser.add_argument("--rate", type=float, default=200, help="events per second of each type")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--max-p99-ms", type=float, default=None,
+                        help="exit with an error if the p99 latency of any event type is above this")
+    args = parser.parse_args()
+
+    recorder, injectedEvents, runTime = run_benchmark(args.events, args.rate, args.duration, drainTime=0.5)
+
+    latencies = recorder.get_latencies()
+    actuatorCalls = recorder.get_actuator_calls()
+    dispatchedEvents = recorder.get_dispatched_events()
+
+    print(f"{'Event':<15} {'injected':>9} {'handled':>8} {'calls':>7} {'ev/s':>8} "
+          f"{'p50 us':>8} {'p90 us':>8} {'p99 us':>8} {'max us':>9}")
+
+    regression = False
+    for eventName in args.events:
+        handled = dispatchedEvents.get(eventName, 0)
+        line = (f"{eventName:<15} {injectedEvents[eventName]:>9} {handled:>8} "
+                f"{actuatorCalls.get(eventName, 0):>7} {handled / runTime:>8.0f}")
+
+        # some events, like the HUD button, never reach an actuator
+        if eventName not in latencies:
+            print(line + f" {'-':>8} {'-':>8} {'-':>8} {'-':>9}")
+            continue
+
+        eventLatencies = np.array(latencies[eventName]) * 1e6
+        p50, p90, p99 = np.percentile(eventLatencies, [50, 90, 99])
+        print(line + f" {p50:>8.0f} {p90:>8.0f} {p99:>8.0f} {eventLatencies.max():>9.0f}")
+
+        if args.max_p99_ms is not None and p99 > args.max_p99_ms * 1000:
+            regression = True
+
+    if regression:
+        print(f"p99 latency is above {args.max_p99_ms} ms")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
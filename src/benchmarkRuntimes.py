@@ -0,0 +1,283 @@
+import os
+import subprocess
+import sys
+import tty
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # pygame needs a video driver for its event queue
+import numpy as np
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from multiprocessing import Pipe, set_start_method
+from threading import Thread
+from time import perf_counter, sleep
+from benchmarkInputLatency import ActuatorRecorder, install_fake_backends, install_fake_joystick, \
+    create_car_control, create_event_schedule, inject_events
+
+# runs the whole car, with a synthetic camera, the obstacle detector and an arduino emulated on a
+# pseudo terminal, with the process runtime with forked workers, with bootstrapped workers that are
+# spawned and build their own components, and with the asyncio runtime, and compares their memory,
+# their CPU use and the latency from controller event to GPIO call
+
+def answer_arduino_commands(masterFd, bootTime=0.0):
+    # sends the ready banner after the boot time, and answers every command with a fixed reading,
+    # like the arduino does
+    sleep(bootTime)
+    os.write(masterFd, b"ready\r\n")
+
+    commands = os.fdopen(masterFd, "rb", buffering=0)
+    while True:
+        try:
+            command = commands.readline()
+        except OSError:
+            return
+        if not command:
+            return
+
+        os.write(masterFd, b"ready\r\n" if command.strip() == b"ping" else b"120\r\n")
+
+
+def read_memory(pid):
+    # resident and proportional set size in MB. Forked processes share pages with their parent,
+    # so the proportional size, where shared pages are split between the processes, is the fair sum
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as smaps:
+            for line in smaps:
+                name, value = line.split(":", 1)
+                if name in ("Rss", "Pss"):
+                    memory[name] = int(value.split()[0]) / 1024
+    except (FileNotFoundError, ProcessLookupError):
+        pass
+
+    return memory.get("Rss", 0.0), memory.get("Pss", 0.0)
+
+
+def sample_memory(carControl, exitEvent, samples):
+    # each sample has the memory of every process by name, the parent is called main
+    while not exitEvent.wait(0.25):
+        processes = [("main", os.getpid())] + [(workerName, process.pid) for workerName, process
+                                               in list(carControl._processes.items())]
+        samples.append({processName: read_memory(pid) for processName, pid in processes})
+
+
+def create_benchmark_car_control(pygame, recorder, schedule, warmUpTime, drainTime, resultWriter):
+    from carControl import CarControl
+
+    class BenchmarkCarControl(CarControl):
+        # injects the controller events in the process and thread that handles them, and sends the
+        # latencies back when the control loop ends
+        def _set_up_car_handling(self, stateBus, exitEvent):
+            loopMonitor = super()._set_up_car_handling(stateBus, exitEvent)
+            Thread(target=self._inject_events_after_warm_up, args=(exitEvent,), daemon=True).start()
+
+            return loopMonitor
+
+        def _inject_events_after_warm_up(self, exitEvent):
+            # the other components are still setting up at first, which is measured separately
+            sleep(warmUpTime)
+            inject_events(pygame, schedule, exitEvent, drainTime)
+
+        def _clean_up_car_handling(self):
+            recorder.finish_event()
+            resultWriter.send(recorder.get_latencies())
+            super()._clean_up_car_handling()
+
+    return create_car_control(recorder, BenchmarkCarControl)
+
+
+def create_benchmark_camera(resolution):
+    from camera import Camera
+    from frameSources import SyntheticSource
+
+    camera = Camera(resolution)
+    camera.add_frame_source(SyntheticSource(frameRate=30))
+    camera.set_display_disabled()
+
+    return camera
+
+
+def create_benchmark_arduino_communicator(port, frameConsumers):
+    from arduinoCommunicator import ArduinoCommunicator
+
+    arduinoCommunicator = ArduinoCommunicator(port, 115200)
+    arduinoCommunicator.activate_distance_sensors(29)
+    arduinoCommunicator.add_obstacle_detector(frameConsumers[0])
+
+    return arduinoCommunicator
+
+
+class BenchmarkComponentSpec:
+    # stands in for the spec from config.ini, and builds the same fake components as the other
+    # runtimes in each spawned worker
+    def __init__(self, eventNames, rate, duration, warmUpTime, resultWriter, resolution, arduinoPort):
+        self._eventNames = eventNames
+        self._rate = rate
+        self._duration = duration
+        self._warmUpTime = warmUpTime
+        self._resultWriter = resultWriter
+        self._resolution = resolution
+        self._arduinoPort = arduinoPort
+
+    def get_enabled_components(self):
+        return {"car", "servo", "camera", "arduino"}
+
+    def get_max_camera_resolution(self):
+        return self._resolution
+
+    def run_worker(self, workerName, workerState, readyWriter, targetName, args):
+        from carControl import CarControl
+
+        recorder = ActuatorRecorder()
+        install_fake_backends(recorder)
+
+        with redirect_stdout(open(os.devnull, "w")):
+            if workerName == "control":
+                import pygame
+                install_fake_joystick(pygame)
+
+                schedule = create_event_schedule(self._eventNames, self._rate, self._duration)
+                carControl = create_benchmark_car_control(pygame, recorder, schedule, self._warmUpTime, 0.5,
+                                                          self._resultWriter)
+            else:
+                carControl = CarControl(x11Required=False, controllerRequired=False)
+
+            if workerName == "camera":
+                carControl.add_camera(create_benchmark_camera(self._resolution))
+            elif workerName == "arduino":
+                carControl.add_arduino_communicator(
+                    create_benchmark_arduino_communicator(self._arduinoPort, workerState["frameConsumers"]))
+
+            carControl.set_component_spec(self)
+            carControl.run_worker(workerState, readyWriter, targetName, args)
+
+
+def run_runtime(runtime, eventNames, rate, duration, warmUpTime, resolution):
+    # bootstrap is the process runtime, with workers that are spawned and build their own components
+    if runtime == "bootstrap":
+        set_start_method("spawn")
+
+    # raw, so the banner isn't echoed back or changed before the port is opened
+    masterFd, slaveFd = os.openpty()
+    tty.setraw(slaveFd)
+    Thread(target=answer_arduino_commands, args=(masterFd,), daemon=True).start()
+
+    resultReader, resultWriter = Pipe(duplex=False)
+
+    from carControl import CarControl
+    from obstacleDetector import ObstacleDetector
+    from loopMonitor import LoopMonitor
+
+    with redirect_stdout(open(os.devnull, "w")):
+        frameConsumers = [ObstacleDetector()]
+
+        if runtime == "bootstrap":
+            carControl = CarControl(x11Required=False, controllerRequired=False)
+            carControl.set_component_spec(BenchmarkComponentSpec(
+                eventNames, rate, duration, warmUpTime, resultWriter, resolution, os.ttyname(slaveFd)))
+        else:
+            import pygame
+
+            recorder = ActuatorRecorder()
+            install_fake_backends(recorder)
+            install_fake_joystick(pygame)
+
+            schedule = create_event_schedule(eventNames, rate, duration)
+            carControl = create_benchmark_car_control(pygame, recorder, schedule, warmUpTime, 0.5, resultWriter)
+            carControl.set_runtime(runtime)
+
+            carControl.add_camera(create_benchmark_camera(resolution))
+            carControl.add_arduino_communicator(
+                create_benchmark_arduino_communicator(os.ttyname(slaveFd), frameConsumers))
+
+        carControl.add_frame_consumer(frameConsumers[0])
+
+        cameraMonitor = LoopMonitor("Camera", 0.1)
+        carControl.add_loop_monitor("camera", cameraMonitor)
+
+        memorySamples = []
+        startTimes = os.times()
+        startTime = perf_counter()
+
+        carControl.start()
+        Thread(target=sample_memory, args=(carControl, carControl.shared_exit_event, memorySamples), daemon=True).start()
+        carControl.supervise()
+        carControl.cleanup()
+
+        runTime = perf_counter() - startTime
+        endTimes = os.times()
+
+    latencies = np.concatenate([np.array(values) for values in resultReader.recv().values()]) * 1e6
+
+    # the cpu time of this process and its threads, and of the worker processes after they were joined
+    cpuTime = sum(endTimes[:4]) - sum(startTimes[:4])
+
+    # the sample where all processes together used the most memory
+    processMemory = max(memorySamples, key=lambda sample: sum(pss for rss, pss in sample.values()))
+    frameRate = cameraMonitor.get_statistics()["cycles"] / runTime
+
+    return processMemory, cpuTime / runTime, frameRate, latencies
+
+
+def print_process_memory(runtime, processMemory):
+    for processName, (rss, pss) in processMemory.items():
+        print(f"{runtime:<10} {processName:<16} {rss:>7.1f} {pss:>7.1f}")
+
+
+def main():
+    parser = ArgumentParser(description="Compare memory, CPU and input latency of the process and the asyncio runtime, "
+                                        "and of forked and bootstrapped worker processes")
+    parser.add_argument("--events", nargs="+", default=["RT", "RSB horizontal", "D-PAD left"])
+    parser.add_argument("--rate", type=float, default=100, help="events per second of each type")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warm-up", type=float, default=2.0, help="seconds before the first event is sent")
+    parser.add_argument("--runtime", choices=["processes", "bootstrap", "asyncio"], default=None,
+                        help="only run one runtime, in this interpreter")
+    args = parser.parse_args()
+
+    header = (f"{'Runtime':<10} {'procs':>5} {'RSS MB':>7} {'PSS MB':>7} {'CPU %':>6} {'cam FPS':>8} "
+              f"{'p50 us':>7} {'p90 us':>7} {'p99 us':>7} {'max us':>8}")
+    processHeader = f"{'Runtime':<10} {'Process':<16} {'RSS MB':>7} {'PSS MB':>7}"
+
+    if args.runtime:
+        processMemory, cpuShare, frameRate, latencies = run_runtime(
+            args.runtime, args.events, args.rate, args.duration, args.warm_up, (384, 288))
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        rss = sum(rss for rss, pss in processMemory.values())
+        pss = sum(pss for rss, pss in processMemory.values())
+
+        print(header)
+        print(f"{args.runtime:<10} {len(processMemory):>5} {rss:>7.1f} {pss:>7.1f} {cpuShare * 100:>6.1f} "
+              f"{frameRate:>8.1f} {p50:>7.0f} {p90:>7.0f} {p99:>7.0f} {latencies.max():>8.0f}")
+        print()
+        print(processHeader)
+        print_process_memory(args.runtime, processMemory)
+        return
+
+    # pygame, the fake joystick, the imported modules and the start method can't be reset between
+    # runs, so every runtime is measured in a fresh interpreter of its own
+    summaryRows = []
+    processRows = []
+    for runtime in ["processes", "bootstrap", "asyncio"]:
+        result = subprocess.run(
+            [sys.executable, __file__, "--runtime", runtime, "--events", *args.events, "--rate", str(args.rate),
+             "--duration", str(args.duration), "--warm-up", str(args.warm_up)],
+            capture_output=True, text=True
+        )
+        if result.returncode:
+            summaryRows.append(f"{runtime:<10} failed:\n{result.stderr}")
+            continue
+
+        # the output of a single run is its summary row, an empty line, and its process rows
+        outputLines = result.stdout.strip().splitlines()
+        summaryRows.append(outputLines[1])
+        processRows += outputLines[4:]
+
+    print(header)
+    print("\n".join(summaryRows))
+    print()
+    print("Memory of each process, at the peak of all processes together")
+    print(processHeader)
+    print("\n".join(processRows))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import os
+import subprocess
+import sys
+import tty
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # pygame needs a video driver for its event queue
+import numpy as np
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from configparser import ConfigParser
+from contextlib import redirect_stdout
+from threading import Thread
+from time import perf_counter, sleep
+from benchmarkInputLatency import ActuatorRecorder, install_fake_backends, install_fake_joystick
+from benchmarkRuntimes import answer_arduino_commands
+
+# measures the time from start until the car is ready to drive, with fake GPIO, pigpio and controller,
+# and an arduino emulated on a pseudo terminal that boots for a while after the port is opened, like a
+# real one that is reset when the port is opened. Before is the old startup, with the components set
+# up one after another and a fixed 3 second wait for the arduino. After is the startup of main.py,
+# with the components set up while the controller is opened, and the arduino's ready banner
+
+def install_resetting_serial(masterFd, bootTime):
+    # the emulated arduino starts booting when the port is opened
+    import arduinoCommunicator
+    from serial import Serial
+
+    class ResettingSerial(Serial):
+        def open(self):
+            super().open()
+            Thread(target=answer_arduino_commands, args=(masterFd, bootTime), daemon=True).start()
+
+    arduinoCommunicator.Serial = ResettingSerial
+
+
+def get_benchmark_parser(port):
+    parser = ConfigParser()
+    parser.read(os.path.join(os.path.dirname(__file__), "config.ini"))
+    parser["Arduino.specs"]["Port"] = port
+    parser["Camera.specs"]["DisplayBackend"] = "none"
+
+    return parser
+
+
+def start_before(parser):
+    # one component after another, and a fixed wait after the port was opened instead of the handshake
+    from arduinoCommunicator import ArduinoCommunicator
+    from carControl import CarControl
+    from componentSetup import add_components, setup_car, setup_servo, setup_arduino_communicator, setup_camera
+
+    ArduinoCommunicator._wait_until_arduino_is_ready = lambda self, readyTimeout: sleep(3)
+
+    carController = CarControl(x11Required=False)
+    components = {
+        "car": setup_car(parser),
+        "horizontal servo": setup_servo(parser, "horizontal"),
+        "vertical servo": setup_servo(parser, "vertical"),
+        "arduino communicator": setup_arduino_communicator(parser),
+        "camera": setup_camera(parser)
+    }
+    add_components(carController, parser, components)
+
+    return components["arduino communicator"]
+
+
+def start_after(parser):
+    # the same steps as main.py
+    from carControl import CarControl
+    from componentSetup import add_components, setup_hardware_components
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    hardwareSetup = executor.submit(setup_hardware_components, parser)
+    executor.shutdown(wait=False)
+
+    carController = CarControl(x11Required=False)
+    components = hardwareSetup.result()
+    add_components(carController, parser, components)
+
+    return components["arduino communicator"]
+
+
+def run_startup(variant, bootTime):
+    # the time until all components are set up, and until the arduino has answered its first reading
+    masterFd, slaveFd = os.openpty()
+    tty.setraw(slaveFd)
+
+    import pygame
+    install_fake_backends(ActuatorRecorder())
+    install_fake_joystick(pygame)
+    install_resetting_serial(masterFd, bootTime)
+
+    parser = get_benchmark_parser(os.ttyname(slaveFd))
+
+    with redirect_stdout(open(os.devnull, "w")):
+        startTime = perf_counter()
+        arduinoCommunicator = start_before(parser) if variant == "before" else start_after(parser)
+        setupTime = perf_counter() - startTime
+
+        arduinoCommunicator.setup()
+        arduinoCommunicator.start()
+        readingTime = perf_counter() - startTime
+
+    return setupTime, readingTime
+
+
+def main():
+    parser = ArgumentParser(description="Compare the time until the car is ready to drive with the old and the new startup")
+    parser.add_argument("--boot-time", type=float, default=1.6,
+                        help="seconds the emulated arduino takes from the reset until its setup is done")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--variant", choices=["before", "after"], default=None,
+                        help="only run one variant, in this interpreter")
+    args = parser.parse_args()
+
+    if args.variant:
+        setupTime, readingTime = run_startup(args.variant, args.boot_time)
+        print(f"{setupTime} {readingTime}")
+        return
+
+    print(f"Emulated arduino boot time {args.boot_time:.1f} s, median of {args.repeats} runs")
+    print(f"{'Startup':<8} {'set up s':>9} {'first reading s':>16}")
+
+    # the imports are part of the startup, so every run is in a fresh interpreter
+    for variant in ["before", "after"]:
+        times = []
+        for repeat in range(args.repeats):
+            result = subprocess.run(
+                [sys.executable, __file__, "--variant", variant, "--boot-time", str(args.boot_time)],
+                capture_output=True, text=True, check=True
+            )
+            times.append([float(value) for value in result.stdout.split()])
+
+        setupTime, readingTime = np.median(times, axis=0)
+        print(f"{variant:<8} {setupTime:>9.2f} {readingTime:>16.2f}")
+
+if __name__ == "__main__":
+    main()
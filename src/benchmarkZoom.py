@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+from argparse import ArgumentParser
+from time import perf_counter
+from zoomEngine import ZoomEngine
+
+# compares the zoom engine with the crop and resize that Camera used to do on every frame
+
+def zoom_with_resize(image, resolution, zoomValue):
+    dispW, dispH = resolution
+    centerX = int(dispW / 2)
+    centerY = int(dispH / 2)
+
+    halfZoomDisplayWidth = int(dispW / (2 * zoomValue))
+    halfZoomDisplayHeight = int(dispH / (2 * zoomValue))
+
+    regionOfInterest = image[centerY - halfZoomDisplayHeight:centerY + halfZoomDisplayHeight,
+                       centerX - halfZoomDisplayWidth:centerX + halfZoomDisplayWidth]
+
+    return cv2.resize(regionOfInterest, (dispW, dispH), cv2.INTER_LINEAR)
+
+def time_per_frame(zoomFunction, frames):
+    zoomFunction(frames[0]) # warm up, so the engine has built its tables
+
+    startTime = perf_counter()
+    for frame in frames:
+        zoomFunction(frame)
+
+    return (perf_counter() - startTime) / len(frames)
+
+def get_zoom_levels():
+    # the same values CameraHelper can produce
+    return [round(1.0 + step / 10, 1) for step in range(1, 21)]
+
+def main():
+    parser = ArgumentParser(description="Benchmark zooming of camera frames")
+    parser.add_argument("--width", type=int, default=384)
+    parser.add_argument("--height", type=int, default=288)
+    parser.add_argument("--frames", type=int, default=500)
+    args = parser.parse_args()
+
+    resolution = (args.width, args.height)
+    frames = [np.random.randint(0, 256, size=(args.height, args.width, 3), dtype=np.uint8) for _ in range(8)]
+    frames = frames * (args.frames // len(frames))
+
+    engine = ZoomEngine(resolution)
+
+    print(f"Resolution {args.width}x{args.height}, {len(frames)} frames per zoom level")
+    print(f"{'Zoom':>6} {'resize (us)':>12} {'engine (us)':>12} {'speedup':>8} {'max diff':>9}")
+    for zoomValue in get_zoom_levels():
+        resizeTime = time_per_frame(lambda frame: zoom_with_resize(frame, resolution, zoomValue), frames)
+        engineTime = time_per_frame(lambda frame: engine.zoom(frame, zoomValue), frames)
+
+        difference = np.abs(zoom_with_resize(frames[0], resolution, zoomValue).astype(np.int16) -
+                            engine.zoom(frames[0], zoomValue)).max()
+
+        print(f"{zoomValue:>6} {resizeTime * 1e6:>12.1f} {engineTime * 1e6:>12.1f} "
+              f"{resizeTime / engineTime:>7.2f}x {difference:>9}")
+
+if __name__ == "__main__":
+    main()
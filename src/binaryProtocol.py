@@ -0,0 +1,93 @@
+import struct
+from binascii import crc_hqx
+
+class BinaryProtocol:
+    # every frame is [sync byte][message type][6 byte payload][crc-16 of the type and payload], and is
+    # encoded and decoded the same way by SerialComm.ino. The crc is the xmodem crc, which crc_hqx
+    # computes in C and avr-libc has as _crc_xmodem_update
+    syncByte = 0xA5
+    frameSize = 10
+    payloadSize = 6
+
+    readRequestType = 0x01 # payload is a byte with a bit for each sensor to read
+    readingsType = 0x02 # payload is front and back distance in 1/100 cm, and the photocell value
+
+    # a sensor that wasn't read, or a distance sensor that didn't get an echo, for which pulseIn gives 0
+    missingReading = 0xFFFF
+
+    sensorBits = {"front": 0x01, "back": 0x02, "photocell": 0x04}
+
+    def __init__(self):
+        # bytes of a frame that hasn't been received in full yet
+        self._buffer = bytearray()
+        self._droppedBytes = 0
+
+    def encode_read_request(self, sensors):
+        sensorMask = 0
+        for sensor in sensors:
+            sensorMask |= BinaryProtocol.sensorBits[sensor]
+
+        return self.encode_frame(BinaryProtocol.readRequestType, bytes([sensorMask]))
+
+    def encode_frame(self, messageType, payload):
+        payload = payload.ljust(BinaryProtocol.payloadSize, b"\x00")
+        content = bytes([messageType]) + payload
+
+        return bytes([BinaryProtocol.syncByte]) + content + struct.pack(">H", crc_hqx(content, 0))
+
+    def decode_frames(self, data):
+        # returns the frames that are complete, as (message type, payload). Noise and frames with a wrong
+        # checksum are skipped by looking for the next sync byte after the one that started them
+        if not self._buffer and len(data) == BinaryProtocol.frameSize and data[0] == BinaryProtocol.syncByte:
+            # the usual case of one whole frame, which doesn't need to be buffered
+            if crc_hqx(data[1:], 0) == 0:
+                return [(data[1], data[2:BinaryProtocol.frameSize - 2])]
+
+        self._buffer += data
+
+        frames = []
+        while True:
+            syncIndex = self._buffer.find(BinaryProtocol.syncByte)
+            if syncIndex == -1:
+                self._drop_bytes(len(self._buffer))
+                break
+
+            self._drop_bytes(syncIndex)
+            if len(self._buffer) < BinaryProtocol.frameSize:
+                break # wait for the rest of the frame
+
+            # the crc of the content followed by its own crc is 0
+            frame = bytes(self._buffer[:BinaryProtocol.frameSize])
+            if crc_hqx(frame[1:], 0) != 0:
+                self._drop_bytes(1)
+                continue
+
+            frames.append((frame[1], frame[2:BinaryProtocol.frameSize - 2]))
+            del self._buffer[:BinaryProtocol.frameSize]
+
+        return frames
+
+    def decode_readings(self, payload):
+        # front and back distance in cm and the photocell value, or None for a missing reading
+        front, back, photocell = struct.unpack("<HHH", payload)
+
+        return (
+            front / 100 if front != BinaryProtocol.missingReading else None,
+            back / 100 if back != BinaryProtocol.missingReading else None,
+            photocell if photocell != BinaryProtocol.missingReading else None
+        )
+
+    def get_buffered_bytes(self):
+        return len(self._buffer)
+
+    def get_dropped_bytes(self):
+        return self._droppedBytes
+
+    def reset(self):
+        # throws away the start of a frame that is still waiting for the rest of its bytes
+        self._drop_bytes(len(self._buffer))
+
+    def _drop_bytes(self, numberOfBytes):
+        del self._buffer[:numberOfBytes]
+        self._droppedBytes += numberOfBytes
+
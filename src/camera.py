@@ -1,18 +1,30 @@
 import cv2
-import os
-os.environ["LIBCAMERA_LOG_LEVELS"] = "3" #disable info and warning logging
-from picamera2 import Picamera2
-from libcamera import Transform
+import numpy as np
 from time import time
+from frameSources import Picamera2Source
+from zoomEngine import ZoomEngine
+from frameGrabber import FrameGrabber
 
 class Camera:
+    # stages of show_camera_feed that are timed when a pipeline profiler is added
+    pipelineStages = ["capture", "share", "zoom", "hud", "display", "waitKey"]
+
     def __init__(self, resolution, rotation=True):
         self._dispW, self._dispH = resolution
         self._centerX = int(self._dispW / 2)
         self._centerY = int(self._dispH / 2)
         self._rotation = rotation
 
-        self._picam2 = None
+        self._frameSource = None
+
+        self._threadedCapture = False
+        self._frameGrabber = None
+
+        self._mjpegStreamer = None
+        self._displayEnabled = True
+
+        self._resolutionGovernor = None
+        self._pipelineProfiler = None
 
         # text on video properties
         self._colour = (0, 255, 0)
@@ -20,22 +32,25 @@ class Camera:
         self._font = cv2.FONT_HERSHEY_SIMPLEX
         self._scale = 1
         self._thickness = 1
+        self._textMaskCache = {}
 
         self._angleText = None
         self._speedText = None
         self._turnText = None
         self._zoomValue = 1.0
+        self._zoomEngine = ZoomEngine(resolution)
         self._hudActive = True
 
         self._carEnabled = False
         self._servoEnabled = False
 
         self._fps = 0
+        self._processingFps = 0
         self._weightPrevFps = 0.9
         self._weightNewFps = 0.1
         self._fpsPos = (10, 30)
 
-        self._arrayDict = None
+        self._frameRing = None
 
         self._number_to_turnValue = {
             0: "-",
@@ -44,42 +59,87 @@ class Camera:
         }
 
     def setup(self):
-        self._picam2 = Picamera2()
+        if not self._frameSource:
+            self._frameSource = Picamera2Source(self._rotation)
 
-        # set resolution, format and rotation of camera feed
-        config = self._picam2.create_preview_configuration(
-            {"size": (self._dispW, self._dispH), "format": "RGB888"},
-            transform=Transform(vflip=self._rotation)
-        )
-        self._picam2.configure(config)
-        self._picam2.start()
+        self._frameSource.open((self._dispW, self._dispH), self._get_target_frame_rate())
+        self._start_frame_grabber()
 
-    def show_camera_feed(self, shared_array):
+        if self._mjpegStreamer:
+            self._mjpegStreamer.start()
+
+    def show_camera_feed(self, stateSubscriber):
         tStart = time() # start timer for calculating fps
+        if self._pipelineProfiler:
+            self._pipelineProfiler.start_frame()
 
         # get raw image
-        im = self._picam2.capture_array()
+        if self._frameGrabber:
+            im = self._frameGrabber.get_latest_frame(timeout=1.0)
+            if im is None:
+                return
+        else:
+            im = self._frameSource.capture()
+
+        if self._pipelineProfiler:
+            self._pipelineProfiler.mark("capture")
+
+        # the time spent after the frame arrived tells how much headroom there is
+        if self._resolutionGovernor:
+            tCaptured = time()
+
+        # share the raw frame with other processes before it is zoomed and drawn on
+        if self._frameRing:
+            self._frameRing.write(im)
 
         # read control values from external classes
-        self._read_control_values_for_video_feed(shared_array)
+        self._read_control_values_for_video_feed(stateSubscriber)
+
+        if self._pipelineProfiler:
+            self._pipelineProfiler.mark("share")
 
         # resize image when zooming
         if self._zoomValue != 1.0:
             im = self._get_zoomed_image(im)
 
+        if self._pipelineProfiler:
+            self._pipelineProfiler.mark("zoom")
+
         # add control values to cam feed
         if self._hudActive:
             self._add_text_to_cam_feed(im)
 
-        cv2.imshow("Camera", im)
-        cv2.waitKey(1)
+        if self._pipelineProfiler:
+            self._pipelineProfiler.mark("hud")
+
+        self._display_frame(im)
 
         # calculate fps
         self._calculate_fps(tStart)
 
+        if self._resolutionGovernor:
+            self._adjust_resolution_to_fps(tCaptured)
+
+        if self._pipelineProfiler:
+            if self._frameGrabber:
+                self._pipelineProfiler.set_dropped_frames(self._frameGrabber.get_dropped_frames())
+            self._pipelineProfiler.end_frame()
+
     def cleanup(self):
-        cv2.destroyAllWindows()
-        self._picam2.close()
+        if self._frameGrabber:
+            self._frameGrabber.stop()
+            print(f"Camera captured {self._frameGrabber.get_captured_frames()} frames, "
+                  f"{self._frameGrabber.get_dropped_frames()} were dropped as stale")
+
+        if self._mjpegStreamer:
+            self._mjpegStreamer.stop()
+        elif self._displayEnabled:
+            cv2.destroyAllWindows()
+
+        self._frameSource.close()
+
+        if self._pipelineProfiler:
+            print(self._pipelineProfiler.get_report())
 
     def set_car_enabled(self):
         self._carEnabled = True
@@ -87,8 +147,98 @@ class Camera:
     def set_servo_enabled(self):
         self._servoEnabled = True
 
-    def add_array_dict(self, arrayDict):
-        self._arrayDict = arrayDict
+    def set_display_disabled(self):
+        self._displayEnabled = False
+
+    def set_threaded_capture_enabled(self):
+        self._threadedCapture = True
+
+    def add_frame_source(self, frameSource):
+        self._frameSource = frameSource
+
+    def add_mjpeg_streamer(self, mjpegStreamer):
+        self._mjpegStreamer = mjpegStreamer
+
+    def add_pipeline_profiler(self, pipelineProfiler):
+        self._pipelineProfiler = pipelineProfiler
+
+    def add_frame_ring(self, frameRing):
+        self._frameRing = frameRing
+
+    def add_resolution_governor(self, resolutionGovernor):
+        self._resolutionGovernor = resolutionGovernor
+        self._resolutionGovernor.set_start_resolution((self._dispW, self._dispH))
+        self._set_resolution(self._resolutionGovernor.get_resolution())
+
+    def get_resolution(self):
+        return self._dispW, self._dispH
+
+    def get_max_resolution(self):
+        if self._resolutionGovernor:
+            return self._resolutionGovernor.get_max_resolution()
+
+        return self._dispW, self._dispH
+
+    def _get_target_frame_rate(self):
+        if self._resolutionGovernor:
+            return self._resolutionGovernor.get_frame_rate()
+
+        return None
+
+    def _start_frame_grabber(self):
+        # let a separate thread keep capturing at the sensor rate, so a slow display
+        # only means that stale frames are skipped
+        if self._threadedCapture:
+            self._frameGrabber = FrameGrabber(self._frameSource.capture)
+            self._frameGrabber.start()
+
+    def _adjust_resolution_to_fps(self, captureTime):
+        currentTime = time()
+        self._processingFps = self._weightPrevFps * self._processingFps + \
+                              self._weightNewFps * (1 / max(currentTime - captureTime, 1e-6))
+
+        if self._resolutionGovernor.update(self._fps, self._processingFps, currentTime):
+            self._change_resolution(self._resolutionGovernor.get_resolution())
+
+    def _change_resolution(self, resolution):
+        if self._frameGrabber:
+            self._frameGrabber.stop()
+
+        self._set_resolution(resolution)
+        self._frameSource.reconfigure(resolution, self._get_target_frame_rate())
+        self._start_frame_grabber()
+
+        # start measuring again at the new resolution
+        self._fps = self._resolutionGovernor.get_frame_rate()
+        self._processingFps = 0
+
+        print(f"Camera changed to {self._dispW}x{self._dispH} at {self._resolutionGovernor.get_frame_rate()} FPS")
+
+    def _set_resolution(self, resolution):
+        self._dispW, self._dispH = resolution
+        self._centerX = int(self._dispW / 2)
+        self._centerY = int(self._dispH / 2)
+
+        self._textPositions = self._set_text_positions()
+        self._textMaskCache = {}
+        self._zoomEngine = ZoomEngine(resolution)
+
+    def _display_frame(self, image):
+        if not self._displayEnabled:
+            return
+
+        if self._mjpegStreamer:
+            self._mjpegStreamer.publish(image)
+            if self._pipelineProfiler:
+                self._pipelineProfiler.mark("display")
+        else:
+            cv2.imshow("Camera", image)
+            if self._pipelineProfiler:
+                self._pipelineProfiler.mark("display")
+
+            cv2.waitKey(1)
+            if self._pipelineProfiler:
+                self._pipelineProfiler.mark("waitKey")
 
     def _set_text_positions(self):
         spacingVertical = 30
@@ -110,55 +260,88 @@ class Camera:
         self._fps = self._weightPrevFps * self._fps + self._weightNewFps * (1 / loopTime)
 
     def _get_zoomed_image(self, image):
-        halfZoomDisplayWidth = int(self._dispW / (2 * self._zoomValue))
-        halfZoomDisplayHeight = int(self._dispH / (2 * self._zoomValue))
-
-        regionOfInterest = image[self._centerY - halfZoomDisplayHeight:self._centerY + halfZoomDisplayHeight,
-                           self._centerX - halfZoomDisplayWidth:self._centerX + halfZoomDisplayWidth]
-
-        im = cv2.resize(regionOfInterest, (self._dispW, self._dispH), cv2.INTER_LINEAR)
-
-        return im
+        return self._zoomEngine.zoom(image, self._zoomValue)
 
     def _add_text_to_cam_feed(self, image):
         # add control values to camera feed
         counter = 0
-        cv2.putText(image, "Zoom: " + str(self._zoomValue) + "x", self._get_origin(counter), self._font, self._scale,
-                    self._colour,
-                    self._thickness)
+        self._draw_cached_text(image, "Zoom: " + str(self._zoomValue) + "x", self._get_origin(counter))
         counter += 1
 
         if self._angleText:
-            cv2.putText(image, self._angleText, self._get_origin(counter), self._font, self._scale, self._colour,
-                        self._thickness)
+            self._draw_cached_text(image, self._angleText, self._get_origin(counter))
             counter += 1
 
         if self._speedText:
-            cv2.putText(image, self._speedText, self._get_origin(counter), self._font, self._scale, self._colour,
-                        self._thickness)
+            self._draw_cached_text(image, self._speedText, self._get_origin(counter))
             counter += 1
 
         if self._turnText:
-            cv2.putText(image, self._turnText, self._get_origin(counter), self._font, self._scale, self._colour,
-                        self._thickness)
+            self._draw_cached_text(image, self._turnText, self._get_origin(counter))
             counter += 1
 
-        # display fps
+        # display fps, this changes too often to be worth caching
         cv2.putText(image, self._get_fps(), self._fpsPos, self._font, self._scale, self._colour,
                     self._thickness)
 
+    def _draw_cached_text(self, image, text, origin):
+        key = (text, origin)
+        cachedText = self._textMaskCache.get(key)
+        if not cachedText:
+            cachedText = self._render_text_mask(text, origin)
+            if cachedText: # nothing is cached if the text ended up outside the frame
+                self._textMaskCache[key] = cachedText
+
+        if cachedText:
+            solidPixels, edgePixels, edgeWeight, edgeColour = cachedText
+            image[solidPixels] = self._colour
+
+            # blend the anti-aliased edges of the text with the frame. This is the same
+            # rounding as putText uses: (pixel * (255 - alpha) + colour * alpha + 127) // 255
+            if edgeWeight.size:
+                blended = image[edgePixels] * edgeWeight
+                blended += edgeColour
+                blended += (blended >> 8) + 1
+                image[edgePixels] = blended >> 8
+
+    def _render_text_mask(self, text, origin):
+        # draw the text once on an empty canvas at the same origin as on the frame, so
+        # blending the mask is pixel identical to calling putText on the frame itself
+        canvas = np.zeros((self._dispH, self._dispW), dtype=np.uint8)
+        cv2.putText(canvas, text, origin, self._font, self._scale, 255, self._thickness)
+
+        if not canvas.any():
+            return None
+
+        solidPixels = np.nonzero(canvas == 255)
+        edgePixels = np.nonzero((canvas > 0) & (canvas < 255))
+
+        alpha = canvas[edgePixels][:, np.newaxis].astype(np.uint16)
+        edgeWeight = 255 - alpha
+        edgeColour = np.array(self._colour, dtype=np.uint16) * alpha + 127
+
+        return solidPixels, edgePixels, edgeWeight, edgeColour
+
     def _get_fps(self):
         return str(int(self._fps)) + " FPS"
 
-    def _read_control_values_for_video_feed(self, shared_array):
-        if self._carEnabled:
-            self._speedText = "Speed: " + str(int(shared_array[self._arrayDict["speed"]])) + "%"
-            self._turnText = "Turn: " + self._get_turn_value(shared_array[self._arrayDict["turn"]])
-        if self._servoEnabled:
-            self._angleText = "Angle: " + str(int(shared_array[self._arrayDict["servo"]]))
+    def _read_control_values_for_video_feed(self, stateSubscriber):
+        # the controls usually change far less often than the frames, so only the
+        # texts of the values that have been published since the last frame are made again
+        changes = stateSubscriber.get_changes()
+        if not changes:
+            return
 
-        self._hudActive = shared_array[self._arrayDict["HUD"]]
-        self._zoomValue = shared_array[self._arrayDict["Zoom"]]
+        if self._carEnabled:
+            if "speed" in changes:
+                self._speedText = "Speed: " + str(int(changes["speed"])) + "%"
+            if "turn" in changes:
+                self._turnText = "Turn: " + self._get_turn_value(changes["turn"])
+        if self._servoEnabled and "servo" in changes:
+            self._angleText = "Angle: " + str(int(changes["servo"]))
+
+        self._hudActive = changes.get("HUD", self._hudActive)
+        self._zoomValue = changes.get("Zoom", self._zoomValue)
 
     def _get_turn_value(self, number):
         return self._number_to_turnValue[number]
@@ -28,36 +28,54 @@ class CameraHelper:
         self._zoomButton = self._controlsDictCamera["Zoom"]
         self._hudButton = self._controlsDictCamera["HUD"]
 
+        self._buttonHandlers = {
+            self._zoomButton: self.handle_zoom,
+            self._hudButton: self.handle_hud
+        }
+
         self._turnValue_to_number = {
             "-": 0,
             "Left": 1,
             "Right": 2
         }
 
-        self._arrayDict = None
-
     def handle_xbox_input(self, button, pressValue):
-        if button == self._zoomButton:
-            self._set_zoom_value(pressValue)
-        elif button == self._hudButton and pressValue: # check that button is pushed, not released
+        handler = self._buttonHandlers.get(button)
+        if handler:
+            handler(pressValue)
+
+    def handle_zoom(self, pressValue):
+        self._set_zoom_value(pressValue)
+
+    def handle_hud(self, pressValue):
+        if pressValue: # check that button is pushed, not released
             self._set_hud_on_or_off()
 
+    def get_button_handlers(self):
+        return self._buttonHandlers
+
     def add_car(self, car):
         self._car = car
 
     def add_servo(self, servo):
         self._servo = servo
 
-    def update_control_values_for_video_feed(self, shared_array):
+    def publish_control_values(self, stateBus):
+        controlValues = {
+            "HUD": float(self._hudActive),
+            "Zoom": self._zoomValue
+        }
+
         if self._servo:
-            shared_array[self._arrayDict["servo"]] = self._servo.get_current_servo_angle()
+            controlValues["servo"] = self._servo.get_current_servo_angle()
 
         if self._car:
-            shared_array[self._arrayDict["speed"]] = self._car.get_current_speed()
-            shared_array[self._arrayDict["turn"]] = self._turnValue_to_number[self._car.get_current_turn_value()]
+            controlValues["speed"] = self._car.get_current_speed()
+            controlValues["turn"] = self._turnValue_to_number[self._car.get_current_turn_value()]
 
-        shared_array[self._arrayDict["HUD"]] = float(self._hudActive)
-        shared_array[self._arrayDict["Zoom"]] = self._zoomValue
+        # the bus only writes the values that changed, as one version, so the subscribers
+        # get them together instead of one at a time
+        return stateBus.publish(controlValues)
 
     def get_camera_buttons(self):
         return self._controlsDictCamera
@@ -68,9 +86,6 @@ class CameraHelper:
     def get_zoom_value(self):
         return self._zoomValue
 
-    def add_array_dict(self, arrayDict):
-        self._arrayDict = arrayDict
-
     def _set_hud_on_or_off(self):
         self._hudActive = not self._hudActive
 
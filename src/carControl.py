@@ -1,14 +1,28 @@
+import asyncio
 import subprocess
-from multiprocessing import Process, Array, Value
-from xboxControl import XboxControl
-from time import sleep
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Process, Event, Pipe
+from multiprocessing.connection import wait
+from threading import Thread
+from time import time, monotonic
+from stateBus import StateBus
+from roboCarHelper import StartupError
 
 class CarControl:
-    def __init__(self):
-        if not self._check_if_X11_connected():
+    # exit code of a worker that couldn't find its hardware, which isn't restarted
+    startupErrorExitCode = 3
+
+    def __init__(self, x11Required=True, controllerRequired=True):
+        if x11Required and not self._check_if_X11_connected():
             raise X11ForwardingError("X11 forwarding not detected.")
 
-        self._xboxControl = XboxControl()
+        # only the process that handles the controller events needs the controller, and pygame
+        if controllerRequired:
+            from xboxControl import XboxControl
+            self._xboxControl = XboxControl()
+        else:
+            self._xboxControl = None
 
         self._car = None
         self._servoEnabled = False
@@ -18,13 +32,40 @@ class CarControl:
         self._camera = None
         self._cameraHelper = None
 
-        self._processes = []
+        self._frameRing = None
+        self._frameConsumers = []
 
-        self._buttonToObjectDict = {
-        }
+        self._stateSubscribers = []
+
+        # loop monitors keyed by the loop they measure, control, camera or arduino
+        self._loopMonitors = {}
+        self._safeStopAfter = None
+
+        # cpu affinity and scheduling settings keyed by process, control, camera or arduino
+        self._processTunings = {}
+
+        # the workers by name, with what they run, so a worker that dies can be started again
+        self._processes = {}
+        self._workerTargets = {}
+        self._readyReaders = {}
+        self._readyWriter = None
+
+        # processes runs each component in a process of its own, asyncio runs them all as tasks in this process
+        self._runtime = "processes"
+        self._componentThreads = {}
+
+        self._maxRestarts = 3
+        self._joinTimeout = 5.0
+        self._restartCounts = {}
+        self._restartTimes = {}
 
-        self.shared_array = None
-        self.shared_flag = Value('b', False)
+        # set when the workers are spawned and build their own components from config.ini
+        self._componentSpec = None
+
+        self._startupProfiler = None
+
+        self.shared_state_bus = None
+        self.shared_exit_event = Event()
 
     def add_arduino_communicator(self, arduinoCommunicator):
         self._arduinoCommunicator = arduinoCommunicator
@@ -38,85 +79,446 @@ class CarControl:
     def add_camera_helper(self, cameraHelper):
         self._cameraHelper = cameraHelper
 
+    def add_frame_consumer(self, frameConsumer):
+        self._frameConsumers.append(frameConsumer)
+
+    def add_state_subscriber(self, stateSubscriber):
+        self._stateSubscribers.append(stateSubscriber)
+
+    def add_loop_monitor(self, loopName, loopMonitor):
+        self._loopMonitors[loopName] = loopMonitor
+
+    def set_watchdog_enabled(self, safeStopAfter):
+        # stop the car if the control loop has been missing its deadline for this many seconds
+        self._safeStopAfter = safeStopAfter
+
+    def set_runtime(self, runtime):
+        if runtime not in ("processes", "asyncio"):
+            raise ValueError(f"Unknown runtime {runtime}, use processes or asyncio")
+
+        self._runtime = runtime
+
+    def set_supervision(self, maxRestarts, joinTimeout):
+        # how many times each worker is restarted, and how long workers get to stop on exit
+        self._maxRestarts = maxRestarts
+        self._joinTimeout = joinTimeout
+
+    def set_component_spec(self, componentSpec):
+        # the workers build the car, servos, camera and arduino communicator from the spec, instead
+        # of being forked with all the components of this process
+        self._componentSpec = componentSpec
+
+    def set_startup_profiler(self, startupProfiler):
+        # the time each worker is ready is added to the profile, which is printed when all of them are
+        self._startupProfiler = startupProfiler
+
+    def add_process_tuning(self, processName, processTuning):
+        self._processTunings[processName] = processTuning
+
+    def get_loop_reports(self):
+        # the statistics are in shared memory, so they can be read while the loops run
+        return [loopMonitor.get_report() for loopMonitor in self._loopMonitors.values()]
+
     def add_servo(self, servo):
         self._servos.append(servo)
         if not self._servoEnabled:
             self._servoEnabled = True
 
     def start(self):
-        if self._camera:
-            self._get_camera_ready() # this needs to be first method called
+        enabledComponents = self._get_enabled_components()
+        self._set_shared_state_bus(enabledComponents)
+
+        if "camera" in enabledComponents:
+            self._set_frame_ring()
+
+            # a bootstrapped camera worker gets its camera ready itself
+            if not self._componentSpec:
+                self._get_camera_ready() # this needs to be first method called
 
+        # in the asyncio runtime the components are started as tasks by supervise
+        if self._runtime == "asyncio":
+            return
+
+        if "camera" in enabledComponents:
             self._activate_camera()
 
-        if self._arduinoCommunicator:
+            for frameConsumer in self._frameConsumers:
+                self._activate_frame_consumer(frameConsumer)
+
+        for stateSubscriber in self._stateSubscribers:
+            self._activate_state_subscriber(stateSubscriber)
+
+        if "arduino" in enabledComponents:
             self._activate_arduino_communication()
 
         self._activate_car_handling()
 
+    def run_worker(self, workerState, readyWriter, targetName, args):
+        # runs in a spawned worker, once its own components are added, with the parts of the
+        # parent's car controller that are shared between the workers
+        self._loopMonitors = workerState["loopMonitors"]
+        self._processTunings = workerState["processTunings"]
+        self._safeStopAfter = workerState["safeStopAfter"]
+        self._frameRing = workerState["frameRing"]
+        self._frameConsumers = workerState["frameConsumers"]
+
+        if self._camera:
+            self._get_camera_ready()
+
+        self._run_worker(readyWriter, getattr(self, targetName), args)
+
+    def supervise(self):
+        # blocks until the program exits, and starts workers that die before that again
+        if self._runtime == "asyncio":
+            # the tasks don't report when they are ready, so the profile ends with the setup
+            if self._startupProfiler:
+                print(self._startupProfiler.get_report())
+                self._startupProfiler = None
+
+            asyncio.run(self._run_component_tasks())
+            return
+
+        exitEvent = self.shared_exit_event
+
+        # the exit event can't be waited on together with the processes, so a thread passes it on through a pipe
+        exitReader, exitWriter = Pipe(duplex=False)
+        exitThread = Thread(target=self._pass_on_exit_event, args=(exitEvent, exitWriter), daemon=True)
+        exitThread.start()
+
+        while not exitEvent.is_set():
+            sentinels = {process.sentinel: workerName for workerName, process in self._processes.items()}
+            readyObjects = wait(list(sentinels) + list(self._readyReaders) + [exitReader])
+
+            for readyObject in readyObjects:
+                if exitEvent.is_set():
+                    break
+
+                if readyObject in self._readyReaders:
+                    self._handle_worker_ready(readyObject)
+                elif readyObject in sentinels:
+                    self._restart_worker(sentinels[readyObject])
+
+        exitReader.close()
+
     def cleanup(self):
-        # close all threads
-        for process in self._processes:
-            process.join()
+        # all workers get until the join timeout to finish, and the ones still running after that are stopped
+        startTime = monotonic()
+        for process in self._processes.values():
+            process.join(max(startTime + self._joinTimeout - monotonic(), 0.0))
+
+        stuckWorkers = [workerName for workerName, process in self._processes.items() if process.is_alive()]
+        for workerName in stuckWorkers:
+            self._stop_worker(self._processes[workerName])
+
+        # threads can't be terminated, so the ones that don't stop are only reported
+        for thread in self._componentThreads.values():
+            thread.join(max(startTime + self._joinTimeout - monotonic(), 0.0))
+        stuckWorkers += [threadName for threadName, thread in self._componentThreads.items() if thread.is_alive()]
+
+        if self._frameRing:
+            self._frameRing.cleanup()
+
+        shutdownReport = f"Workers stopped in {(monotonic() - startTime) * 1000:.0f} ms"
+        if stuckWorkers:
+            shutdownReport += ", " + ", ".join(stuckWorkers) + " didn't stop in time"
+
+        print(shutdownReport)
+
+    def _get_enabled_components(self):
+        # a bootstrapped car controller only knows from the spec which components the workers build
+        if self._componentSpec:
+            return self._componentSpec.get_enabled_components()
+
+        components = {
+            "car": self._car,
+            "servo": self._servoEnabled,
+            "camera": self._camera,
+            "arduino": self._arduinoCommunicator
+        }
 
-    def _get_camera_ready(self):
-        self._set_shared_array_and_array_dict()
+        return {componentName for componentName, component in components.items() if component}
 
-        if self._car:
-            self._camera.set_car_enabled()
+    def _set_frame_ring(self):
+        # only set up the shared frame ring if anyone is going to read from it
+        if not self._frameConsumers:
+            return
 
-        if self._servoEnabled:
-            self._camera.set_servo_enabled()
+        if self._componentSpec:
+            width, height = self._componentSpec.get_max_camera_resolution()
+        else:
+            width, height = self._camera.get_max_resolution()
 
-    def _set_shared_array_and_array_dict(self):
-        arrayInput = []
-        arrayDict = {}
-        counter = 0
-        if self._car:
-            arrayDict["speed"] = counter
-            arrayInput.append(0.0)
-            counter += 1
+        from frameRingBuffer import FrameRingBuffer # numpy is only needed when frames are shared
+        self._frameRing = FrameRingBuffer((height, width, 3))
 
-            arrayDict["turn"] = counter
-            arrayInput.append(0.0)
-            counter += 1
+    def _get_camera_ready(self):
+        enabledComponents = self._get_enabled_components()
+        if "car" in enabledComponents:
+            self._camera.set_car_enabled()
 
-        if self._servoEnabled:
-            arrayDict["servo"] = counter
-            arrayInput.append(0.0)
-            counter += 1
+        if "servo" in enabledComponents:
+            self._camera.set_servo_enabled()
 
-        arrayDict["HUD"] = counter
-        arrayInput.append(0.0)
-        counter += 1
+        if self._frameRing:
+            self._camera.add_frame_ring(self._frameRing)
 
-        arrayDict["Zoom"] = counter
-        arrayInput.append(1.0)
+    def _set_shared_state_bus(self, enabledComponents):
+        controlValues = {}
+        if "car" in enabledComponents:
+            controlValues["speed"] = 0.0
+            controlValues["turn"] = 0.0
 
-        self.shared_array = Array('d', arrayInput)
+        if "servo" in enabledComponents:
+            controlValues["servo"] = 0.0
 
-        self._camera.add_array_dict(arrayDict)
-        self._cameraHelper.add_array_dict(arrayDict)
+        controlValues["HUD"] = 0.0
+        controlValues["Zoom"] = 1.0
 
+        self.shared_state_bus = StateBus(controlValues)
 
     def _activate_camera(self):
-        process = Process(target=self._start_camera, args=(self.shared_array, self.shared_flag))
-        self._processes.append(process)
-        process.start()
+        self._start_worker("camera", self._start_camera, (self.shared_state_bus, self.shared_exit_event))
+
+    def _activate_frame_consumer(self, frameConsumer):
+        self._start_worker(type(frameConsumer).__name__, self._start_frame_consumer,
+                           (frameConsumer, self._frameRing.get_attach_info(), self.shared_exit_event))
+
+    def _activate_state_subscriber(self, stateSubscriber):
+        self._start_worker(type(stateSubscriber).__name__, self._start_state_subscriber,
+                           (stateSubscriber, self.shared_state_bus, self.shared_exit_event))
 
     def _activate_arduino_communication(self):
-        process = Process(target=self._start_listening_for_arduino_communication, args=(self.shared_flag,))
-        self._processes.append(process)
-        process.start()
+        self._start_worker("arduino", self._start_listening_for_arduino_communication, (self.shared_exit_event,))
 
     def _activate_car_handling(self):
-        process = Process(target=self._start_listening_for_xbox_commands, args=(self.shared_array, self.shared_flag))
-        self._processes.append(process)
+        self._start_worker("control", self._start_listening_for_xbox_commands, (self.shared_state_bus, self.shared_exit_event))
+
+    def _start_worker(self, workerName, target, args):
+        # the shared state bus, frame ring, exit event and serial port belong to this process, so a
+        # worker that is started again gets the same ones as the worker it replaces
+        readyReader, readyWriter = Pipe(duplex=False)
+        if self._componentSpec:
+            # a bootstrapped worker is only sent the spec and the shared parts, and builds the rest
+            # itself, so it also works when workers are spawned instead of forked
+            process = Process(target=self._componentSpec.run_worker,
+                              args=(workerName, self._get_worker_state(), readyWriter, target.__name__, args),
+                              name=workerName)
+        else:
+            process = Process(target=self._run_worker, args=(readyWriter, target, args), name=workerName)
         process.start()
+        readyWriter.close() # only the worker writes to it
+
+        self._processes[workerName] = process
+        self._workerTargets[workerName] = (target, args)
+        self._readyReaders[readyReader] = workerName
+
+        return readyReader
+
+    def _run_worker(self, readyWriter, target, args):
+        self._readyWriter = readyWriter
+        target(*args)
+
+    def _get_worker_state(self):
+        return {
+            "loopMonitors": self._loopMonitors,
+            "processTunings": self._processTunings,
+            "safeStopAfter": self._safeStopAfter,
+            "frameRing": self._frameRing,
+            "frameConsumers": self._frameConsumers
+        }
+
+    def _report_worker_ready(self):
+        # tells the supervisor that the worker is done with its setup
+        if not self._readyWriter:
+            return
+
+        self._readyWriter.send(monotonic())
+        self._readyWriter.close()
+        self._readyWriter = None
+
+    def _handle_worker_ready(self, readyReader):
+        workerName = self._readyReaders.pop(readyReader)
+        try:
+            readyTime = readyReader.recv()
+        except EOFError:
+            readyTime = None # the worker died before its setup was done
+        readyReader.close()
+
+        # only a restarted worker has a restart time, and a worker that died first has none
+        restartTime = self._restartTimes.pop(readyReader, None)
+        if readyTime and restartTime:
+            print(f"{workerName} worker restarted and ready in {(readyTime - restartTime) * 1000:.0f} ms")
+
+        if self._startupProfiler:
+            if readyTime and not restartTime:
+                self._startupProfiler.add_event(f"{workerName} worker ready", readyTime)
+
+            if not self._readyReaders:
+                print(self._startupProfiler.get_report())
+                self._startupProfiler = None
+
+    def _restart_worker(self, workerName):
+        process = self._processes[workerName]
+        process.join()
+        restartTime = monotonic()
+        print(f"{workerName} worker stopped unexpectedly with exit code {process.exitcode}")
+
+        restarts = self._restartCounts.get(workerName, 0)
+        startupFailed = process.exitcode == CarControl.startupErrorExitCode
+        if restarts >= self._maxRestarts or startupFailed:
+            del self._processes[workerName]
+            if startupFailed:
+                print(f"{workerName} worker could not start, not restarting it")
+            else:
+                print(f"{workerName} worker has been restarted {restarts} times, giving up")
+
+            # the car can't be driven without the control worker
+            if workerName == "control":
+                self._exit_program(self.shared_exit_event)
+            return
+
+        self._restartCounts[workerName] = restarts + 1
+
+        # the restart time belongs to the new worker's pipe, as the old worker's pipe can still be unread
+        target, args = self._workerTargets[workerName]
+        readyReader = self._start_worker(workerName, target, args)
+        self._restartTimes[readyReader] = restartTime
+
+    def _stop_worker(self, process):
+        print(f"{process.name} worker didn't stop in {self._joinTimeout} s, terminating it")
+        process.terminate()
+        process.join(1.0)
+
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def _pass_on_exit_event(self, exitEvent, exitWriter):
+        exitEvent.wait()
+        exitWriter.send(True)
+
+    async def _run_component_tasks(self):
+        exitEvent = self.shared_exit_event
+        stateBus = self.shared_state_bus
 
-    def _start_listening_for_xbox_commands(self, shared_array, flag):
+        if self._processTunings:
+            print("Process tuning is per process, and is not used in the asyncio runtime")
+
+        # components that block run their loops in threads of their own, and their tasks wait for the threads
+        taskSpecs = [("control", self._run_car_handling_task, (stateBus, exitEvent))]
+
+        if self._camera:
+            taskSpecs.append(("camera", self._run_in_own_thread, ("camera", self._start_camera, stateBus, exitEvent)))
+
+            for frameConsumer in self._frameConsumers:
+                consumerName = type(frameConsumer).__name__
+                taskSpecs.append((consumerName, self._run_in_own_thread,
+                                  (consumerName, self._start_frame_consumer, frameConsumer,
+                                   self._frameRing.get_attach_info(), exitEvent)))
+
+        for stateSubscriber in self._stateSubscribers:
+            subscriberName = type(stateSubscriber).__name__
+            taskSpecs.append((subscriberName, self._run_in_own_thread,
+                              (subscriberName, self._start_state_subscriber, stateSubscriber, stateBus, exitEvent)))
+
+        if self._arduinoCommunicator:
+            taskSpecs.append(("arduino", self._run_arduino_task, (exitEvent,)))
+
+        await asyncio.gather(*[self._run_task(taskName, taskFunction, args) for taskName, taskFunction, args in taskSpecs])
+
+    async def _run_task(self, taskName, taskFunction, args):
+        try:
+            await taskFunction(*args)
+        except Exception:
+            # the components share one process, so one that fails can't be restarted on its own
+            print(f"{taskName} task stopped unexpectedly, exiting")
+            traceback.print_exc()
+            self._exit_program(self.shared_exit_event)
+
+    async def _run_in_own_thread(self, threadName, target, *args):
+        loop = asyncio.get_running_loop()
+        finished = loop.create_future()
+
+        def run_target():
+            error = None
+            try:
+                target(*args)
+            except Exception as e:
+                error = e
+
+            # the event loop is gone if the program was interrupted
+            try:
+                loop.call_soon_threadsafe(self._finish_future, finished, error)
+            except RuntimeError:
+                pass
+
+        thread = Thread(target=run_target, name=threadName)
+        self._componentThreads[threadName] = thread
+        thread.start()
+
+        await finished
+
+    def _finish_future(self, future, error):
+        if future.done():
+            return
+
+        if error:
+            future.set_exception(error)
+        else:
+            future.set_result(None)
+
+    async def _run_car_handling_task(self, stateBus, exitEvent):
+        # the events are handled in the event loop, only the wait for them is done in a thread
+        loop = asyncio.get_running_loop()
+        eventWaiter = ThreadPoolExecutor(max_workers=1, thread_name_prefix="controller")
+
+        loopMonitor = self._set_up_car_handling(stateBus, exitEvent)
+        try:
+            while not exitEvent.is_set():
+                events = await loop.run_in_executor(eventWaiter, self._xboxControl.wait_for_controller_events, 1.0)
+                self._handle_controller_events(events, stateBus, exitEvent, loopMonitor)
+        finally:
+            eventWaiter.shutdown()
+            self._clean_up_car_handling()
+
+    async def _run_arduino_task(self, exitEvent):
+        # the serial reads block, so they are done in a thread, while the time between them is awaited
+        loop = asyncio.get_running_loop()
+        serialReader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="arduino")
+        loopMonitor = self._loopMonitors.get("arduino")
+
+        try:
+            await loop.run_in_executor(serialReader, self._arduinoCommunicator.setup)
+
+            while not exitEvent.is_set():
+                if loopMonitor:
+                    loopMonitor.start_cycle()
+
+                await loop.run_in_executor(serialReader, self._arduinoCommunicator.start)
+
+                if loopMonitor:
+                    loopMonitor.end_cycle()
+
+                await asyncio.sleep(self._arduinoCommunicator.get_time_until_next_update())
+        finally:
+            serialReader.shutdown()
+            self._arduinoCommunicator.cleanup()
+            print("Exiting arduino")
+
+    def _start_listening_for_xbox_commands(self, stateBus, exitEvent):
+        self._tune_process("control")
+        loopMonitor = self._set_up_car_handling(stateBus, exitEvent)
+        self._report_worker_ready()
+
+        while not exitEvent.is_set():
+            events = self._xboxControl.wait_for_controller_events(timeout=1.0)
+            self._handle_controller_events(events, stateBus, exitEvent, loopMonitor)
+
+        self._clean_up_car_handling()
+
+    def _set_up_car_handling(self, stateBus, exitEvent):
         self._print_button_explanation()
-        self._map_all_objects_to_buttons()
+        self._compile_dispatch_table()
 
         if self._car:
             self._car.setup()
@@ -125,22 +527,45 @@ class CarControl:
             for servo in self._servos:
                 servo.setup()
 
-        while not flag.value:
-            for event in self._xboxControl.get_controller_events():
-                button, pressValue = self._xboxControl.get_button_and_press_value_from_event(event)
-                if self._xboxControl.check_for_exit_event(button):
-                    self._exit_program(flag)
-                    break
+        # a restarted control worker doesn't know what the one before it published, and its car and
+        # camera controls start over, so the bus is told about them
+        stateBus.reset_published_values()
+        if self._cameraHelper:
+            self._cameraHelper.publish_control_values(stateBus)
+
+        # end the wait for controller events at once when another process starts the exit
+        wakeUpThread = Thread(target=self._wake_up_on_exit, args=(stateBus, exitEvent), daemon=True)
+        wakeUpThread.start()
+
+        loopMonitor = self._loopMonitors.get("control")
+        if loopMonitor and self._car and self._safeStopAfter:
+            watchdogThread = Thread(target=self._watch_control_loop, args=(loopMonitor, exitEvent), daemon=True)
+            watchdogThread.start()
+
+        return loopMonitor
+
+    def _handle_controller_events(self, events, stateBus, exitEvent, loopMonitor):
+        # a cycle is the handling of one batch of events, the wait before it is not counted
+        if loopMonitor and events:
+            loopMonitor.start_cycle()
 
-                # get the object to take action based on the button pushed
-                try:
-                    self._buttonToObjectDict[button].handle_xbox_input(button, pressValue)
-                except KeyError: # if key does not correspond to object, then go to next event
-                    continue
+        # a held trigger or stick sends bursts of axis events, and only the newest value needs handling
+        for event in self._xboxControl.coalesce_axis_events(events):
+            # the compiled dispatch table calls the handler for the event straight away
+            if not self._xboxControl.dispatch_event(event):
+                continue
 
-                if self._cameraHelper:
-                    self._cameraHelper.update_control_values_for_video_feed(shared_array)
+            if self._xboxControl.is_exit_requested():
+                self._exit_program(exitEvent)
+                break
 
+            if self._cameraHelper:
+                self._cameraHelper.publish_control_values(stateBus)
+
+        if loopMonitor:
+            loopMonitor.end_cycle()
+
+    def _clean_up_car_handling(self):
         if self._car:
             self._car.cleanup()
 
@@ -152,26 +577,120 @@ class CarControl:
 
         print("Exiting car handling")
 
-    def _start_camera(self, shared_array, flag):
+    def _wake_up_on_exit(self, stateBus, exitEvent):
+        exitEvent.wait()
+        self._xboxControl.wake_up()
+
+        # the state subscribers wait for changes, so they need waking up as well
+        stateBus.wake_subscribers()
+
+    def _watch_control_loop(self, loopMonitor, exitEvent):
+        # runs in a thread of the control process, so the car can be stopped while the loop is stuck
+        checkInterval = min(loopMonitor.get_deadline(), self._safeStopAfter) / 2
+        carStopped = False
+
+        while not exitEvent.wait(checkInterval):
+            if loopMonitor.get_overdue_time() <= self._safeStopAfter:
+                carStopped = False
+                continue
+
+            # the car is stopped once for each stall, the next controller input drives it again
+            if not carStopped:
+                self._car.safe_stop()
+                loopMonitor.add_safe_stop()
+                carStopped = True
+                print("Control loop stalled, car stopped")
+
+    def _start_camera(self, stateBus, exitEvent):
+        self._tune_process("camera")
         self._camera.setup()
+        stateSubscriber = stateBus.subscribe()
+        self._report_worker_ready()
+        loopMonitor = self._loopMonitors.get("camera")
 
-        while not flag.value:
-            self._camera.show_camera_feed(shared_array)
+        while not exitEvent.is_set():
+            if loopMonitor:
+                loopMonitor.start_cycle()
+
+            self._camera.show_camera_feed(stateSubscriber)
+
+            if loopMonitor:
+                loopMonitor.end_cycle()
+
+        # no more frames are coming, so the frame consumers can stop waiting
+        if self._frameRing:
+            self._frameRing.wake_readers()
 
         self._camera.cleanup()
 
-    def _start_listening_for_arduino_communication(self, flag):
+    def _start_frame_consumer(self, frameConsumer, frameRingInfo, exitEvent):
+        from frameRingBuffer import FrameRingReader
+        frameReader = FrameRingReader(*frameRingInfo)
+        frameConsumer.setup()
+        self._report_worker_ready()
+
+        while not exitEvent.is_set():
+            frame = frameReader.wait_for_latest_frame(timeout=0.5, stopEvent=exitEvent)
+            if not frame:
+                continue
+
+            # a frame the camera overwrote while it was copied never reaches the consumer
+            sequence, timestamp, image = frame
+            image = frameReader.copy_frame(sequence, image)
+            if image is not None:
+                frameConsumer.handle_frame(image, timestamp)
+
+        if frameReader.get_torn_frames():
+            print(f"{type(frameConsumer).__name__} dropped {frameReader.get_torn_frames()} frames "
+                  f"that the camera overwrote while they were copied")
+
+        frameConsumer.cleanup()
+        frameReader.cleanup()
+
+    def _start_state_subscriber(self, stateSubscriber, stateBus, exitEvent):
+        subscription = stateBus.subscribe()
+        stateSubscriber.setup()
+        self._report_worker_ready()
+
+        while not exitEvent.is_set():
+            changes = subscription.wait_for_changes(timeout=0.5, stopEvent=exitEvent)
+            if changes:
+                stateSubscriber.handle_state_changes(changes, time())
+
+        stateSubscriber.cleanup()
+
+    def _start_listening_for_arduino_communication(self, exitEvent):
+        self._tune_process("arduino")
         self._arduinoCommunicator.setup()
+        self._report_worker_ready()
+        loopMonitor = self._loopMonitors.get("arduino")
+
+        while not exitEvent.is_set():
+            if loopMonitor:
+                loopMonitor.start_cycle()
 
-        while not flag.value:
             # start the communicator
             self._arduinoCommunicator.start()
-            sleep(0.01)  # sleep too not use too much CPU resources
 
-        # cleanup when flag is set to true
+            if loopMonitor:
+                loopMonitor.end_cycle()
+
+            # sleep until the next reading or buzzer change, but wake up at once on exit
+            exitEvent.wait(self._arduinoCommunicator.get_time_until_next_update())
+
+        # cleanup when exit event is set
         self._arduinoCommunicator.cleanup()
         print("Exiting arduino")
 
+    def _tune_process(self, processName):
+        # called first thing in the new process, so the settings only apply to that process
+        processTuning = self._processTunings.get(processName)
+        if not processTuning or self._runtime == "asyncio":
+            return
+
+        processTuning.apply()
+        print(processTuning.get_report(processName.capitalize()))
+
     def _print_button_explanation(self):
         print()
         print("Controller layout: ")
@@ -187,7 +706,7 @@ class CarControl:
             for servo in self._servos:
                 print("Turn servo" + servo.get_plane() + ": " + servo.get_servo_buttons()["Servo"])
             print()
-        if self._camera:
+        if self._has_camera_controls():
             print("Camera controls")
             print("Zoom camera: " + self._cameraHelper.get_camera_buttons()["Zoom"])
             print("Turn HUD on or off: " + self._cameraHelper.get_camera_buttons()["HUD"])
@@ -195,23 +714,27 @@ class CarControl:
 
         print(f"Double tap {self._xboxControl.get_exit_button()} to exit")
 
-    def _map_all_objects_to_buttons(self):
+    def _compile_dispatch_table(self):
+        buttonHandlers = {}
         if self._car:
-            self._add_object_to_buttons(self._car.get_car_buttons(), self._car)
+            buttonHandlers.update(self._car.get_button_handlers())
 
         if self._servoEnabled:
             for servo in self._servos:
-                self._add_object_to_buttons(servo.get_servo_buttons(), servo)
+                buttonHandlers.update(servo.get_button_handlers())
 
-        if self._cameraHelper:
-            self._add_object_to_buttons(self._cameraHelper.get_camera_buttons(), self._cameraHelper)
+        if self._has_camera_controls():
+            buttonHandlers.update(self._cameraHelper.get_button_handlers())
+
+        self._xboxControl.compile_dispatch_table(buttonHandlers)
 
-    def _add_object_to_buttons(self, buttonDict, roboObject):
-        for button in list(buttonDict.values()):
-            self._buttonToObjectDict[button] = roboObject
+    def _has_camera_controls(self):
+        # the camera helper also publishes the control values for the telemetry logger, but zoom
+        # and HUD only do something if there is a camera
+        return self._cameraHelper and "camera" in self._get_enabled_components()
 
-    def _exit_program(self, flag):
-        flag.value = True
+    def _exit_program(self, exitEvent):
+        exitEvent.set()
         print("Exiting program...")
 
     def _check_if_X11_connected(self):
@@ -224,6 +747,6 @@ class CarControl:
         return not returnCode
 
 
-class X11ForwardingError(Exception):
+class X11ForwardingError(StartupError):
     pass
 
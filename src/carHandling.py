@@ -23,6 +23,7 @@ class CarHandling:
 		self._goReverse = False
 
 		self._gpioThrottle = None
+		self._lastGpioValues = None
 
 		self._pwmA = None
 		self._pwmB = None
@@ -37,9 +38,13 @@ class CarHandling:
 			"Reverse": "LT"
 		}
 
-		self._turnButtons = list(self._controlsDictTurnButtons.values())
-
-		self._gasAndReverseButtons = list(self._controlsDictThrottle.values())
+		# handlers for each button, used when the controller's dispatch table is compiled
+		self._buttonHandlers = {
+			self._controlsDictTurnButtons["Left"]: self.handle_turn_left,
+			self._controlsDictTurnButtons["Right"]: self.handle_turn_right,
+			self._controlsDictThrottle["Gas"]: self.handle_gas,
+			self._controlsDictThrottle["Reverse"]: self.handle_reverse
+		}
 
 	def setup(self):
 		GPIO.setmode(GPIO.BOARD)
@@ -60,12 +65,40 @@ class CarHandling:
 		self._gpioThrottle = {True: GPIO.HIGH, False: GPIO.LOW}
 
 	def handle_xbox_input(self, button, pressValue):
-		if button in self._turnButtons:
-			self._prepare_car_for_turning(button, pressValue)
-			self._move_car()
-		elif button in self._gasAndReverseButtons:
-			self._prepare_car_for_throttle(button, pressValue)
-			self._move_car()
+		handler = self._buttonHandlers.get(button)
+		if handler:
+			handler(pressValue)
+
+	def handle_turn_left(self, buttonState):
+		self._prepare_car_for_turning(buttonState, turnLeft=True)
+		self._move_car()
+
+	def handle_turn_right(self, buttonState):
+		self._prepare_car_for_turning(buttonState, turnLeft=False)
+		self._move_car()
+
+	def handle_gas(self, buttonPressValue):
+		self._prepare_car_for_throttle(buttonPressValue, forward=True)
+		self._move_car()
+
+	def handle_reverse(self, buttonPressValue):
+		self._prepare_car_for_throttle(buttonPressValue, forward=False)
+		self._move_car()
+
+	def get_button_handlers(self):
+		return self._buttonHandlers
+
+	def safe_stop(self):
+		# stops the motors, and lets go of throttle and turning, until the next controller input
+		self._goForward = False
+		self._goReverse = False
+		self._turnLeft = False
+		self._turnRight = False
+
+		self._change_duty_cycle([self._pwmA, self._pwmB], 0)
+		self._speed = 0
+
+		self._adjust_gpio_values([False, False, False, False])
 
 	def cleanup(self):
 		self._pwmA.stop()
@@ -94,6 +127,11 @@ class CarHandling:
 			pwm.ChangeDutyCycle(speed)
 
 	def _adjust_gpio_values(self, gpioValues):
+		# the pins keep their values, so they are only set when the direction changes
+		if gpioValues == self._lastGpioValues:
+			return
+		self._lastGpioValues = gpioValues
+
 		leftForwardValue, rightForwardValue, leftBackwardValue, rightBackwardValue = gpioValues
 
 		GPIO.output(self._leftForward, self._gpioThrottle[leftForwardValue])
@@ -126,15 +164,12 @@ class CarHandling:
 
 		self._adjust_gpio_values(gpioValues)
 
-	def _prepare_car_for_turning(self, button, buttonState):
+	def _prepare_car_for_turning(self, buttonState, turnLeft):
 		stopTurning = False
 
-		if button == "D-PAD left" and buttonState == 1:
-			self._turnLeft = True
-			self._turnRight = False
-		elif button == "D-PAD right" and buttonState == 1:
-			self._turnLeft = False
-			self._turnRight = True
+		if buttonState == 1:
+			self._turnLeft = turnLeft
+			self._turnRight = not turnLeft
 		else:
 			self._turnLeft = False
 			self._turnRight = False
@@ -144,7 +179,7 @@ class CarHandling:
 			if not self._goForward and not self._goReverse:
 				self._change_duty_cycle([self._pwmA, self._pwmB], self._pwmMaxTT)
 
-	def _prepare_car_for_throttle(self, button, buttonPressValue):
+	def _prepare_car_for_throttle(self, buttonPressValue, forward):
 		speed = map_value_to_new_scale(
 			buttonPressValue,
 			self._pwmMinTT,
@@ -152,12 +187,8 @@ class CarHandling:
 			2
 		)
 		if speed > self._pwmMinTT + 1: # only change speed if over the treshold
-			if button == "RT":
-				self._goForward = True
-				self._goReverse = False
-			elif button == "LT":
-				self._goForward = False
-				self._goReverse = True
+			self._goForward = forward
+			self._goReverse = not forward
 		else:
 			speed = 0
 
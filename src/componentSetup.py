@@ -0,0 +1,458 @@
+from configparser import ConfigParser
+from concurrent.futures import ThreadPoolExecutor
+from roboCarHelper import StartupError, print_startup_error, convert_from_board_number_to_bcm_number
+from startupProfiler import StartupProfiler, measure_startup
+import os
+
+# each component is imported by its setup function, so cv2, pygame, pigpio, serial and RPi.GPIO
+# are only imported when a component that needs them is enabled
+
+class ComponentSpec:
+    # the sections of config.ini as plain dicts, which is all a spawned worker is sent to
+    # build its own components from
+    def __init__(self, parser):
+        self._sections = {section: dict(parser[section]) for section in parser.sections()}
+
+    def get_parser(self):
+        parser = ConfigParser()
+        parser.read_dict(self._sections)
+
+        return parser
+
+    def get_enabled_components(self):
+        # the components the workers build, which the parent only knows of from the config
+        return get_enabled_hardware_components(self.get_parser())
+
+    def get_max_camera_resolution(self):
+        parser = self.get_parser()
+
+        resolutionGovernor = setup_resolution_governor(parser)
+        if resolutionGovernor:
+            return resolutionGovernor.get_max_resolution()
+
+        cameraSpecs = parser["Camera.specs"]
+        return cameraSpecs.getint("ResolutionWidth"), cameraSpecs.getint("ResolutionHeight")
+
+    def run_worker(self, workerName, workerState, readyWriter, targetName, args):
+        # the first thing that runs in a spawned worker, which has none of the parent's components.
+        # A missing controller or arduino would be missing again after a restart, so the worker
+        # exits with a code that tells the supervisor not to restart it
+        from carControl import CarControl
+
+        parser = self.get_parser()
+        startupProfiler = setup_startup_profiler(parser, f"{workerName} worker")
+        if startupProfiler:
+            startupProfiler.start_import_timing()
+
+        try:
+            with measure_startup(startupProfiler, "controller" if workerName == "control" else "car controller"):
+                carController = CarControl(x11Required=False, controllerRequired=workerName == "control")
+            carController.set_component_spec(self)
+            add_hardware_components(carController, parser, workerName, workerState["frameConsumers"], startupProfiler)
+        except StartupError as e:
+            print_startup_error(e)
+            exit(CarControl.startupErrorExitCode)
+        finally:
+            if startupProfiler:
+                startupProfiler.stop_import_timing()
+
+        if startupProfiler:
+            print(startupProfiler.get_report())
+
+        carController.run_worker(workerState, readyWriter, targetName, args)
+
+
+def get_enabled_hardware_components(parser):
+    enabledComponents = parser["Components.enabled"]
+
+    components = {
+        "car": enabledComponents.getboolean("CarHandling"),
+        "servo": enabledComponents.getboolean("ServoHorizontal") or enabledComponents.getboolean("ServoVertical"),
+        "camera": enabledComponents.getboolean("Camera"),
+        "arduino": enabledComponents.getboolean("ArduinoCommunicator")
+    }
+
+    return {componentName for componentName, enabled in components.items() if enabled}
+
+
+def add_hardware_components(carController, parser, workerName=None, frameConsumers=(), startupProfiler=None):
+    # without a worker name every component is added to this process. A spawned worker only
+    # adds the components of its own loop
+    components = setup_hardware_components(parser, workerName, startupProfiler)
+    add_components(carController, parser, components, frameConsumers)
+
+
+def setup_hardware_components(parser, workerName=None, startupProfiler=None):
+    # the components are set up at the same time, so the others don't wait while the arduino starts
+    componentSetups = {}
+    if workerName in (None, "control"):
+        componentSetups["car"] = (setup_car, parser)
+        componentSetups["horizontal servo"] = (setup_servo, parser, "horizontal")
+        componentSetups["vertical servo"] = (setup_servo, parser, "vertical")
+
+    if workerName in (None, "arduino"):
+        componentSetups["arduino communicator"] = (setup_arduino_communicator, parser)
+
+    if workerName in (None, "camera"):
+        componentSetups["camera"] = (setup_camera, parser)
+
+    if not componentSetups:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=len(componentSetups)) as executor:
+        componentFutures = {
+            componentName: executor.submit(_setup_component, startupProfiler, componentName, *componentSetup)
+            for componentName, componentSetup in componentSetups.items()
+        }
+
+    # a component that couldn't be set up raises its error here
+    return {componentName: componentFuture.result() for componentName, componentFuture in componentFutures.items()}
+
+
+def add_components(carController, parser, components, frameConsumers=()):
+    # the components are added in a fixed order, whichever was set up first
+    car = components.get("car")
+    if car:
+        carController.add_car(car)
+
+    servoHorizontal = components.get("horizontal servo")
+    if servoHorizontal:
+        carController.add_servo(servoHorizontal)
+
+    servoVertical = components.get("vertical servo")
+    if servoVertical:
+        carController.add_servo(servoVertical)
+
+    # the camera helper publishes the control values on the state bus, for the camera and the other
+    # subscribers, so it is added with the car and servos
+    enabledComponents = parser["Components.enabled"]
+    if "car" in components and (enabledComponents.getboolean("Camera") or
+                                enabledComponents.getboolean("TelemetryLogger", False)):
+        from cameraHelper import CameraHelper
+        cameraHelper = CameraHelper()
+        cameraHelper.add_car(car)
+        cameraHelper.add_servo(servoHorizontal)
+
+        carController.add_camera_helper(cameraHelper)
+
+    arduinoCommunicator = components.get("arduino communicator")
+    if arduinoCommunicator:
+        carController.add_arduino_communicator(arduinoCommunicator)
+
+        # the detector runs in its own process, and the honker reads its score from shared memory
+        for frameConsumer in frameConsumers:
+            if getattr(frameConsumer, "providesObstacleScore", False):
+                arduinoCommunicator.add_obstacle_detector(frameConsumer)
+
+    camera = components.get("camera")
+    if camera:
+        carController.add_camera(camera)
+
+
+def _setup_component(startupProfiler, componentName, setupFunction, *args):
+    with measure_startup(startupProfiler, componentName):
+        return setupFunction(*args)
+
+
+def setup_camera(parser):
+    if not parser["Components.enabled"].getboolean("Camera"):
+        return None
+
+    from camera import Camera
+    from mjpegStreamer import MjpegStreamer
+    from frameSources import VideoFileSource
+    from pipelineProfiler import PipelineProfiler
+
+    cameraSpecs = parser["Camera.specs"]
+
+    resolutionWidth = cameraSpecs.getint("ResolutionWidth")
+    resolutionHeight = cameraSpecs.getint("ResolutionHeight")
+
+    resolution = (resolutionWidth, resolutionHeight)
+    camera = Camera(resolution)
+
+    if cameraSpecs.getboolean("ThreadedCapture", False):
+        camera.set_threaded_capture_enabled()
+
+    displayBackend = cameraSpecs.get("DisplayBackend", "x11")
+    if displayBackend == "mjpeg":
+        streamPort = cameraSpecs.getint("StreamPort", 8000)
+        jpegQuality = cameraSpecs.getint("JpegQuality", 80)
+        camera.add_mjpeg_streamer(MjpegStreamer(streamPort, jpegQuality=jpegQuality))
+    elif displayBackend == "none":
+        camera.set_display_disabled()
+
+    videoFile = cameraSpecs.get("VideoFile", "")
+    if videoFile:
+        camera.add_frame_source(VideoFileSource(videoFile))
+
+    resolutionGovernor = setup_resolution_governor(parser)
+    if resolutionGovernor:
+        camera.add_resolution_governor(resolutionGovernor)
+
+    if cameraSpecs.getboolean("StageTiming", False):
+        frameBudget = cameraSpecs.getfloat("FrameBudgetMs", 40) / 1000
+        camera.add_pipeline_profiler(PipelineProfiler(Camera.pipelineStages, frameBudget))
+
+    return camera
+
+
+def setup_video_recorder(parser):
+    if not parser["Components.enabled"].getboolean("Recorder", False):
+        return None
+
+    from videoRecorder import VideoRecorder
+
+    recorderSpecs = parser["Recorder.specs"]
+
+    folder = recorderSpecs.get("Folder", "recordings")
+    if not os.path.isabs(folder):
+        folder = os.path.join(os.path.dirname(__file__), folder)
+
+    videoRecorder = VideoRecorder(
+        folder,
+        recorderSpecs.getfloat("SegmentLength", 60),
+        recorderSpecs.getint("QueueSize", 30),
+        recorderSpecs.get("DropPolicy", "oldest"),
+        recorderSpecs.get("Codec", "MJPG"),
+        recorderSpecs.getint("FrameRate", 30)
+    )
+
+    return videoRecorder
+
+
+def setup_obstacle_detector(parser):
+    if not parser["Components.enabled"].getboolean("ObstacleDetector", False):
+        return None
+
+    from obstacleDetector import ObstacleDetector
+
+    detectorSpecs = parser["ObstacleDetector.specs"]
+
+    detectionSize = (detectorSpecs.getint("DetectionWidth", 80), detectorSpecs.getint("DetectionHeight", 60))
+    edgeDensityRange = (detectorSpecs.getfloat("MinEdgeDensity", 0.02), detectorSpecs.getfloat("MaxEdgeDensity", 0.15))
+
+    obstacleDetector = ObstacleDetector(
+        detectionSize,
+        detectorSpecs.getfloat("FloorRegion", 0.4),
+        edgeDensityRange,
+        detectorSpecs.getint("MaxRate", 15)
+    )
+
+    return obstacleDetector
+
+
+def setup_telemetry_logger(parser):
+    if not parser["Components.enabled"].getboolean("TelemetryLogger", False):
+        return None
+
+    from telemetryLogger import TelemetryLogger
+
+    telemetrySpecs = parser["Telemetry.specs"]
+
+    folder = telemetrySpecs.get("Folder", "telemetry")
+    if not os.path.isabs(folder):
+        folder = os.path.join(os.path.dirname(__file__), folder)
+
+    telemetryLogger = TelemetryLogger(folder, telemetrySpecs.getfloat("FlushInterval", 1.0))
+
+    return telemetryLogger
+
+
+def setup_loop_monitors(parser):
+    if not parser.has_section("Loop.monitor"):
+        return {}
+
+    monitorSpecs = parser["Loop.monitor"]
+    if not monitorSpecs.getboolean("Enabled", False):
+        return {}
+
+    from loopMonitor import LoopMonitor
+
+    loopMonitors = {
+        "control": LoopMonitor("Control", monitorSpecs.getfloat("ControlDeadlineMs", 20) / 1000),
+        "camera": LoopMonitor("Camera", monitorSpecs.getfloat("CameraDeadlineMs", 100) / 1000),
+        "arduino": LoopMonitor("Arduino", monitorSpecs.getfloat("ArduinoDeadlineMs", 50) / 1000)
+    }
+
+    return loopMonitors
+
+
+def setup_process_tunings(parser):
+    if not parser.has_section("Process.tuning"):
+        return {}
+
+    tuningSpecs = parser["Process.tuning"]
+    if not tuningSpecs.getboolean("Enabled", False):
+        return {}
+
+    from processTuning import ProcessTuning
+
+    processTunings = {}
+    for processName in ("control", "camera", "arduino"):
+        settingPrefix = processName.capitalize()
+
+        cores = tuningSpecs.get(settingPrefix + "Cores", "")
+        cores = [int(core) for core in cores.split(",") if core.strip()]
+
+        scheduler = tuningSpecs.get(settingPrefix + "Scheduler", "") or None
+
+        # empty settings are left as they are
+        priority = tuningSpecs.get(settingPrefix + "Priority", "")
+        priority = int(priority) if priority else None
+
+        niceness = tuningSpecs.get(settingPrefix + "Nice", "")
+        niceness = int(niceness) if niceness else None
+
+        processTunings[processName] = ProcessTuning(cores, scheduler, priority, niceness)
+
+    return processTunings
+
+
+def setup_resolution_governor(parser):
+    if not parser.has_section("Camera.governor"):
+        return None
+
+    governorSpecs = parser["Camera.governor"]
+    if not governorSpecs.getboolean("Enabled", False):
+        return None
+
+    from resolutionGovernor import ResolutionGovernor
+
+    # each step of the ladder is written as widthxheight@framerate
+    ladder = []
+    for step in governorSpecs.get("Ladder").split(","):
+        resolution, frameRate = step.strip().split("@")
+        width, height = resolution.split("x")
+        ladder.append(((int(width), int(height)), int(frameRate)))
+
+    resolutionGovernor = ResolutionGovernor(
+        ladder,
+        governorSpecs.getfloat("DowngradeAfter", 3.0),
+        governorSpecs.getfloat("UpgradeAfter", 10.0),
+        governorSpecs.getfloat("Headroom", 1.3)
+    )
+
+    return resolutionGovernor
+
+
+def check_if_x11_required(parser):
+    # X11 forwarding is only needed when the camera feed is shown with cv2.imshow
+    if not parser["Components.enabled"].getboolean("Camera"):
+        return False
+
+    return parser["Camera.specs"].get("DisplayBackend", "x11") == "x11"
+
+
+def setup_arduino_communicator(parser):
+    if not parser["Components.enabled"].getboolean("ArduinoCommunicator"):
+        return None
+
+    from arduinoCommunicator import ArduinoCommunicator
+
+    arduinoCommunicatorData = parser["Arduino.specs"]
+
+    port = arduinoCommunicatorData.get("Port")
+    baudrate = arduinoCommunicatorData.getint("Baudrate", 9600)
+
+    arduinoCommunicator = ArduinoCommunicator(port, baudrate)
+
+    if arduinoCommunicatorData.getboolean("BatchedReadings", False):
+        arduinoCommunicator.set_batched_readings_enabled()
+
+    if arduinoCommunicatorData.get("Protocol", "text") == "binary":
+        arduinoCommunicator.set_binary_protocol_enabled()
+
+    buzzerPin = parser["Distance.buzzer.pin"].getint("Buzzer")
+
+    if parser["Components.enabled"].getboolean("DistanceBuzzer"):
+        arduinoCommunicator.activate_distance_sensors(buzzerPin)
+
+    if parser["Components.enabled"].getboolean("ProgressiveLights"):
+        progressiveLightPins = []
+        lightPins = parser["Progressive.light.pins"]
+        for key in lightPins:
+            progressiveLightPins.append(lightPins.getint(key))
+
+        arduinoCommunicator.activate_photocell_lights(progressiveLightPins)
+
+    return arduinoCommunicator
+
+
+def setup_servo(parser, plane):
+    if plane == "horizontal":
+        if not parser["Components.enabled"].getboolean("ServoHorizontal"):
+            return None
+    elif plane == "vertical":
+        if not parser["Components.enabled"].getboolean("ServoVertical"):
+            return None
+
+    from servoHandling import ServoHandling
+
+    servoData = parser[f"Servo.handling.specs.{plane}"]
+
+    servoPin = servoData.getint("ServoPin")
+    minAngle = servoData.getint("MinAngle")
+    maxAngle = servoData.getint("MaxAngle")
+
+    servoPin = servoPin
+    servoPin = convert_from_board_number_to_bcm_number(servoPin)
+
+    servo = ServoHandling(
+        servoPin,
+        plane,
+        minAngle,
+        maxAngle
+    )
+
+    return servo
+
+
+def setup_car(parser):
+    if not parser["Components.enabled"].getboolean("CarHandling"):
+        return None
+
+    from carHandling import CarHandling
+
+    carHandlingPins = parser["Car.handling.pins"]
+
+    # define GPIO pins
+    rightForward = carHandlingPins.getint("RightForward")
+    rightBackward = carHandlingPins.getint("RightBackward")
+    leftForward = carHandlingPins.getint("LeftForward")
+    leftBackward = carHandlingPins.getint("LeftBackward")
+    enA = carHandlingPins.getint("EnA")
+    enB = carHandlingPins.getint("EnB")
+    minPwmTT = carHandlingPins.getint("MinimumMotorPWM")
+    maxPwmTT = carHandlingPins.getint("MaximumMotorPWM")
+
+    # define car handling
+    car = CarHandling(
+        leftBackward,
+        leftForward,
+        rightBackward,
+        rightForward,
+        enA,
+        enB,
+        minPwmTT,
+        maxPwmTT
+    )
+
+    return car
+
+
+def setup_startup_profiler(parser, processName="main"):
+    if not parser.has_section("Startup.profile"):
+        return None
+
+    profileSpecs = parser["Startup.profile"]
+    if not profileSpecs.getboolean("Enabled", False):
+        return None
+
+    startupProfiler = StartupProfiler(
+        processName,
+        profileSpecs.getfloat("MinImportMs", 5) / 1000,
+        profileSpecs.getint("ImportDepth", 2)
+    )
+
+    return startupProfiler
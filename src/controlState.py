@@ -0,0 +1,78 @@
+from multiprocessing import RawArray, Value
+from time import sleep
+
+class ControlState:
+    def __init__(self, initialValues):
+        self._fieldIndexes = {field: index for index, field in enumerate(initialValues)}
+
+        # the values are shared without a lock. The version is odd while the writer is
+        # changing the values, and readers retry until they see the same even version
+        # before and after copying them.
+        # Only the version has a lock, which is held for a single load or store. Taking it is a
+        # memory fence, which python doesn't have otherwise, so the readers see the stores of the
+        # writer in order also on the ARM cores of the pi, which may reorder them
+        self._values = RawArray('d', [float(value) for value in initialValues.values()])
+        self._version = Value('Q', 0)
+
+        # the version each value was last written at, so readers can tell which values changed
+        self._fieldVersions = RawArray('Q', len(initialValues))
+
+        self._spinsBeforeYield = 10
+        self._readRetries = 0
+
+    def write(self, values):
+        # only one process may write, the readers can be in any number of processes
+        newVersion = self._version.value + 2
+        self._version.value = newVersion - 1
+
+        for field, value in values.items():
+            index = self._fieldIndexes[field]
+            self._values[index] = value
+            self._fieldVersions[index] = newVersion
+
+        self._version.value = newVersion
+
+    def read(self):
+        version, values = self._read_consistently(self._copy_values)
+
+        return version, dict(zip(self._fieldIndexes, values))
+
+    def read_changes(self, sinceVersion):
+        # returns the values that have been written after the given version
+        version, (values, fieldVersions) = self._read_consistently(self._copy_values_and_field_versions)
+
+        changes = {field: value for field, value, fieldVersion in zip(self._fieldIndexes, values, fieldVersions)
+                   if fieldVersion > sinceVersion}
+
+        return version, changes
+
+    def get_version(self):
+        return self._version.value
+
+    def get_fields(self):
+        return list(self._fieldIndexes)
+
+    def get_read_retries(self):
+        return self._readRetries
+
+    def _copy_values(self):
+        return self._values[:] # a single copy of all the values
+
+    def _copy_values_and_field_versions(self):
+        return self._values[:], self._fieldVersions[:]
+
+    def _read_consistently(self, copyFunction):
+        attempts = 0
+        while True:
+            versionBefore = self._version.value
+            if not versionBefore % 2:
+                copy = copyFunction()
+                if self._version.value == versionBefore:
+                    return versionBefore, copy
+
+            attempts += 1
+            self._readRetries += 1
+
+            # the writer can be paused in the middle of a write, so let it finish
+            if attempts % self._spinsBeforeYield == 0:
+                sleep(0)
@@ -0,0 +1,56 @@
+from math import sqrt
+from multiprocessing import RawArray
+
+class DurationHistogram:
+    defaultPercentiles = (("p50", 0.5), ("p99", 0.99))
+
+    def __init__(self, numberOfBuckets=24):
+        # bucket i counts durations from 2^(i-1) up to 2^i microseconds. Everything is shared
+        # without locks, so the statistics can be read from any process while durations are recorded
+        self._numberOfBuckets = numberOfBuckets
+        self._buckets = RawArray('Q', numberOfBuckets)
+
+        # sum and sum of squares of the durations, and the longest duration
+        self._durationSums = RawArray('d', 3)
+
+    def record(self, duration):
+        bucket = min(int(duration * 1e6).bit_length(), self._numberOfBuckets - 1)
+        self._buckets[bucket] += 1
+
+        self._durationSums[0] += duration
+        self._durationSums[1] += duration ** 2
+        if duration > self._durationSums[2]:
+            self._durationSums[2] = duration
+
+    def get_statistics(self, percentiles=defaultPercentiles):
+        # the buckets are copied first, so the percentiles are taken from the same durations
+        buckets = self._buckets[:]
+        durationSum, squaredDurationSum, maxDuration = self._durationSums
+        count = sum(buckets)
+
+        mean = durationSum / count if count else 0.0
+        variance = max(squaredDurationSum / count - mean ** 2, 0.0) if count else 0.0
+
+        statistics = {
+            "count": count,
+            "mean": mean,
+            "jitter": sqrt(variance),
+            "max": maxDuration
+        }
+        for name, percentile in percentiles:
+            statistics[name] = self._get_percentile(buckets, count, percentile)
+
+        return statistics
+
+    def _get_percentile(self, buckets, count, percentile):
+        # returns the upper limit of the bucket the percentile falls in, in seconds
+        if not count:
+            return 0.0
+
+        accumulated = 0
+        for bucket, bucketCount in enumerate(buckets):
+            accumulated += bucketCount
+            if accumulated >= percentile * count:
+                return (1 << bucket) / 1e6
+
+        return (1 << (self._numberOfBuckets - 1)) / 1e6
@@ -0,0 +1,68 @@
+from threading import Thread, Condition
+
+class FrameGrabber:
+    def __init__(self, captureFunction):
+        self._captureFunction = captureFunction
+
+        self._newFrameCondition = Condition()
+        self._latestFrame = None
+        self._latestSequence = 0
+        self._lastTakenSequence = 0
+
+        self._droppedFrames = 0
+
+        # an error in the capture thread is raised again to the one taking the frames, so the
+        # camera worker stops and can be restarted instead of waiting for frames that never come
+        self._captureError = None
+
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = Thread(target=self._capture_frames, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join()
+
+    def get_latest_frame(self, timeout=None):
+        with self._newFrameCondition:
+            if not self._newFrameCondition.wait_for(self._check_if_new_frame_available, timeout):
+                return None
+
+            if self._captureError:
+                raise self._captureError
+
+            # every frame captured since the last one taken was never shown
+            self._droppedFrames += self._latestSequence - self._lastTakenSequence - 1
+            self._lastTakenSequence = self._latestSequence
+
+            return self._latestFrame
+
+    def get_captured_frames(self):
+        return self._latestSequence
+
+    def get_dropped_frames(self):
+        return self._droppedFrames
+
+    def _capture_frames(self):
+        while self._running:
+            # capture outside of the lock so the display side is never held up by the camera
+            try:
+                frame = self._captureFunction()
+            except Exception as error:
+                with self._newFrameCondition:
+                    self._captureError = error
+                    self._newFrameCondition.notify_all()
+                return
+
+            with self._newFrameCondition:
+                self._latestFrame = frame
+                self._latestSequence += 1
+                self._newFrameCondition.notify_all()
+
+    def _check_if_new_frame_available(self):
+        return self._latestSequence != self._lastTakenSequence or self._captureError is not None
@@ -0,0 +1,183 @@
+import numpy as np
+from multiprocessing import shared_memory, Condition
+from time import time
+
+class FrameRingBuffer:
+    def __init__(self, maxFrameShape, numberOfSlots=4):
+        # every slot is big enough for the largest frame, smaller frames use the start of the slot
+        self._maxFrameShape = tuple(maxFrameShape)
+        self._numberOfSlots = numberOfSlots
+
+        self._sharedMemory = shared_memory.SharedMemory(
+            create=True,
+            size=_get_ring_size(self._maxFrameShape, numberOfSlots)
+        )
+        self._newFrameCondition = Condition()
+
+        self._sequences, self._timestamps, self._shapes, self._frames = _map_ring_arrays(
+            self._sharedMemory.buf,
+            self._maxFrameShape,
+            numberOfSlots
+        )
+        self._sequences[:] = 0
+        self._timestamps[:] = 0.0
+
+    def write(self, frame, timestamp=None):
+        sequence = int(self._sequences[0]) + 1
+        slot = 1 + sequence % self._numberOfSlots
+
+        # mark the slot as being written to, so readers can tell that the frame is torn
+        self._sequences[slot] = -1
+        np.copyto(_get_frame_view(self._frames[slot - 1], frame.shape), frame)
+        self._shapes[slot - 1] = frame.shape
+        self._timestamps[slot - 1] = timestamp if timestamp is not None else time()
+        self._sequences[slot] = sequence
+
+        self._sequences[0] = sequence
+
+        # wake up any readers waiting for a new frame
+        with self._newFrameCondition:
+            self._newFrameCondition.notify_all()
+
+        return sequence
+
+    def wake_readers(self):
+        # lets waiting readers check their stop event without waiting for a new frame
+        with self._newFrameCondition:
+            self._newFrameCondition.notify_all()
+
+    def __getstate__(self):
+        # a spawned worker gets the shared memory by name and maps the arrays onto it again,
+        # instead of getting a copy of the frames
+        state = self.__dict__.copy()
+        for arrayName in ("_sequences", "_timestamps", "_shapes", "_frames"):
+            del state[arrayName]
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._sequences, self._timestamps, self._shapes, self._frames = _map_ring_arrays(
+            self._sharedMemory.buf,
+            self._maxFrameShape,
+            self._numberOfSlots
+        )
+
+    def get_attach_info(self):
+        return self._sharedMemory.name, self._maxFrameShape, self._numberOfSlots, self._newFrameCondition
+
+    def get_max_frame_shape(self):
+        return self._maxFrameShape
+
+    def cleanup(self):
+        # the numpy views need to be released before the shared memory can be closed
+        self._sequences = None
+        self._timestamps = None
+        self._shapes = None
+        self._frames = None
+
+        self._sharedMemory.close()
+        self._sharedMemory.unlink()
+
+
+class FrameRingReader:
+    def __init__(self, name, maxFrameShape, numberOfSlots, newFrameCondition):
+        self._numberOfSlots = numberOfSlots
+        self._newFrameCondition = newFrameCondition
+
+        self._sharedMemory = shared_memory.SharedMemory(name=name)
+        self._sequences, self._timestamps, self._shapes, self._frames = _map_ring_arrays(
+            self._sharedMemory.buf,
+            tuple(maxFrameShape),
+            numberOfSlots
+        )
+
+        self._lastSequence = 0
+        self._skippedFrames = 0
+        self._tornFrames = 0
+
+    def read_latest_frame(self):
+        latestSequence = int(self._sequences[0])
+        if latestSequence == self._lastSequence:
+            return None # no new frame since last read
+
+        slot = 1 + latestSequence % self._numberOfSlots
+        if self._sequences[slot] != latestSequence:
+            return None # the writer has already lapped this slot
+
+        # readers that are slower than the camera skip straight to the newest frame
+        if self._lastSequence:
+            self._skippedFrames += latestSequence - self._lastSequence - 1
+        self._lastSequence = latestSequence
+
+        frame = _get_frame_view(self._frames[slot - 1], tuple(self._shapes[slot - 1]))
+
+        return latestSequence, float(self._timestamps[slot - 1]), frame
+
+    def wait_for_latest_frame(self, timeout=None, stopEvent=None):
+        with self._newFrameCondition:
+            self._newFrameCondition.wait_for(
+                lambda: int(self._sequences[0]) != self._lastSequence or (stopEvent and stopEvent.is_set()),
+                timeout
+            )
+
+        return self.read_latest_frame()
+
+    def is_frame_still_valid(self, sequence):
+        # a frame returned by the reader is a view into the ring, so it is only valid
+        # until the writer comes around to the same slot again
+        slot = 1 + sequence % self._numberOfSlots
+        return self._sequences[slot] == sequence
+
+    def copy_frame(self, sequence, frame):
+        # the frame is a view into the ring, so it is copied out of it. The writer may have come around
+        # to the slot while it was copied, and then the copy is torn, so it is counted and None is returned
+        frameCopy = frame.copy()
+        if self.is_frame_still_valid(sequence):
+            return frameCopy
+
+        self._tornFrames += 1
+        return None
+
+    def get_skipped_frames(self):
+        return self._skippedFrames
+
+    def get_torn_frames(self):
+        return self._tornFrames
+
+    def cleanup(self):
+        self._sequences = None
+        self._timestamps = None
+        self._shapes = None
+        self._frames = None
+
+        self._sharedMemory.close()
+
+
+def _get_ring_size(maxFrameShape, numberOfSlots):
+    sequenceBytes = (1 + numberOfSlots) * np.dtype(np.int64).itemsize
+    timestampBytes = numberOfSlots * np.dtype(np.float64).itemsize
+    shapeBytes = numberOfSlots * len(maxFrameShape) * np.dtype(np.int64).itemsize
+    frameBytes = numberOfSlots * int(np.prod(maxFrameShape))
+
+    return sequenceBytes + timestampBytes + shapeBytes + frameBytes
+
+def _map_ring_arrays(buffer, maxFrameShape, numberOfSlots):
+    # layout of the shared memory block: [latest sequence number, sequence number per slot]
+    # [timestamp per slot][frame shape per slot][frame per slot]
+    sequences = np.ndarray((1 + numberOfSlots,), dtype=np.int64, buffer=buffer)
+    offset = sequences.nbytes
+
+    timestamps = np.ndarray((numberOfSlots,), dtype=np.float64, buffer=buffer, offset=offset)
+    offset += timestamps.nbytes
+
+    shapes = np.ndarray((numberOfSlots, len(maxFrameShape)), dtype=np.int64, buffer=buffer, offset=offset)
+    offset += shapes.nbytes
+
+    frames = np.ndarray((numberOfSlots, int(np.prod(maxFrameShape))), dtype=np.uint8, buffer=buffer, offset=offset)
+
+    return sequences, timestamps, shapes, frames
+
+def _get_frame_view(slot, frameShape):
+    # the frame is stored contiguously at the start of the slot
+    return slot[:int(np.prod(frameShape))].reshape(frameShape)
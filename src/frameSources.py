@@ -0,0 +1,154 @@
+import cv2
+import numpy as np
+import os
+os.environ["LIBCAMERA_LOG_LEVELS"] = "3" #disable info and warning logging
+from time import time, sleep
+
+# picamera2 and libcamera take long to import, so they are only imported when the camera is opened
+Picamera2 = None
+Transform = None
+
+class Picamera2Source:
+    def __init__(self, rotation=True):
+        self._rotation = rotation
+        self._picam2 = None
+
+    def open(self, resolution, frameRate=None):
+        _import_picamera2()
+        if not Picamera2:
+            raise FrameSourceError("picamera2 is not installed, use another frame source")
+
+        self._picam2 = Picamera2()
+        self._configure(resolution, frameRate)
+
+    def capture(self):
+        return self._picam2.capture_array()
+
+    def reconfigure(self, resolution, frameRate=None):
+        self._picam2.stop()
+        self._configure(resolution, frameRate)
+
+    def close(self):
+        self._picam2.close()
+
+    def _configure(self, resolution, frameRate):
+        configOptions = {"transform": Transform(vflip=self._rotation)}
+        if frameRate:
+            configOptions["controls"] = {"FrameRate": frameRate}
+
+        # set resolution, format and rotation of camera feed
+        config = self._picam2.create_preview_configuration(
+            {"size": resolution, "format": "RGB888"},
+            **configOptions
+        )
+        self._picam2.configure(config)
+        self._picam2.start()
+
+
+class VideoFileSource:
+    def __init__(self, path, loop=True):
+        self._path = path
+        self._loop = loop
+        self._videoCapture = None
+        self._resolution = None
+
+    def open(self, resolution, frameRate=None):
+        self._videoCapture = cv2.VideoCapture(self._path)
+        if not self._videoCapture.isOpened():
+            raise FrameSourceError(f"Could not open video file {self._path}")
+
+        self._resolution = resolution
+
+    def capture(self):
+        success, frame = self._videoCapture.read()
+        if not success and self._loop:
+            # start over from the first frame when the end of the file is reached
+            self._videoCapture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, frame = self._videoCapture.read()
+
+        if not success:
+            raise FrameSourceError(f"No more frames in video file {self._path}")
+
+        if (frame.shape[1], frame.shape[0]) != self._resolution:
+            frame = cv2.resize(frame, self._resolution)
+
+        return frame
+
+    def reconfigure(self, resolution, frameRate=None):
+        self._resolution = resolution
+
+    def close(self):
+        self._videoCapture.release()
+
+
+class SyntheticSource:
+    def __init__(self, numberOfFrames=30, frameRate=None):
+        self._numberOfFrames = numberOfFrames
+        self._frameRate = frameRate
+
+        self._frames = []
+        self._frameNumber = 0
+        self._lastCaptureTime = None
+
+    def open(self, resolution, frameRate=None):
+        self._frames = self._create_frames(resolution)
+
+        if frameRate:
+            self._frameRate = frameRate
+
+    def capture(self):
+        # behave like a sensor with a fixed frame rate, if one is given
+        if self._frameRate and self._lastCaptureTime:
+            waitTime = 1 / self._frameRate - (time() - self._lastCaptureTime)
+            if waitTime > 0:
+                sleep(waitTime)
+        self._lastCaptureTime = time()
+
+        frame = self._frames[self._frameNumber % self._numberOfFrames]
+        self._frameNumber += 1
+
+        # a camera returns a new array for every frame, and the frame is drawn on later
+        return frame.copy()
+
+    def reconfigure(self, resolution, frameRate=None):
+        self.open(resolution, frameRate)
+
+    def close(self):
+        self._frames = []
+
+    def _create_frames(self, resolution):
+        width, height = resolution
+
+        # a colour gradient with a bright bar moving across it, so zooming and encoding
+        # have some structure to work on
+        columns = np.linspace(0, 255, width, dtype=np.uint8)
+        rows = np.linspace(0, 255, height, dtype=np.uint8)
+        gradient = np.empty((height, width, 3), dtype=np.uint8)
+        gradient[:, :, 0] = columns[np.newaxis, :]
+        gradient[:, :, 1] = rows[:, np.newaxis]
+        gradient[:, :, 2] = 128
+
+        frames = []
+        barWidth = max(width // 20, 1)
+        for frameNumber in range(self._numberOfFrames):
+            frame = gradient.copy()
+            barStart = (frameNumber * width // self._numberOfFrames) % width
+            frame[:, barStart:barStart + barWidth] = 255
+            frames.append(frame)
+
+        return frames
+
+
+class FrameSourceError(Exception):
+    pass
+
+
+def _import_picamera2():
+    global Picamera2, Transform
+    try:
+        if not Picamera2:
+            from picamera2 import Picamera2
+        if not Transform:
+            from libcamera import Transform
+    except ImportError: # not running on a raspberry pi, so only the other frame sources can be used
+        pass
@@ -17,10 +17,16 @@ class Honker:
         self._shortBeepTime = 0.01
         self._currentTimeBetweenEachHonk = None
 
+        self._obstacleScoreTreshold = 0.5
+
     def setup(self):
         GPIO.setup(self._buzzerPin, GPIO.OUT, initial=self._withinAlarmDistance)
 
-    def prepare_for_honking(self, sensors):
+    def prepare_for_honking(self, sensors, obstacleScore=None):
+        # the camera's obstacle score is added as one more distance reading
+        if obstacleScore is not None:
+            sensors = sensors + [self._convert_obstacle_score_to_distance(obstacleScore)]
+
         self._set_honk_on_or_off(sensors) # check if car is within treshold distance
         self._set_honk_timing() # update frequency of alarm beeping
 
@@ -32,9 +38,21 @@ class Honker:
 
         GPIO.output(self._buzzerPin, honk)
 
+    def get_time_until_next_honk_change(self):
+        if not self._withinAlarmDistance:
+            return None
+
+        if not self._lastHonkChangeTime:
+            return 0.0
+
+        return max(self._lastHonkChangeTime + self._currentTimeBetweenEachHonk - time(), 0.0)
+
     def set_distance_treshold(self, treshold):
         self._distanceTreshold = treshold
 
+    def set_obstacle_score_treshold(self, treshold):
+        self._obstacleScoreTreshold = treshold
+
     def set_long_beep_time(self, highBeepTime):
         self._longBeepTime = highBeepTime
 
@@ -71,8 +89,30 @@ class Honker:
                 0
             )
 
+    def _convert_obstacle_score_to_distance(self, obstacleScore):
+        if obstacleScore < self._obstacleScoreTreshold:
+            return None
+
+        # scores from the treshold up to 1 map to distances from the distance treshold down to 0,
+        # but 0 would be removed together with the None values, so it is kept slightly above
+        distance = map_value_to_new_scale(
+            obstacleScore,
+            self._distanceTreshold,
+            0,
+            2,
+            self._obstacleScoreTreshold,
+            1
+        )
+
+        return max(distance, 0.01)
+
     def _check_if_any_response_is_below_threshold(self, sensorValues):
         sensorValues = [sensor for sensor in sensorValues if sensor] # remove None values
+        if not sensorValues:
+            # no sensor got a reading, so there is nothing to honk for
+            self._currentLowestDistance = None
+            return False
+
         self._currentLowestDistance = min(sensorValues)
         if self._currentLowestDistance < self._distanceTreshold:
             return True
@@ -0,0 +1,81 @@
+from multiprocessing import RawArray
+from time import monotonic
+from durationHistogram import DurationHistogram
+
+class LoopMonitor:
+    def __init__(self, name, deadline, numberOfBuckets=24):
+        self._name = name
+        self._deadline = deadline
+
+        # the counters are shared like the histogram, so they can be read from any process while the loop runs
+        self._cycleTimes = DurationHistogram(numberOfBuckets)
+        self._deadlineMisses = RawArray('Q', 1)
+        self._safeStops = RawArray('Q', 1)
+
+        # start of the cycle in progress, or 0 between cycles, and the start of the
+        # first of the cycles in a row that have missed the deadline, or 0
+        self._cycleStartTime = RawArray('d', 1)
+        self._missStreakStartTime = RawArray('d', 1)
+
+    def start_cycle(self):
+        self._cycleStartTime[0] = monotonic()
+
+    def end_cycle(self):
+        cycleStartTime = self._cycleStartTime[0]
+        if not cycleStartTime:
+            return
+
+        cycleTime = monotonic() - cycleStartTime
+        self._cycleStartTime[0] = 0.0
+        self._cycleTimes.record(cycleTime)
+
+        if cycleTime > self._deadline:
+            self._deadlineMisses[0] += 1
+            if not self._missStreakStartTime[0]:
+                self._missStreakStartTime[0] = cycleStartTime
+        else:
+            self._missStreakStartTime[0] = 0.0
+
+    def get_overdue_time(self, currentTime=None):
+        # how long the loop has been stuck in cycles that miss the deadline, counted up to now.
+        # A loop that waits between cycles is not overdue, however slow its last cycle was
+        currentTime = currentTime or monotonic()
+
+        cycleStartTime = self._cycleStartTime[0]
+        if not cycleStartTime or currentTime - cycleStartTime <= self._deadline:
+            return 0.0
+
+        return currentTime - (self._missStreakStartTime[0] or cycleStartTime)
+
+    def add_safe_stop(self):
+        self._safeStops[0] += 1
+
+    def get_name(self):
+        return self._name
+
+    def get_deadline(self):
+        return self._deadline
+
+    def get_statistics(self):
+        cycleTimes = self._cycleTimes.get_statistics()
+
+        return {
+            "cycles": cycleTimes["count"],
+            "misses": self._deadlineMisses[0],
+            "safeStops": self._safeStops[0],
+            "mean": cycleTimes["mean"],
+            "jitter": cycleTimes["jitter"],
+            "p50": cycleTimes["p50"],
+            "p99": cycleTimes["p99"],
+            "max": cycleTimes["max"]
+        }
+
+    def get_report(self):
+        statistics = self.get_statistics()
+
+        return (f"{self._name} loop: {statistics['cycles']} cycles, {statistics['misses']} over "
+                f"{self._deadline * 1000:.0f} ms, {statistics['safeStops']} safe stops, "
+                f"mean {statistics['mean'] * 1000:.2f} ms, jitter {statistics['jitter'] * 1000:.2f} ms, "
+                f"p50 {statistics['p50'] * 1000:.2f} ms, p99 {statistics['p99'] * 1000:.2f} ms, "
+                f"max {statistics['max'] * 1000:.2f} ms")
+
@@ -1,178 +1,126 @@
-from carHandling import CarHandling
-from arduinoCommunicator import ArduinoCommunicator, InvalidPortError
-from camera import Camera
-from cameraHelper import CameraHelper
-from servoHandling import ServoHandling
-from carControl import CarControl, X11ForwardingError
-from xboxControl import NoControllerDetected
-from roboCarHelper import print_startup_error, convert_from_board_number_to_bcm_number
-from time import sleep
+from roboCarHelper import StartupError, print_startup_error
+from componentSetup import ComponentSpec, setup_hardware_components, add_components, setup_video_recorder, setup_obstacle_detector, \
+    setup_telemetry_logger, setup_loop_monitors, setup_process_tunings, setup_startup_profiler, check_if_x11_required
+from startupProfiler import measure_startup
 from configparser import ConfigParser
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import set_start_method
 import os
 
-def setup_camera(parser):
-    if not parser["Components.enabled"].getboolean("Camera"):
-        return None
+def check_if_bootstrap_enabled(parser):
+    # only the process runtime has workers to bootstrap
+    if not parser.has_section("Runtime"):
+        return False
 
-    cameraSpecs = parser["Camera.specs"]
+    runtimeSpecs = parser["Runtime"]
 
-    resolutionWidth = cameraSpecs.getint("ResolutionWidth")
-    resolutionHeight = cameraSpecs.getint("ResolutionHeight")
+    return runtimeSpecs.get("Mode", "processes") == "processes" and runtimeSpecs.getboolean("Bootstrap", False)
 
-    resolution = (resolutionWidth, resolutionHeight)
-    camera = Camera(resolution)
 
-    return camera
+def main():
+    # set up parser to read input values
+    parser = ConfigParser()
+    parser.read(os.path.join(os.path.dirname(__file__), 'config.ini'))
 
+    # time every import from here on, and every component setup
+    startupProfiler = setup_startup_profiler(parser)
+    if startupProfiler:
+        startupProfiler.start_import_timing()
 
-def setup_arduino_communicator(parser):
-    if not parser["Components.enabled"].getboolean("ArduinoCommunicator"):
-        return None
+    from carControl import CarControl
 
-    arduinoCommunicatorData = parser["Arduino.specs"]
+    # a bootstrapped worker is spawned as a new interpreter that builds its own components, so the
+    # start method has to be set before any shared state is made
+    bootstrap = check_if_bootstrap_enabled(parser)
+    if bootstrap:
+        set_start_method("spawn")
 
-    port = arduinoCommunicatorData.get("Port")
-    baudrate = arduinoCommunicatorData.getint("Baudrate", 9600)
+    # the car, servos, arduino and camera are set up in the background while the controller is opened,
+    # unless the workers set them up themselves
+    if not bootstrap:
+        executor = ThreadPoolExecutor(max_workers=1)
+        hardwareSetup = executor.submit(setup_hardware_components, parser, None, startupProfiler)
+        executor.shutdown(wait=False) # the setup still runs, nothing else is sent to the executor
 
+    # set up car controller, the controller is only opened here if the workers are forked from this process.
+    # A bootstrapped control worker reports a missing controller itself, and the program exits
     try:
-        arduinoCommunicator = ArduinoCommunicator(port, baudrate)
-    except InvalidPortError as e:
+        with measure_startup(startupProfiler, "controller"):
+            carController = CarControl(check_if_x11_required(parser), controllerRequired=not bootstrap)
+    except StartupError as e:
         print_startup_error(e)
         exit()
 
-    buzzerPin = parser["Distance.buzzer.pin"].getint("Buzzer")
+    # the frame consumers and state subscribers don't use any hardware, so they are made here and sent to their workers
+    frameConsumers = []
+    if parser["Components.enabled"].getboolean("Camera"):
+        with measure_startup(startupProfiler, "video recorder"):
+            videoRecorder = setup_video_recorder(parser)
+        if videoRecorder:
+            frameConsumers.append(videoRecorder)
 
-    if parser["Components.enabled"].getboolean("DistanceBuzzer"):
-        arduinoCommunicator.activate_distance_sensors(buzzerPin)
+        with measure_startup(startupProfiler, "obstacle detector"):
+            obstacleDetector = setup_obstacle_detector(parser)
+        if obstacleDetector:
+            frameConsumers.append(obstacleDetector)
 
-    if parser["Components.enabled"].getboolean("ProgressiveLights"):
-        progressiveLightPins = []
-        lightPins = parser["Progressive.light.pins"]
-        for key in lightPins:
-            progressiveLightPins.append(lightPins.getint(key))
+    for frameConsumer in frameConsumers:
+        carController.add_frame_consumer(frameConsumer)
 
-        arduinoCommunicator.activate_photocell_lights(progressiveLightPins)
+    with measure_startup(startupProfiler, "telemetry logger"):
+        telemetryLogger = setup_telemetry_logger(parser)
+    if telemetryLogger:
+        carController.add_state_subscriber(telemetryLogger)
 
-    return arduinoCommunicator
+    # add components, or leave them to the workers
+    if bootstrap:
+        carController.set_component_spec(ComponentSpec(parser))
+    else:
+        try:
+            add_components(carController, parser, hardwareSetup.result(), frameConsumers)
+        except StartupError as e:
+            print_startup_error(e)
+            exit()
 
+    for processName, processTuning in setup_process_tunings(parser).items():
+        carController.add_process_tuning(processName, processTuning)
 
-def setup_servo(parser, plane):
-    if plane == "horizontal":
-        if not parser["Components.enabled"].getboolean("ServoHorizontal"):
-            return None
-    elif plane == "vertical":
-        if not parser["Components.enabled"].getboolean("ServoVertical"):
-            return None
+    for loopName, loopMonitor in setup_loop_monitors(parser).items():
+        carController.add_loop_monitor(loopName, loopMonitor)
 
-    servoData = parser[f"Servo.handling.specs.{plane}"]
+    if parser.has_section("Loop.monitor") and parser["Loop.monitor"].getboolean("Watchdog", False):
+        carController.set_watchdog_enabled(parser["Loop.monitor"].getfloat("SafeStopAfterMs", 300) / 1000)
 
-    servoPin = servoData.getint("ServoPin")
-    minAngle = servoData.getint("MinAngle")
-    maxAngle = servoData.getint("MaxAngle")
+    if parser.has_section("Runtime"):
+        carController.set_runtime(parser["Runtime"].get("Mode", "processes"))
 
-    servoPin = servoPin
-    servoPin = convert_from_board_number_to_bcm_number(servoPin)
+    if parser.has_section("Supervisor"):
+        supervisorSpecs = parser["Supervisor"]
+        carController.set_supervision(supervisorSpecs.getint("MaxRestarts", 3), supervisorSpecs.getfloat("JoinTimeout", 5.0))
 
-    servo = ServoHandling(
-        servoPin,
-        plane,
-        minAngle,
-        maxAngle
-    )
-
-    return servo
-
-
-def setup_car(parser):
-    if not parser["Components.enabled"].getboolean("CarHandling"):
-        return None
-
-    carHandlingPins = parser["Car.handling.pins"]
-
-    # define GPIO pins
-    rightForward = carHandlingPins.getint("RightForward")
-    rightBackward = carHandlingPins.getint("RightBackward")
-    leftForward = carHandlingPins.getint("LeftForward")
-    leftBackward = carHandlingPins.getint("LeftBackward")
-    enA = carHandlingPins.getint("EnA")
-    enB = carHandlingPins.getint("EnB")
-    minPwmTT = carHandlingPins.getint("MinimumMotorPWM")
-    maxPwmTT = carHandlingPins.getint("MaximumMotorPWM")
-
-    # define car handling
-    car = CarHandling(
-        leftBackward,
-        leftForward,
-        rightBackward,
-        rightForward,
-        enA,
-        enB,
-        minPwmTT,
-        maxPwmTT
-    )
-
-    return car
-
-
-# set up parser to read input values
-parser = ConfigParser()
-parser.read(os.path.join(os.path.dirname(__file__), 'config.ini'))
-
-# set up car controller
-try:
-    carController = CarControl()
-except (X11ForwardingError, NoControllerDetected) as e:
-    print_startup_error(e)
-    exit()
-
-car = setup_car(parser)
-
-arduinoCommunicator = setup_arduino_communicator(parser)
-
-# define servos aboard car
-servoHorizontal = setup_servo(parser, "horizontal")
-servoVertical = setup_servo(parser, "vertical")
-
-# setup camera
-camera = setup_camera(parser)
-
-# add components
-if car:
-    carController.add_car(car)
-if servoHorizontal:
-    carController.add_servo(servoHorizontal)
-
-if servoVertical:
-    carController.add_servo(servoVertical)
-
-if arduinoCommunicator:
-    carController.add_arduino_communicator(arduinoCommunicator)
-
-if camera:
-    cameraHelper = CameraHelper()
-    cameraHelper.add_car(car)
-    cameraHelper.add_servo(servoHorizontal)
-
-    carController.add_camera(camera)
-    carController.add_camera_helper(cameraHelper)
-
-# start car
-carController.start()
-
-flag = carController.shared_flag
-
-# keep process running until keyboard interrupt
-try:
-    while not flag.value:  # listen for any processes setting the event
-        sleep(0.5)
-except KeyboardInterrupt:
-    flag.value = True # set event to stop all active processes
-finally:
-    print("finished!")
+    # the workers are started with everything imported, and the profile is printed when all of them are ready
+    if startupProfiler:
+        startupProfiler.stop_import_timing()
+        carController.set_startup_profiler(startupProfiler)
 
+    # start car
+    carController.start()
 
+    exitEvent = carController.shared_exit_event
 
+    # keep process running until keyboard interrupt
+    try:
+        carController.supervise()  # sleep until any of the processes sets the event, restarting workers that crash
+    except KeyboardInterrupt:
+        exitEvent.set() # set event to stop all active processes
+    finally:
+        carController.cleanup()
 
+        for loopReport in carController.get_loop_reports():
+            print(loopReport)
 
+        print("finished!")
 
 
+if __name__ == "__main__":
+    main()
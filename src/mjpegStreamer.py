@@ -0,0 +1,114 @@
+import cv2
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Thread, Condition
+
+class MjpegStreamer:
+    def __init__(self, port, host="0.0.0.0", jpegQuality=80):
+        self._port = port
+        self._host = host
+        self._jpegQuality = jpegQuality
+
+        self._newFrameCondition = Condition()
+        self._jpeg = None
+        self._frameSequence = 0
+        self._clientCount = 0
+
+        self._running = False
+        self._server = None
+        self._serverThread = None
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self._host, self._port), self._create_request_handler())
+        self._server.daemon_threads = True
+        self._running = True
+
+        self._serverThread = Thread(target=self._server.serve_forever, daemon=True)
+        self._serverThread.start()
+
+        print(f"Streaming camera feed on http://{self._host}:{self.get_port()}/")
+
+    def publish(self, frame):
+        # nobody is watching, so there is no need to spend time encoding
+        if not self._clientCount:
+            return
+
+        # encode once, no matter how many clients are connected
+        success, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self._jpegQuality])
+        if not success:
+            return
+
+        with self._newFrameCondition:
+            self._jpeg = jpeg.tobytes()
+            self._frameSequence += 1
+            self._newFrameCondition.notify_all()
+
+    def stop(self):
+        self._running = False
+
+        # wake up the clients so their handlers can return
+        with self._newFrameCondition:
+            self._newFrameCondition.notify_all()
+
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def get_port(self):
+        return self._server.server_address[1]
+
+    def get_client_count(self):
+        return self._clientCount
+
+    def _wait_for_next_jpeg(self, lastSequence):
+        with self._newFrameCondition:
+            self._newFrameCondition.wait_for(
+                lambda: self._frameSequence != lastSequence or not self._running,
+                timeout=1.0
+            )
+
+            return self._frameSequence, self._jpeg
+
+    def _change_client_count(self, change):
+        with self._newFrameCondition:
+            self._clientCount += change
+
+    def _create_request_handler(self):
+        streamer = self
+
+        class MjpegRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/":
+                    self.send_error(404)
+                    return
+
+                self.send_response(200)
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+                self.end_headers()
+
+                streamer._change_client_count(1)
+                try:
+                    self._stream_frames()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass # the client closed the connection
+                finally:
+                    streamer._change_client_count(-1)
+
+            def _stream_frames(self):
+                lastSequence = 0
+                while streamer._running:
+                    sequence, jpeg = streamer._wait_for_next_jpeg(lastSequence)
+                    if sequence == lastSequence:
+                        continue
+
+                    lastSequence = sequence
+                    self.wfile.write(b"--frame\r\n")
+                    self.wfile.write(b"Content-Type: image/jpeg\r\n")
+                    self.wfile.write(f"Content-Length: {len(jpeg)}\r\n\r\n".encode())
+                    self.wfile.write(jpeg)
+                    self.wfile.write(b"\r\n")
+
+            def log_message(self, format, *args):
+                pass # keep the terminal free for the controller layout
+
+        return MjpegRequestHandler
@@ -0,0 +1,82 @@
+import cv2
+import numpy as np
+from multiprocessing import RawArray
+from time import time
+
+class ObstacleDetector:
+    # the arduino communicator gives the score to the honker, see add_components
+    providesObstacleScore = True
+
+    def __init__(self, detectionSize=(80, 60), floorRegion=0.4, edgeDensityRange=(0.02, 0.15), maxRate=15,
+                 maxScoreAge=1.0):
+        self._detectionSize = detectionSize
+        self._floorRegion = floorRegion
+        self._minEdgeDensity, self._maxEdgeDensity = edgeDensityRange
+        self._minTimeBetweenDetections = 1 / maxRate
+        self._maxScoreAge = maxScoreAge
+
+        self._weightPrevScore = 0.7
+        self._weightNewScore = 0.3
+
+        # score and time of the last detection, shared without a lock so the arduino
+        # process can read it while the detector runs in its own process
+        self._sharedScore = RawArray('d', [0.0, 0.0])
+
+        self._rowWeights = None
+        self._lastDetectionTime = 0
+        self._detections = 0
+        self._detectionTime = 0.0
+
+    def setup(self):
+        width, height = self._detectionSize
+        floorRows = max(int(height * self._floorRegion), 1)
+
+        # edges close to the bottom of the frame are closer to the car, so they count more
+        self._rowWeights = np.linspace(0.5, 1.5, floorRows, dtype=np.float32)[:, np.newaxis]
+        self._rowWeights /= self._rowWeights.mean()
+
+    def handle_frame(self, image, timestamp):
+        # there is no need to run faster than the arduino readings the score is combined with
+        if timestamp - self._lastDetectionTime < self._minTimeBetweenDetections:
+            return
+        self._lastDetectionTime = timestamp
+
+        startTime = time()
+        score = self.calculate_obstacle_score(image)
+
+        previousScore = self._sharedScore[0]
+        self._sharedScore[0] = self._weightPrevScore * previousScore + self._weightNewScore * score
+        self._sharedScore[1] = timestamp
+
+        self._detections += 1
+        self._detectionTime += time() - startTime
+
+    def cleanup(self):
+        if self._detections:
+            print(f"Obstacle detector ran {self._detections} times, "
+                  f"{self._detectionTime / self._detections * 1000:.2f} ms per frame")
+
+    def calculate_obstacle_score(self, image):
+        smallImage = cv2.resize(image, self._detectionSize, interpolation=cv2.INTER_AREA)
+        grayImage = cv2.cvtColor(smallImage, cv2.COLOR_BGR2GRAY)
+
+        # only look at the floor in front of the car, and leave out the edges of the frame
+        height, width = grayImage.shape
+        floorImage = grayImage[height - self._rowWeights.shape[0]:, width // 5:width - width // 5]
+
+        edges = cv2.Canny(floorImage, 50, 150)
+        edgeDensity = float(np.mean((edges > 0) * self._rowWeights))
+
+        # an empty floor has a few edges from texture, an obstacle fills the region with edges
+        score = (edgeDensity - self._minEdgeDensity) / (self._maxEdgeDensity - self._minEdgeDensity)
+
+        return min(max(score, 0.0), 1.0)
+
+    def get_obstacle_score(self):
+        score, timestamp = self._sharedScore[0], self._sharedScore[1]
+
+        # an old score means the camera or the detector has stopped, so it can't be trusted
+        if time() - timestamp > self._maxScoreAge:
+            return None
+
+        return score
@@ -0,0 +1,77 @@
+from multiprocessing import RawArray
+from time import perf_counter
+from durationHistogram import DurationHistogram
+
+class PipelineProfiler:
+    stagePercentiles = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))
+
+    def __init__(self, stages, frameBudget, numberOfBuckets=24):
+        self._stages = list(stages) + ["total"]
+        self._stageIndexes = {stage: index for index, stage in enumerate(self._stages)}
+        self._frameBudget = frameBudget
+
+        # the counters are shared like the histograms, so they can be read from any process while the camera runs
+        self._stageDurations = [DurationHistogram(numberOfBuckets) for stage in self._stages]
+
+        self._frameCount = RawArray('Q', 1)
+        self._lateFrames = RawArray('Q', 1)
+        self._droppedFrames = RawArray('Q', 1)
+
+        self._frameStartTime = None
+        self._lastMarkTime = None
+
+    def start_frame(self):
+        self._frameStartTime = perf_counter()
+        self._lastMarkTime = self._frameStartTime
+
+    def mark(self, stage):
+        # record the time since the last mark as the duration of the stage
+        currentTime = perf_counter()
+        self._stageDurations[self._stageIndexes[stage]].record(currentTime - self._lastMarkTime)
+        self._lastMarkTime = currentTime
+
+    def end_frame(self):
+        frameTime = perf_counter() - self._frameStartTime
+        self._stageDurations[self._stageIndexes["total"]].record(frameTime)
+
+        self._frameCount[0] += 1
+        if frameTime > self._frameBudget:
+            self._lateFrames[0] += 1
+
+    def set_dropped_frames(self, droppedFrames):
+        self._droppedFrames[0] = droppedFrames
+
+    def get_stage_statistics(self):
+        statistics = {}
+        for stage, index in self._stageIndexes.items():
+            statistics[stage] = self._stageDurations[index].get_statistics(PipelineProfiler.stagePercentiles)
+
+        return statistics
+
+    def get_frame_counts(self):
+        return {
+            "frames": self._frameCount[0],
+            "late": self._lateFrames[0],
+            "dropped": self._droppedFrames[0]
+        }
+
+    def get_report(self):
+        frameCounts = self.get_frame_counts()
+        lines = [
+            f"Camera pipeline: {frameCounts['frames']} frames, {frameCounts['late']} late "
+            f"(over {self._frameBudget * 1000:.0f} ms), {frameCounts['dropped']} dropped",
+            f"{'Stage':<10} {'count':>8} {'mean ms':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+        ]
+
+        for stage, statistics in self.get_stage_statistics().items():
+            if not statistics["count"]:
+                continue
+
+            lines.append(
+                f"{stage:<10} {statistics['count']:>8} {statistics['mean'] * 1000:>9.2f} "
+                f"{statistics['p50'] * 1000:>9.2f} {statistics['p90'] * 1000:>9.2f} "
+                f"{statistics['p99'] * 1000:>9.2f} {statistics['max'] * 1000:>9.2f}"
+            )
+
+        return "\n".join(lines)
+
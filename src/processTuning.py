@@ -0,0 +1,107 @@
+import os
+
+class ProcessTuning:
+    def __init__(self, cores=None, scheduler=None, priority=None, niceness=None):
+        if scheduler not in (None, "fifo", "rr", "other"):
+            raise ValueError(f"Unknown scheduler {scheduler}, use fifo, rr or other")
+
+        self._cores = cores
+        self._scheduler = scheduler
+        self._priority = priority
+        self._niceness = niceness
+
+        self._schedulerPolicies = {
+            "fifo": "SCHED_FIFO",
+            "rr": "SCHED_RR",
+            "other": "SCHED_OTHER"
+        }
+
+        self._warnings = []
+
+    def apply(self):
+        # each setting is tried on its own, and a setting the system doesn't support or
+        # allow is left as it is, with a warning in the report
+        self._warnings = []
+
+        if self._cores:
+            self._set_affinity()
+
+        if self._scheduler:
+            self._set_scheduler()
+
+        if self._niceness is not None:
+            self._set_niceness()
+
+    def get_report(self, processName):
+        report = f"{processName} process {os.getpid()}: {self._get_effective_settings()}"
+        for warning in self._warnings:
+            report += f"\n  {warning}"
+
+        return report
+
+    def get_warnings(self):
+        return self._warnings
+
+    def _set_affinity(self):
+        if not hasattr(os, "sched_setaffinity"):
+            self._warnings.append("CPU affinity is not supported on this system")
+            return
+
+        # cores that don't exist on this board are left out, so a config made for a 4 core Pi still works
+        availableCores = set(range(os.cpu_count() or 1))
+        cores = set(self._cores) & availableCores
+        if not cores:
+            self._warnings.append(f"none of the cores {sorted(self._cores)} exist, affinity not changed")
+            return
+
+        if cores != set(self._cores):
+            self._warnings.append(f"cores {sorted(set(self._cores) - cores)} don't exist and were left out")
+
+        try:
+            os.sched_setaffinity(0, cores)
+        except OSError as e:
+            self._warnings.append(f"could not set CPU affinity: {e.strerror}")
+
+    def _set_scheduler(self):
+        policyName = self._schedulerPolicies[self._scheduler]
+        if not hasattr(os, "sched_setscheduler") or not hasattr(os, policyName):
+            self._warnings.append(f"{policyName} is not supported on this system")
+            return
+
+        policy = getattr(os, policyName)
+
+        # the real time policies need a priority, the normal policy only takes 0
+        priority = self._priority if self._scheduler != "other" else 0
+        if priority is None:
+            priority = os.sched_get_priority_min(policy)
+
+        priority = max(os.sched_get_priority_min(policy), min(priority, os.sched_get_priority_max(policy)))
+
+        try:
+            os.sched_setscheduler(0, policy, os.sched_param(priority))
+        except OSError as e:
+            # real time scheduling needs root or CAP_SYS_NICE
+            self._warnings.append(f"could not set {policyName} priority {priority}: {e.strerror}")
+
+    def _set_niceness(self):
+        try:
+            os.setpriority(os.PRIO_PROCESS, 0, self._niceness)
+        except (OSError, AttributeError) as e:
+            # a negative nice value needs root or CAP_SYS_NICE
+            self._warnings.append(f"could not set nice {self._niceness}: {getattr(e, 'strerror', e)}")
+
+    def _get_effective_settings(self):
+        settings = []
+
+        if hasattr(os, "sched_getaffinity"):
+            settings.append(f"cores {sorted(os.sched_getaffinity(0))}")
+
+        if hasattr(os, "sched_getscheduler"):
+            policy = os.sched_getscheduler(0)
+            policyNames = {getattr(os, name): name for name in self._schedulerPolicies.values() if hasattr(os, name)}
+            settings.append(f"{policyNames.get(policy, policy)} priority {os.sched_getparam(0).sched_priority}")
+
+        if hasattr(os, "getpriority"):
+            settings.append(f"nice {os.getpriority(os.PRIO_PROCESS, 0)}")
+
+        return ", ".join(settings)
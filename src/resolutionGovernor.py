@@ -0,0 +1,70 @@
+class ResolutionGovernor:
+    def __init__(self, ladder, downgradeTime=3.0, upgradeTime=10.0, headroom=1.3, tolerance=0.9):
+        # the ladder is a list of ((width, height), frameRate), ordered from the highest quality to the lowest
+        self._ladder = ladder
+        self._step = 0
+
+        self._downgradeTime = downgradeTime
+        self._upgradeTime = upgradeTime
+        self._headroom = headroom
+        self._tolerance = tolerance
+
+        self._belowTargetSince = None
+        self._headroomSince = None
+
+    def set_start_resolution(self, resolution):
+        for step, (stepResolution, frameRate) in enumerate(self._ladder):
+            if stepResolution == resolution:
+                self._step = step
+                return
+
+    def get_resolution(self):
+        return self._ladder[self._step][0]
+
+    def get_frame_rate(self):
+        return self._ladder[self._step][1]
+
+    def get_max_resolution(self):
+        return max((resolution for resolution, frameRate in self._ladder), key=lambda size: size[0] * size[1])
+
+    def update(self, measuredFps, processingFps, currentTime):
+        # returns True when the camera should switch to the current step of the ladder
+        if measuredFps < self.get_frame_rate() * self._tolerance:
+            self._headroomSince = None
+            if self._belowTargetSince is None:
+                self._belowTargetSince = currentTime
+            elif currentTime - self._belowTargetSince >= self._downgradeTime:
+                return self._change_step(1)
+        elif self._check_if_headroom_for_step_up(processingFps):
+            self._belowTargetSince = None
+            if self._headroomSince is None:
+                self._headroomSince = currentTime
+            elif currentTime - self._headroomSince >= self._upgradeTime:
+                return self._change_step(-1)
+        else:
+            self._belowTargetSince = None
+            self._headroomSince = None
+
+        return False
+
+    def _check_if_headroom_for_step_up(self, processingFps):
+        if self._step == 0:
+            return False
+
+        # scale the rate the current frames could be processed at to the size of the frames one step up
+        (width, height), frameRate = self._ladder[self._step]
+        (higherWidth, higherHeight), higherFrameRate = self._ladder[self._step - 1]
+        estimatedFps = processingFps * (width * height) / (higherWidth * higherHeight)
+
+        return estimatedFps >= higherFrameRate * self._headroom
+
+    def _change_step(self, change):
+        newStep = self._step + change
+        self._belowTargetSince = None
+        self._headroomSince = None
+
+        if newStep < 0 or newStep >= len(self._ladder):
+            return False
+
+        self._step = newStep
+        return True
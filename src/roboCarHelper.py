@@ -7,6 +7,10 @@ def map_value_to_new_scale(inputValue, newScaleMinValue, newScaleMaxValue, value
 
     return valueMapped
 
+class StartupError(Exception):
+    # hardware or a connection that is missing when the car starts, which trying again won't fix
+    pass
+
 def print_startup_error(error):
     print("Something went wrong during startup. Exiting...")
     print(error)
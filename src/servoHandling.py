@@ -3,7 +3,8 @@ import pigpio
 
 class ServoHandling:
 
-    pigpioPwm = pigpio.pi()
+    # all servos share one connection to the pigpio daemon, which is made when the first servo is set up
+    pigpioPwm = None
     pwmMinServo = 2500
     pwmMaxServo = 500
 
@@ -40,14 +41,28 @@ class ServoHandling:
 
         self._moveServoButton = self._controlsDictServo["Servo"]
 
+        self._buttonHandlers = {
+            self._moveServoButton: self.handle_servo_movement
+        }
+
     def setup(self):
+        if not ServoHandling.pigpioPwm:
+            ServoHandling.pigpioPwm = pigpio.pi()
+
         ServoHandling.pigpioPwm.set_mode(self._servoPin, pigpio.OUTPUT)
         ServoHandling.pigpioPwm.set_PWM_frequency(self._servoPin, 50) # 50 hz is typical for servos
 
     def handle_xbox_input(self, button, pressValue):
-        if button == self._moveServoButton:
-            self._prepare_for_servo_movement(pressValue)
-            self._move_servo()
+        handler = self._buttonHandlers.get(button)
+        if handler:
+            handler(pressValue)
+
+    def handle_servo_movement(self, pressValue):
+        self._prepare_for_servo_movement(pressValue)
+        self._move_servo()
+
+    def get_button_handlers(self):
+        return self._buttonHandlers
 
     def get_servo_buttons(self):
         return self._controlsDictServo
@@ -0,0 +1,89 @@
+import builtins
+import sys
+from contextlib import contextmanager, nullcontext
+from threading import local
+from time import monotonic
+
+class StartupProfiler:
+    def __init__(self, processName="main", minImportTime=0.005, importDepth=2):
+        # monotonic is the same clock in every process, so the ready times the workers send can be compared with it
+        self._processName = processName
+        self._startTime = monotonic()
+        self._minImportTime = minImportTime
+        self._importDepth = importDepth
+
+        # [module name, depth, seconds] in the order the imports started, so nested imports follow their parent
+        self._imports = []
+        self._importState = local() # each thread that sets up a component has its own import depth
+        self._originalImport = None
+
+        self._steps = []
+        self._events = []
+
+    def start_import_timing(self):
+        self._originalImport = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def stop_import_timing(self):
+        if self._originalImport:
+            builtins.__import__ = self._originalImport
+            self._originalImport = None
+
+    @contextmanager
+    def measure(self, stepName):
+        startTime = monotonic()
+        try:
+            yield
+        finally:
+            self._steps.append((stepName, monotonic() - startTime))
+
+    def add_event(self, eventName, eventTime=None):
+        eventTime = eventTime if eventTime is not None else monotonic()
+        self._events.append((eventName, eventTime - self._startTime))
+
+    def get_report(self):
+        report = [f"Startup profile of {self._processName}, {monotonic() - self._startTime:.2f} s since start"]
+
+        imports = [(moduleName, depth, importTime) for moduleName, depth, importTime in self._imports
+                   if depth < self._importDepth and importTime >= self._minImportTime]
+        if imports:
+            report.append("  imports:")
+            for moduleName, depth, importTime in imports:
+                report.append(f"    {importTime * 1000:>7.1f} ms  {'  ' * depth}{moduleName}")
+
+        if self._steps:
+            report.append("  component setup:")
+            for stepName, stepTime in self._steps:
+                report.append(f"    {stepTime * 1000:>7.1f} ms  {stepName}")
+
+        if self._events:
+            report.append("  since start:")
+            for eventName, eventTime in self._events:
+                report.append(f"    {eventTime * 1000:>7.1f} ms  {eventName}")
+
+        return "\n".join(report)
+
+    def _timed_import(self, name, *args, **kwargs):
+        # only the first import of a module loads it, later imports find it in sys.modules
+        if name in sys.modules:
+            return self._originalImport(name, *args, **kwargs)
+
+        depth = getattr(self._importState, "depth", 0)
+        importRecord = [name, depth, 0.0]
+        self._imports.append(importRecord)
+
+        self._importState.depth = depth + 1
+        startTime = monotonic()
+        try:
+            return self._originalImport(name, *args, **kwargs)
+        finally:
+            importRecord[2] = monotonic() - startTime
+            self._importState.depth = depth
+
+
+def measure_startup(startupProfiler, stepName):
+    # times a step if startup profiling is on
+    if not startupProfiler:
+        return nullcontext()
+
+    return startupProfiler.measure(stepName)
@@ -0,0 +1,118 @@
+from multiprocessing import Lock, RawValue, Semaphore
+from time import monotonic
+from controlState import ControlState
+
+class StateBus(ControlState):
+    def __init__(self, initialValues):
+        super().__init__(initialValues)
+
+        # the last values published, only used in the publishing process to find what changed
+        self._publishedValues = {field: float(value) for field, value in initialValues.items()}
+
+        # subscribers that wait for changes sleep on this, and are woken up by each publish
+        self._changeSignal = ChangeSignal()
+
+        self._publishes = 0
+        self._skippedPublishes = 0
+
+    def publish(self, values):
+        # only the fields that have changed are written, and nothing at all if none have.
+        # Returns True if anything was written
+        changedValues = {field: value for field, value in values.items()
+                         if self._publishedValues[field] != value}
+
+        if not changedValues:
+            self._skippedPublishes += 1
+            return False
+
+        self._publishedValues.update(changedValues)
+        self.write(changedValues)
+        self._publishes += 1
+
+        self.wake_subscribers()
+
+        return True
+
+    def reset_published_values(self):
+        # a publisher in a restarted worker has the published values its process was started with, so it
+        # takes them from the bus instead, or changes back to those values would be skipped
+        version, self._publishedValues = self.read()
+
+    def subscribe(self):
+        return StateSubscriber(self, self._changeSignal)
+
+    def wake_subscribers(self):
+        # lets waiting subscribers check for changes or for the program to exit
+        self._changeSignal.signal()
+
+    def get_publish_counts(self):
+        return self._publishes, self._skippedPublishes
+
+
+class StateSubscriber:
+    def __init__(self, stateBus, changeSignal):
+        self._stateBus = stateBus
+        self._changeSignal = changeSignal
+
+        # nothing has been read yet, so the first changes are all the fields
+        self._lastVersion = -1
+
+    def get_changes(self):
+        # returns the fields that have changed since the last call, or an empty dict
+        if self._stateBus.get_version() == self._lastVersion:
+            return {}
+
+        self._lastVersion, changes = self._stateBus.read_changes(self._lastVersion)
+
+        return changes
+
+    def wait_for_changes(self, timeout=None, stopEvent=None):
+        # sleeps until something is published, the timeout runs out or the stop event is set
+        def changed_or_stopped():
+            if stopEvent and stopEvent.is_set():
+                return True
+
+            return self._stateBus.get_version() != self._lastVersion
+
+        self._changeSignal.wait_for(changed_or_stopped, timeout)
+
+        return self.get_changes()
+
+    def has_changes(self):
+        return self._stateBus.get_version() != self._lastVersion
+
+
+class ChangeSignal:
+    # wakes up the processes that wait for it, without the process that signals ever waiting itself.
+    # A condition makes the publisher wait for its lock and for the woken subscribers, and a
+    # subscriber that is terminated while waiting would hold up the control loop
+    def __init__(self):
+        self._semaphore = Semaphore(0)
+        self._waiters = RawValue('i', 0)
+        self._waitersLock = Lock() # only taken by the waiters
+
+    def signal(self):
+        # the semaphore is released once for every waiter that it hasn't been released for yet
+        for waiter in range(self._waiters.value - self._semaphore.get_value()):
+            self._semaphore.release()
+
+    def wait_for(self, predicate, timeout=None):
+        # the waiter is counted before the predicate is checked, so a signal in between isn't missed.
+        # Returns the last result of the predicate
+        self._add_waiters(1)
+        try:
+            deadline = monotonic() + timeout if timeout is not None else None
+            while not predicate():
+                remainingTime = deadline - monotonic() if deadline is not None else None
+                if remainingTime is not None and remainingTime <= 0:
+                    return False
+
+                self._semaphore.acquire(True, remainingTime)
+
+            return True
+        finally:
+            self._add_waiters(-1)
+
+    def _add_waiters(self, count):
+        with self._waitersLock:
+            self._waiters.value += count
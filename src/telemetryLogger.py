@@ -0,0 +1,48 @@
+import csv
+import os
+from datetime import datetime
+
+class TelemetryLogger:
+    def __init__(self, folder, flushInterval=1.0):
+        self._folder = folder
+        self._flushInterval = flushInterval
+
+        self._logFile = None
+        self._logWriter = None
+        self._logPath = None
+        self._lastFlushTime = None
+
+        self._writtenRows = 0
+
+    def setup(self):
+        os.makedirs(self._folder, exist_ok=True)
+
+        fileName = f"telemetry_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        self._logPath = os.path.join(self._folder, fileName)
+
+        self._logFile = open(self._logPath, "w", newline="")
+        self._logWriter = csv.writer(self._logFile)
+        self._logWriter.writerow(["timestamp", "field", "value"])
+
+    def handle_state_changes(self, changes, timestamp):
+        # one row for each field that changed, so the log only grows while the car is being driven
+        for field, value in changes.items():
+            self._logWriter.writerow([f"{timestamp:.3f}", field, value])
+
+        self._writtenRows += len(changes)
+
+        # the rows are flushed now and then, so most of the log survives if the car loses power
+        if self._lastFlushTime is None or timestamp - self._lastFlushTime >= self._flushInterval:
+            self._logFile.flush()
+            self._lastFlushTime = timestamp
+
+    def cleanup(self):
+        self._logFile.close()
+
+        print(f"Telemetry logger wrote {self._writtenRows} changes to {self._logPath}")
+
+    def get_log_path(self):
+        return self._logPath
+
+    def get_written_rows(self):
+        return self._writtenRows
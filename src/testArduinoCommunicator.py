@@ -10,19 +10,55 @@ modules = {
 patcher = patch.dict("sys.modules", modules)
 patcher.start()
 
-from arduinoCommunicator import ArduinoCommunicator, InvalidPortError
+from arduinoCommunicator import ArduinoCommunicator, InvalidPortError, ArduinoNotReadyError
 import RPi.GPIO as GPIO
+import struct
+from binaryProtocol import BinaryProtocol
+
+class FakeBinarySerial:
+    # answers each read request with a frame of the request's number as the front distance, and
+    # sends the given noise before the answer to the given request
+    def __init__(self, noise=b"", noisyRequest=1):
+        self._noise = noise
+        self._noisyRequest = noisyRequest
+        self._requests = 0
+        self._inputBuffer = bytearray()
+
+    def readline(self):
+        return b"binary\r\n"
+
+    def write(self, data):
+        if data.startswith(b"binary"):
+            return
+
+        self._requests += 1
+        if self._requests == self._noisyRequest:
+            self._inputBuffer += self._noise
+        self._inputBuffer += BinaryProtocol().encode_frame(
+            BinaryProtocol.readingsType,
+            struct.pack("<HHH", self._requests * 100, BinaryProtocol.missingReading, BinaryProtocol.missingReading))
+
+    def read(self, size):
+        data = bytes(self._inputBuffer[:size])
+        del self._inputBuffer[:size]
+        return data
+
+    def reset_input_buffer(self):
+        self._inputBuffer.clear()
+
+    def close(self):
+        pass
 
 @patch("RPi.GPIO.setmode")
 @patch("arduinoCommunicator.Serial")
-@patch("arduinoCommunicator.sleep")
+@patch("arduinoCommunicator.ArduinoCommunicator._wait_until_arduino_is_ready")
 class testArduinoCommunicator(unittest.TestCase):
     port = "/dev/ttyACM"
     baudrate = 200
 
     @patch("RPi.GPIO.cleanup")
     @patch("os.path.exists")
-    def test_cleanup(self, mock_path, mock_cleanup, mock_sleep, mock_serial, mock_setmode):
+    def test_cleanup(self, mock_path, mock_cleanup, mock_wait_until_ready, mock_serial, mock_setmode):
         # mock the return value of Serial object to see what methods are called on it
         mockSerialInstance = mock_serial.return_value
 
@@ -35,7 +71,7 @@ class testArduinoCommunicator(unittest.TestCase):
         mockSerialInstance.close.assert_called_once()
         mock_cleanup.assert_called_once()
 
-    def test_port_checking(self, mock_sleep, mock_serial, mock_setmode):
+    def test_port_checking(self, mock_wait_until_ready, mock_serial, mock_setmode):
         # a port/path that definitely is not a real port on the users computer
         fakePort = "this is not a port"
 
@@ -44,7 +80,7 @@ class testArduinoCommunicator(unittest.TestCase):
 
     @patch("arduinoCommunicator.Honker")
     @patch("os.path.exists")
-    def test_input_to_honker_class(self, mock_path, mock_honker, mock_sleep, mock_serial, mock_setmode):
+    def test_input_to_honker_class(self, mock_path, mock_honker, mock_wait_until_ready, mock_serial, mock_setmode):
         # mock the return value of Serial object to mock the method calls on it
         mockSerialInstance = mock_serial.return_value
 
@@ -70,13 +106,139 @@ class testArduinoCommunicator(unittest.TestCase):
         # simulate the reading from arduino
         communicator.start()
 
-        mockHonkerInstance.prepare_for_honking.assert_called_once_with([None, 5])
+        # no obstacle detector is added, so there is no obstacle score
+        mockHonkerInstance.prepare_for_honking.assert_called_once_with([None, 5], None)
         mockHonkerInstance.alert_if_too_close.assert_called_once()
 
+    @patch("arduinoCommunicator.Honker")
+    @patch("os.path.exists")
+    def test_obstacle_score_to_honker_class(self, mock_path, mock_honker, mock_wait_until_ready, mock_serial, mock_setmode):
+        # mock the return value of Serial object to mock the method calls on it
+        mockSerialInstance = mock_serial.return_value
+
+        # set the in_waiting attribute 1 to avoid an infinite loop
+        mockSerialInstance.in_waiting = 1
+
+        mockHonkerInstance = mock_honker.return_value
+
+        # mock the reading of the arduino input
+        mock_readline = Mock()
+        mock_readline.decode.return_value = "50"
+        mockSerialInstance.readline.return_value = mock_readline
+
+        # set the check of the port to return true
+        mock_path.return_value = True
+
+        mockObstacleDetector = MagicMock()
+        mockObstacleDetector.get_obstacle_score.return_value = 0.8
+
+        communicator = ArduinoCommunicator(self.port, self.baudrate)
+        communicator.activate_distance_sensors(1, True, False)
+        communicator.add_obstacle_detector(mockObstacleDetector)
+        communicator.setup()
+
+        communicator.start()
+
+        # assert that the score from the camera is given together with the sensor readings
+        mockHonkerInstance.prepare_for_honking.assert_called_once_with([50, None], 0.8)
+
+    @patch("arduinoCommunicator.Honker")
+    @patch("os.path.exists")
+    def test_no_answer_from_arduino_gives_no_reading(self, mock_path, mock_honker, mock_wait_until_ready, mock_serial, mock_setmode):
+        mockSerialInstance = mock_serial.return_value
+        mockHonkerInstance = mock_honker.return_value
+
+        # readline returns an empty line when the read timeout has passed
+        mockSerialInstance.readline.return_value = b""
+
+        mock_path.return_value = True
+
+        communicator = ArduinoCommunicator(self.port, self.baudrate, readTimeout=0.5)
+        communicator.activate_distance_sensors(1, True, False)
+        communicator.setup()
+
+        communicator.start()
+
+        mock_serial.assert_called_once_with(self.port, self.baudrate, timeout=0.5)
+        mockHonkerInstance.prepare_for_honking.assert_called_once_with([None, None], None)
+
+    @patch("arduinoCommunicator.Honker")
+    @patch("os.path.exists")
+    def test_partial_line_is_thrown_away(self, mock_path, mock_honker, mock_wait_until_ready, mock_serial, mock_setmode):
+        mockSerialInstance = mock_serial.return_value
+        mockHonkerInstance = mock_honker.return_value
+
+        # the timeout passed in the middle of the front reading
+        mockSerialInstance.readline.side_effect = [b"12.", b"40.00\r\n"]
+
+        mock_path.return_value = True
+
+        communicator = ArduinoCommunicator(self.port, self.baudrate)
+        communicator.activate_distance_sensors(1, True, True)
+        communicator.setup()
+        mockSerialInstance.reset_input_buffer.reset_mock()
+
+        communicator.start()
+
+        # the rest of the front reading isn't taken as the back reading
+        mockSerialInstance.reset_input_buffer.assert_called_once()
+        mockHonkerInstance.prepare_for_honking.assert_called_once_with([None, 40.0], None)
+
+    @patch("arduinoCommunicator.Honker")
+    @patch("os.path.exists")
+    def test_partial_batched_line_gives_no_readings(self, mock_path, mock_honker, mock_wait_until_ready, mock_serial, mock_setmode):
+        mockSerialInstance = mock_serial.return_value
+        mockHonkerInstance = mock_honker.return_value
+
+        mockSerialInstance.readline.return_value = b"12.50,4"
+
+        mock_path.return_value = True
+
+        communicator = ArduinoCommunicator(self.port, self.baudrate)
+        communicator.activate_distance_sensors(1, True, True)
+        communicator.set_batched_readings_enabled()
+        communicator.setup()
+        mockSerialInstance.reset_input_buffer.reset_mock()
+
+        communicator.start()
+
+        mockSerialInstance.reset_input_buffer.assert_called_once()
+        mockHonkerInstance.prepare_for_honking.assert_called_once_with([None, None], None)
+
+    @patch("arduinoCommunicator.Honker")
+    @patch("os.path.exists")
+    @patch("arduinoCommunicator.time")
+    def test_time_until_next_update(self, mock_time, mock_path, mock_honker, mock_wait_until_ready, mock_serial, mock_setmode):
+        mockSerialInstance = mock_serial.return_value
+        mockSerialInstance.readline.return_value = b"50\r\n"
+
+        mockHonkerInstance = mock_honker.return_value
+        mockHonkerInstance.get_time_until_next_honk_change.return_value = None
+
+        mock_path.return_value = True
+
+        communicator = ArduinoCommunicator(self.port, self.baudrate, waitTime=0.1)
+        communicator.activate_distance_sensors(1, True, False)
+        communicator.setup()
+
+        # the first reading should be done right away
+        self.assertEqual(0.0, communicator.get_time_until_next_update())
+
+        mock_time.return_value = 10.0
+        communicator.start()
+
+        # without any honking the next update is the next reading
+        mock_time.return_value = 10.04
+        self.assertAlmostEqual(0.06, communicator.get_time_until_next_update())
+
+        # the buzzer has to change before the next reading
+        mockHonkerInstance.get_time_until_next_honk_change.return_value = 0.02
+        self.assertAlmostEqual(0.02, communicator.get_time_until_next_update())
+
     @patch("arduinoCommunicator.Honker")
     @patch("os.path.exists")
     @patch("arduinoCommunicator.time")
-    def test_wait_times_between_readings(self, mock_time, mock_path, mock_honker, mock_sleep, mock_serial, mock_setmode):
+    def test_wait_times_between_readings(self, mock_time, mock_path, mock_honker, mock_wait_until_ready, mock_serial, mock_setmode):
         # mock the return value of Serial object to mock the method calls on it
         mockSerialInstance = mock_serial.return_value
 
@@ -124,7 +286,7 @@ class testArduinoCommunicator(unittest.TestCase):
 
     @patch("arduinoCommunicator.PhotocellManager")
     @patch("os.path.exists")
-    def test_input_to_arduino(self, mock_path, mock_photocell, mock_sleep, mock_serial, mock_setmode):
+    def test_input_to_arduino(self, mock_path, mock_photocell, mock_wait_until_ready, mock_serial, mock_setmode):
         # mock the return value of Serial object to mock the method calls on it
         mockSerialInstance = mock_serial.return_value
 
@@ -155,7 +317,7 @@ class testArduinoCommunicator(unittest.TestCase):
 
     @patch("arduinoCommunicator.PhotocellManager")
     @patch("os.path.exists")
-    def test_decoding_of_input_from_arduino(self, mock_path, mock_photocell, mock_sleep, mock_serial, mock_setmode):
+    def test_decoding_of_input_from_arduino(self, mock_path, mock_photocell, mock_wait_until_ready, mock_serial, mock_setmode):
         # mock the return value of Serial object to mock the method calls on it
         mockSerialInstance = mock_serial.return_value
 
@@ -163,7 +325,7 @@ class testArduinoCommunicator(unittest.TestCase):
         mockSerialInstance.in_waiting = 1
 
         # mock the reading of the arduino input to be a byte encoded sequence
-        mockSerialInstance.readline.return_value = b'20.53'
+        mockSerialInstance.readline.return_value = b'20.53\r\n'
 
         # mock the photocell manager
         mockPhotoCellInstance = mock_photocell.return_value
@@ -182,4 +344,155 @@ class testArduinoCommunicator(unittest.TestCase):
 
         # check that the expected value is sent to the photocell manager
         expectedPhotocellReading = 20.53
-        mockPhotoCellInstance.adjust_lights.assert_called_once_with(expectedPhotocellReading)
\ No newline at end of file
+        mockPhotoCellInstance.adjust_lights.assert_called_once_with(expectedPhotocellReading)
+
+    @patch("arduinoCommunicator.PhotocellManager")
+    @patch("arduinoCommunicator.Honker")
+    @patch("os.path.exists")
+    def test_batched_readings_are_read_with_one_command(self, mock_path, mock_honker, mock_photocell,
+                                                        mock_wait_until_ready, mock_serial, mock_setmode):
+        mockSerialInstance = mock_serial.return_value
+        mockSerialInstance.readline.return_value = b"12.50,512\r\n"
+
+        mockHonkerInstance = mock_honker.return_value
+        mockPhotocellInstance = mock_photocell.return_value
+
+        mock_path.return_value = True
+
+        communicator = ArduinoCommunicator(self.port, self.baudrate)
+        communicator.activate_distance_sensors(1, True, False)
+        communicator.activate_photocell_lights([1, 2])
+        communicator.set_batched_readings_enabled()
+        communicator.setup()
+
+        communicator.start()
+
+        # only the activated sensors are asked for
+        mockSerialInstance.write.assert_called_once_with(b"read front,photocell\n")
+        mockHonkerInstance.prepare_for_honking.assert_called_once_with([12.5, None], None)
+        mockPhotocellInstance.adjust_lights.assert_called_once_with(512)
+
+    @patch("arduinoCommunicator.Honker")
+    @patch("os.path.exists")
+    def test_batched_reply_with_missing_readings_gives_no_readings(self, mock_path, mock_honker,
+                                                                   mock_wait_until_ready, mock_serial, mock_setmode):
+        mockSerialInstance = mock_serial.return_value
+
+        # the reply has one reading, but two sensors were asked for
+        mockSerialInstance.readline.return_value = b"12.50\r\n"
+
+        mockHonkerInstance = mock_honker.return_value
+
+        mock_path.return_value = True
+
+        communicator = ArduinoCommunicator(self.port, self.baudrate)
+        communicator.activate_distance_sensors(1, True, True)
+        communicator.set_batched_readings_enabled()
+        communicator.setup()
+
+        communicator.start()
+
+        mockHonkerInstance.prepare_for_honking.assert_called_once_with([None, None], None)
+    @patch("arduinoCommunicator.Honker")
+    @patch("os.path.exists")
+    def test_binary_protocol_reads_sensors_in_frames(self, mock_path, mock_honker,
+                                                     mock_wait_until_ready, mock_serial, mock_setmode):
+        mockSerialInstance = mock_serial.return_value
+        mockSerialInstance.readline.return_value = b"binary\r\n"
+
+        readingsFrame = BinaryProtocol().encode_frame(
+            BinaryProtocol.readingsType, struct.pack("<HHH", 4550, 12000, BinaryProtocol.missingReading))
+        mockSerialInstance.read.return_value = readingsFrame
+
+        mockHonkerInstance = mock_honker.return_value
+
+        mock_path.return_value = True
+
+        communicator = ArduinoCommunicator(self.port, self.baudrate)
+        communicator.activate_distance_sensors(1, True, True)
+        communicator.set_binary_protocol_enabled()
+        communicator.setup()
+
+        communicator.start()
+
+        mockSerialInstance.write.assert_called_with(BinaryProtocol().encode_read_request(["front", "back"]))
+        mockHonkerInstance.prepare_for_honking.assert_called_once_with([45.5, 120.0], None)
+
+    @patch("arduinoCommunicator.Honker")
+    @patch("os.path.exists")
+    def test_binary_readings_are_fresh_after_noise(self, mock_path, mock_honker,
+                                                   mock_wait_until_ready, mock_serial, mock_setmode):
+        mockHonkerInstance = mock_honker.return_value
+        mock_path.return_value = True
+
+        for noise in [b"\x00\x07", b"\xa5\x02\x00"]:
+            mock_serial.return_value = FakeBinarySerial(noise, noisyRequest=2)
+            mockHonkerInstance.reset_mock()
+
+            communicator = ArduinoCommunicator(self.port, self.baudrate, waitTime=0.0, readTimeout=0.05)
+            communicator.activate_distance_sensors(1, True, False)
+            communicator.set_binary_protocol_enabled()
+            communicator.setup()
+
+            for request in range(4):
+                communicator.start()
+
+            # every reading is the answer to its own request, and not to the one before it
+            readings = [honkingCall.args[0][0] for honkingCall in mockHonkerInstance.prepare_for_honking.call_args_list]
+            self.assertEqual([1.0, 2.0, 3.0, 4.0], readings, noise)
+
+    @patch("arduinoCommunicator.Honker")
+    @patch("os.path.exists")
+    def test_arduino_without_binary_protocol_is_read_with_text(self, mock_path, mock_honker,
+                                                               mock_wait_until_ready, mock_serial, mock_setmode):
+        mockSerialInstance = mock_serial.return_value
+
+        # an older arduino doesn't answer the binary command, and then answers the text command
+        mockSerialInstance.readline.side_effect = [b"", b"5\r\n"]
+
+        mockHonkerInstance = mock_honker.return_value
+
+        mock_path.return_value = True
+
+        communicator = ArduinoCommunicator(self.port, self.baudrate)
+        communicator.activate_distance_sensors(1, True, False)
+        communicator.set_binary_protocol_enabled()
+        communicator.setup()
+
+        communicator.start()
+
+        mockSerialInstance.write.assert_called_with(b"front\n")
+        mockHonkerInstance.prepare_for_honking.assert_called_once_with([5, None], None)
+
+@patch("os.path.exists", return_value=True)
+@patch("arduinoCommunicator.Serial")
+class testArduinoHandshake(unittest.TestCase):
+    def test_waits_for_ready_banner(self, mock_serial, mock_path):
+        mockSerialInstance = mock_serial.return_value
+
+        # the bootloader can send noise before the banner
+        mockSerialInstance.readline.side_effect = [b"\xf0\x00", b"ready\r\n"]
+
+        ArduinoCommunicator("/dev/ttyACM", 115200)
+
+        self.assertEqual(2, mockSerialInstance.readline.call_count)
+        mockSerialInstance.write.assert_not_called()
+
+    def test_asks_for_banner_when_nothing_comes(self, mock_serial, mock_path):
+        mockSerialInstance = mock_serial.return_value
+
+        # an arduino that wasn't reset when the port was opened doesn't send the banner by itself
+        mockSerialInstance.readline.side_effect = [b"", b"ready\r\n"]
+
+        ArduinoCommunicator("/dev/ttyACM", 115200)
+
+        mockSerialInstance.write.assert_called_once_with(b"ping\n")
+
+    def test_no_banner_before_timeout_is_startup_error(self, mock_serial, mock_path):
+        mockSerialInstance = mock_serial.return_value
+        mockSerialInstance.readline.return_value = b""
+
+        with self.assertRaises(ArduinoNotReadyError):
+            ArduinoCommunicator("/dev/ttyACM", 115200, readyTimeout=0.01)
+
+        mockSerialInstance.close.assert_called_once()
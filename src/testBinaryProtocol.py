@@ -0,0 +1,64 @@
+import unittest
+import struct
+
+from binaryProtocol import BinaryProtocol
+
+def get_readings_frame(protocol, front, back, photocell):
+    return protocol.encode_frame(BinaryProtocol.readingsType, struct.pack("<HHH", front, back, photocell))
+
+class TestBinaryProtocol(unittest.TestCase):
+    def test_read_request_has_a_bit_for_each_sensor_and_xmodem_crc(self):
+        protocol = BinaryProtocol()
+
+        frame = protocol.encode_read_request(["front", "back", "photocell"])
+
+        # the same bytes as SerialComm.ino expects, with the crc high byte first
+        self.assertEqual(bytes.fromhex("a5010700000000007020"), frame)
+
+    def test_readings_are_decoded_from_frame(self):
+        protocol = BinaryProtocol()
+
+        frames = protocol.decode_frames(get_readings_frame(protocol, 1234, BinaryProtocol.missingReading, 512))
+
+        self.assertEqual(1, len(frames))
+        messageType, payload = frames[0]
+        self.assertEqual(BinaryProtocol.readingsType, messageType)
+        self.assertEqual((12.34, None, 512), protocol.decode_readings(payload))
+
+    def test_frame_split_over_reads_is_decoded_when_complete(self):
+        protocol = BinaryProtocol()
+        frame = get_readings_frame(protocol, 100, 200, 300)
+
+        self.assertEqual([], protocol.decode_frames(frame[:4]))
+        self.assertEqual(1, len(protocol.decode_frames(frame[4:])))
+
+    def test_noise_before_frame_is_skipped(self):
+        protocol = BinaryProtocol()
+
+        frames = protocol.decode_frames(b"12.5\r\n" + get_readings_frame(protocol, 100, 200, 300))
+
+        self.assertEqual(1, len(frames))
+        self.assertEqual(6, protocol.get_dropped_bytes())
+
+    def test_corrupted_frame_is_skipped_and_next_frame_is_decoded(self):
+        protocol = BinaryProtocol()
+        corruptedFrame = bytearray(get_readings_frame(protocol, 100, 200, 300))
+        corruptedFrame[3] ^= 0x10
+
+        frames = protocol.decode_frames(bytes(corruptedFrame) + get_readings_frame(protocol, 400, 500, 600))
+
+        self.assertEqual(1, len(frames))
+        self.assertEqual(4.0, protocol.decode_readings(frames[0][1])[0])
+
+    def test_cut_off_frame_is_skipped_and_next_frame_is_decoded(self):
+        protocol = BinaryProtocol()
+        frame = get_readings_frame(protocol, 100, 200, 300)
+
+        # the first frame lost its last bytes, so the sync byte of the next frame is inside its place
+        frames = protocol.decode_frames(frame[:5] + get_readings_frame(protocol, 400, 500, 600))
+
+        self.assertEqual(1, len(frames))
+        self.assertEqual(4.0, protocol.decode_readings(frames[0][1])[0])
+
+if __name__ == '__main__':
+    unittest.main()
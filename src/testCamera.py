@@ -1,6 +1,5 @@
 import unittest
 from unittest.mock import patch, MagicMock, ANY, call
-from multiprocessing import Array
 import numpy as np
 import numpy.testing as npt
 
@@ -17,10 +16,15 @@ patcher = patch.dict("sys.modules", modules)
 patcher.start()
 
 from camera import Camera
+from stateBus import StateBus
 from libcamera import Transform
+from frameSources import SyntheticSource
+
+def get_state_bus(servo, hud, zoom, speed, turn):
+    return StateBus({"servo": servo, "HUD": hud, "Zoom": zoom, "speed": speed, "turn": turn})
 
 class TestCamera(unittest.TestCase):
-        @patch("camera.Picamera2")
+        @patch("frameSources.Picamera2")
         def test_setup_calls_configuration_with_correct_resolution(self, mockPiCam):
             resolution = (1080, 720)
             rotation = False
@@ -45,7 +49,7 @@ class TestCamera(unittest.TestCase):
             mockPiCamInstance.configure.assert_called_once_with(
                 "mock_config"
             )
-        @patch("camera.Picamera2")
+        @patch("frameSources.Picamera2")
         @patch("camera.cv2")
         def test_cleanup(self, mockCv2, mockPicam):
             mockPiCamInstance = mockPicam.return_value
@@ -61,7 +65,7 @@ class TestCamera(unittest.TestCase):
             mockPiCamInstance.close.assert_called_once()
 
         @patch("camera.time")
-        @patch("camera.Picamera2")
+        @patch("frameSources.Picamera2")
         @patch("camera.cv2")
         def test_output_of_control_values_is_not_called_according_to_HUD_value(self, mock_cv2, mock_piCam, mock_time):
             # set up camera
@@ -72,24 +76,22 @@ class TestCamera(unittest.TestCase):
             cam.set_car_enabled()
             cam.set_servo_enabled()
 
-            # add array dictionary
-            arrayDict = {"servo": 0, "HUD": 1, "Zoom": 2, "speed": 3, "turn": 4}
-            cam.add_array_dict(arrayDict)
 
             # set each time call to return a higher value to avoid a zero division error in the fps equation
             # I think this is because the test run so fast that looptime will be almost equal to 0
             mock_time.side_effect = [1,2,3,4]
 
             # simulate showing camera feed with HUD turned off
-            array = Array('d', (0.0, 0.0, 2.0, 3.0, 1.0))
-            cam.show_camera_feed(array)
+            stateBus = get_state_bus(0.0, 0.0, 2.0, 3.0, 1.0)
+            stateSubscriber = stateBus.subscribe()
+            cam.show_camera_feed(stateSubscriber)
 
             # check that the method to add text has NOT been called
             mock_cv2.putText.assert_not_called()
 
             # simulate showing camera feed with HUD turned on
-            array = Array('d', (0.0, 1.0, 2.0, 3.0, 1.0))
-            cam.show_camera_feed(array)
+            stateBus.publish({"HUD": 1.0})
+            cam.show_camera_feed(stateSubscriber)
 
             # check that the method to add text has been called
             mock_cv2.putText.assert_called()
@@ -105,20 +107,17 @@ class TestCamera(unittest.TestCase):
             cam.set_car_enabled()
             cam.set_servo_enabled()
 
-            # add array dictionary
-            arrayDict = {"servo": 0, "HUD": 1, "Zoom": 2, "speed": 3, "turn": 4}
-            cam.add_array_dict(arrayDict)
 
             # setting return values of time to get an expected outcome of the fps equation
             mock_time.side_effect = [0.01, 0.02, 0.005, 0.01, 1, 2]
 
             # simulate showing camera feed with HUD turned on
-            array = Array('d', (50.0, 1.0, 30.0, 20.0, 1.0))
+            stateSubscriber = get_state_bus(50.0, 1.0, 30.0, 20.0, 1.0).subscribe()
 
             # call show_camera_feed three times to get the effects of the weightings in the fps equation
-            cam.show_camera_feed(array)
-            cam.show_camera_feed(array)
-            cam.show_camera_feed(array)
+            cam.show_camera_feed(stateSubscriber)
+            cam.show_camera_feed(stateSubscriber)
+            cam.show_camera_feed(stateSubscriber)
 
             zoomText = "Zoom: 30.0x"
             angleText = "Angle: 50"
@@ -147,17 +146,14 @@ class TestCamera(unittest.TestCase):
             cam.set_car_enabled()
             cam.set_servo_enabled()
 
-            # add array dictionary
-            arrayDict = {"servo": 0, "HUD": 1, "Zoom": 2, "speed": 3, "turn": 4}
-            cam.add_array_dict(arrayDict)
 
             # set each time call to return a higher value to avoid a zero division error in the fps equation
             # I think this is because the test run so fast that looptime will be almost equal to 0
             mock_time.side_effect = [1, 2]
 
             # simulate showing camera feed with HUD turned on
-            array = Array('d', (50.0, 1.0, 30.0, 20.0, 1.0))
-            cam.show_camera_feed(array)
+            stateSubscriber = get_state_bus(50.0, 1.0, 30.0, 20.0, 1.0).subscribe()
+            cam.show_camera_feed(stateSubscriber)
 
             horizontalCoord = 10
             zoomTextPosition = (horizontalCoord, 705)
@@ -186,17 +182,14 @@ class TestCamera(unittest.TestCase):
             # set car, but not servo
             cam.set_car_enabled()
 
-            # add array dictionary
-            arrayDict = {"servo": 0, "HUD": 1, "Zoom": 2, "speed": 3, "turn": 4}
-            cam.add_array_dict(arrayDict)
 
             # set each time call to return a higher value to avoid a zero division error in the fps equation
             # I think this is because the test run so fast that looptime will be almost equal to 0
             mock_time.side_effect = [1, 2]
 
             # simulate showing camera feed with HUD turned on
-            array = Array('d', (50.0, 1.0, 30.0, 20.0, 1.0))
-            cam.show_camera_feed(array)
+            stateSubscriber = get_state_bus(50.0, 1.0, 30.0, 20.0, 1.0).subscribe()
+            cam.show_camera_feed(stateSubscriber)
 
             horizontalCoord = 10
             zoomTextPosition = (horizontalCoord, 705)
@@ -213,10 +206,11 @@ class TestCamera(unittest.TestCase):
 
             mock_cv2.putText.assert_has_calls(calls, any_order=False)
 
-        @patch("camera.Picamera2")
+        @patch("frameSources.Picamera2")
         @patch("camera.time")
         @patch("camera.cv2")
-        def test_zoom(self, mock_cv2, mock_time, mock_picam):
+        @patch("zoomEngine.cv2")
+        def test_zoom(self, mock_cv2, mock_camera_cv2, mock_time, mock_picam):
             mockPiCamInstance = mock_picam.return_value
 
             displayWidth = 1080
@@ -226,9 +220,6 @@ class TestCamera(unittest.TestCase):
             cam = Camera((displayWidth, displayHeight), True)
             cam.setup()
 
-            # add array dictionary
-            arrayDict = {"servo": 0, "HUD": 1, "Zoom": 2, "speed": 3, "turn": 4}
-            cam.add_array_dict(arrayDict)
 
             # set each time call to return a higher value to avoid a zero division error in the fps equation
             # I think this is because the test run so fast that looptime will be almost equal to 0
@@ -244,8 +235,8 @@ class TestCamera(unittest.TestCase):
             zoomedImage = image_array[180:540, 270:810]
 
             # simulate showing camera feed with zoom value equal to 2.0
-            array = Array('d', (50.0, 0.0, 2.0, 20.0, 1.0))
-            cam.show_camera_feed(array)
+            stateSubscriber = get_state_bus(50.0, 0.0, 2.0, 20.0, 1.0).subscribe()
+            cam.show_camera_feed(stateSubscriber)
 
             # since there is some issues with array equality checking with the assert_called_with method, we unpack
             # the arguments called in the method and check them separately later
@@ -260,3 +251,141 @@ class TestCamera(unittest.TestCase):
 
 
 
+        @patch("frameSources.Picamera2")
+        @patch("camera.time")
+        @patch("camera.cv2")
+        def test_unchanged_text_is_only_rendered_once(self, mock_cv2, mock_time, mock_picam):
+            mockPiCamInstance = mock_picam.return_value
+
+            displayWidth = 200
+            displayHeight = 100
+
+            # let the mocked putText draw a small block at the origin of the text
+            def fake_put_text(image, text, origin, *args):
+                image[origin[1] - 5:origin[1], origin[0]:origin[0] + 10] = args[2]
+            mock_cv2.putText.side_effect = fake_put_text
+
+            cam = Camera((displayWidth, displayHeight), True)
+            cam.setup()
+
+
+            mock_time.side_effect = [1, 2, 3, 4]
+
+            stateSubscriber = get_state_bus(50.0, 1.0, 1.0, 20.0, 1.0).subscribe()
+
+            mockPiCamInstance.capture_array.return_value = np.zeros((displayHeight, displayWidth, 3), dtype=np.uint8)
+            cam.show_camera_feed(stateSubscriber)
+
+            image = np.zeros((displayHeight, displayWidth, 3), dtype=np.uint8)
+            mockPiCamInstance.capture_array.return_value = image
+            cam.show_camera_feed(stateSubscriber)
+
+            zoomTextCalls = [c for c in mock_cv2.putText.call_args_list if c.args[1] == "Zoom: 1.0x"]
+
+            # the zoom text is rendered once, but drawn on both frames
+            self.assertEqual(1, len(zoomTextCalls))
+            npt.assert_array_equal(image[80:85, 10:20], np.full((5, 10, 3), (0, 255, 0), dtype=np.uint8))
+
+        @patch("camera.FrameGrabber")
+        @patch("frameSources.Picamera2")
+        @patch("camera.time")
+        @patch("camera.cv2")
+        def test_threaded_capture_shows_latest_frame_from_grabber(self, mock_cv2, mock_time, mock_picam, mock_grabber):
+            mockPiCamInstance = mock_picam.return_value
+            mockGrabberInstance = mock_grabber.return_value
+
+            image = np.zeros((720, 1080, 3), dtype=np.uint8)
+            mockGrabberInstance.get_latest_frame.return_value = image
+
+            cam = Camera((1080, 720), True)
+            cam.set_threaded_capture_enabled()
+            cam.setup()
+
+
+            mock_time.side_effect = [1, 2]
+
+            stateSubscriber = get_state_bus(50.0, 0.0, 1.0, 20.0, 1.0).subscribe()
+            cam.show_camera_feed(stateSubscriber)
+
+            # frames are captured by the grabber thread, not by the display loop
+            mock_grabber.assert_called_once()
+            mockGrabberInstance.start.assert_called_once()
+            mockPiCamInstance.capture_array.assert_not_called()
+            mock_cv2.imshow.assert_called_once_with("Camera", image)
+
+            # the grabber captures from the camera
+            captureFunction = mock_grabber.call_args.args[0]
+            captureFunction()
+            mockPiCamInstance.capture_array.assert_called_once()
+
+        @patch("frameSources.Picamera2")
+        @patch("camera.time")
+        @patch("camera.cv2")
+        def test_frames_are_published_to_mjpeg_streamer_instead_of_window(self, mock_cv2, mock_time, mock_picam):
+            mockPiCamInstance = mock_picam.return_value
+            mockStreamer = MagicMock()
+
+            image = np.zeros((720, 1080, 3), dtype=np.uint8)
+            mockPiCamInstance.capture_array.return_value = image
+
+            cam = Camera((1080, 720), True)
+            cam.add_mjpeg_streamer(mockStreamer)
+            cam.setup()
+
+
+            mock_time.side_effect = [1, 2]
+
+            stateSubscriber = get_state_bus(50.0, 0.0, 1.0, 20.0, 1.0).subscribe()
+            cam.show_camera_feed(stateSubscriber)
+            cam.cleanup()
+
+            mockStreamer.start.assert_called_once()
+            mockStreamer.publish.assert_called_once_with(image)
+            mockStreamer.stop.assert_called_once()
+            mock_cv2.imshow.assert_not_called()
+            mock_cv2.destroyAllWindows.assert_not_called()
+
+        @patch("frameSources.Picamera2")
+        @patch("camera.time")
+        @patch("camera.cv2")
+        def test_camera_is_reconfigured_when_governor_changes_resolution(self, mock_cv2, mock_time, mock_picam):
+            mockPiCamInstance = mock_picam.return_value
+            mockGovernor = MagicMock()
+            mockGovernor.get_resolution.side_effect = [(640, 480), (320, 240), (320, 240)]
+            mockGovernor.get_frame_rate.return_value = 20
+            mockGovernor.update.return_value = True
+
+            mockPiCamInstance.capture_array.return_value = np.zeros((480, 640, 3), dtype=np.uint8)
+
+            cam = Camera((640, 480), True)
+            cam.add_resolution_governor(mockGovernor)
+            cam.setup()
+
+
+            mock_time.side_effect = [1, 1.5, 2, 2]
+
+            stateSubscriber = get_state_bus(50.0, 0.0, 1.0, 20.0, 1.0).subscribe()
+            cam.show_camera_feed(stateSubscriber)
+
+            mockPiCamInstance.stop.assert_called_once()
+            self.assertEqual((320, 240), cam.get_resolution())
+            self.assertEqual((320, 240), mockPiCamInstance.create_preview_configuration.call_args.args[0]["size"])
+            self.assertEqual({"FrameRate": 20}, mockPiCamInstance.create_preview_configuration.call_args.kwargs["controls"])
+
+        @patch("camera.time")
+        @patch("camera.cv2")
+        def test_synthetic_frames_without_display(self, mock_cv2, mock_time):
+            cam = Camera((320, 240), True)
+            cam.add_frame_source(SyntheticSource())
+            cam.set_display_disabled()
+            cam.setup()
+
+
+            mock_time.side_effect = [1, 2]
+
+            stateSubscriber = get_state_bus(50.0, 1.0, 1.0, 20.0, 1.0).subscribe()
+            cam.show_camera_feed(stateSubscriber)
+            cam.cleanup()
+
+            mock_cv2.imshow.assert_not_called()
+            mock_cv2.destroyAllWindows.assert_not_called()
@@ -1,7 +1,7 @@
 import unittest
 from unittest.mock import patch, MagicMock, Mock
 from cameraHelper import CameraHelper
-from multiprocessing import Array
+from stateBus import StateBus
 
 # mock the import of pigpio and GPIO
 MockPigpio = MagicMock()
@@ -105,7 +105,7 @@ class TestCameraHelper(unittest.TestCase):
     @patch.object(CarHandling, "get_current_turn_value", autospec=True)
     @patch.object(CarHandling, "get_current_speed", autospec=True)
     @patch.object(ServoHandling, "get_current_servo_angle", autospec=True)
-    def test_update_control_values_for_video_feed(self, mock_angle, mock_speed, mock_turn):
+    def test_publish_control_values(self, mock_angle, mock_speed, mock_turn):
         mock_angle.return_value = 3.0
         mock_speed.return_value = 40.0
         mock_turn.return_value = "Right"
@@ -113,19 +113,35 @@ class TestCameraHelper(unittest.TestCase):
         servo = self.get_servo()
         car = self.get_car()
 
-        array = Array('d', (1.0, 2.0, 3.0, 4.0, 5.0))
-        arrayDict = {"servo": 0, "HUD": 1, "Zoom": 2, "speed": 3, "turn": 4}
+        stateBus = StateBus({"servo": 1.0, "HUD": 2.0, "Zoom": 3.0, "speed": 4.0, "turn": 5.0})
+        stateSubscriber = stateBus.subscribe()
+        stateSubscriber.get_changes()
 
         helper = CameraHelper()
-        helper.add_array_dict(arrayDict)
         helper.add_servo(servo)
         helper.add_car(car)
-        helper.update_control_values_for_video_feed(array)
-
-        # check that the method updates the array with expected values for servo and car
-        self.assertEqual(3, array[0])
-        self.assertEqual(40.0, array[3])
-        self.assertEqual(2, array[4])
+        published = helper.publish_control_values(stateBus)
+
+        # check that the method updates the state bus with expected values for servo and car
+        version, controlValues = stateBus.read()
+        self.assertTrue(published)
+        self.assertEqual(3, controlValues["servo"])
+        self.assertEqual(40.0, controlValues["speed"])
+        self.assertEqual(2, controlValues["turn"])
+
+        # check that all values were written as one new version
+        self.assertEqual(2, version)
+
+        # check that publishing the same values again doesn't write anything
+        stateSubscriber.get_changes()
+        self.assertFalse(helper.publish_control_values(stateBus))
+        self.assertEqual(2, stateBus.get_version())
+        self.assertEqual({}, stateSubscriber.get_changes())
+
+        # check that only the changed value reaches the subscriber
+        mock_speed.return_value = 60.0
+        helper.publish_control_values(stateBus)
+        self.assertEqual({"speed": 60.0}, stateSubscriber.get_changes())
 
     def test_get_camera_buttons(self):
         helper = CameraHelper()
@@ -223,6 +223,69 @@ class TestCarHandling(unittest.TestCase):
         # assert forward pins are called
         mock_output.assert_has_calls(calls, any_order=True)
 
+    @patch("RPi.GPIO.setmode")
+    @patch("RPi.GPIO.PWM")
+    @patch("RPi.GPIO.setup")
+    @patch("RPi.GPIO.output")
+    def test_pins_are_only_set_when_direction_changes(self, mock_output, mock_setup, mock_pwm, mock_setmode):
+        car = self.get_car()
+        car.setup()
+
+        pwmA = Mock()
+        pwmB = Mock()
+
+        car._pwmA = pwmA
+        car._pwmB = pwmB
+
+        # holding the throttle at different positions only changes the speed
+        car.handle_xbox_input("RT", 0.0)
+        car.handle_xbox_input("RT", 0.2)
+        car.handle_xbox_input("RT", 0.4)
+
+        self.assertEqual(4, mock_output.call_count)
+        self.assertEqual(3, pwmA.ChangeDutyCycle.call_count)
+
+        # reversing changes the direction, so all pins are set again
+        car.handle_xbox_input("RT", -1.0)
+        car.handle_xbox_input("LT", 0.0)
+
+        self.assertEqual(12, mock_output.call_count)
+
+
+    @patch("RPi.GPIO.setmode")
+    @patch("RPi.GPIO.PWM")
+    @patch("RPi.GPIO.setup")
+    @patch("RPi.GPIO.output")
+    def test_safe_stop_sets_motors_to_zero(self, mock_output, mock_setup, mock_pwm, mock_setmode):
+        car = self.get_car()
+        car.setup()
+
+        pwmA = Mock()
+        pwmB = Mock()
+
+        car._pwmA = pwmA
+        car._pwmB = pwmB
+
+        car.handle_xbox_input("RT", 0.4)
+        car.handle_xbox_input("D-PAD left", 1)
+        mock_output.reset_mock()
+
+        car.safe_stop()
+
+        pwmA.ChangeDutyCycle.assert_called_with(0)
+        pwmB.ChangeDutyCycle.assert_called_with(0)
+        self.assertEqual(0, car.get_current_speed())
+        self.assertEqual("-", car.get_current_turn_value())
+
+        calls = [
+            call(self.leftForward, GPIO.LOW),
+            call(self.rightForward, GPIO.LOW),
+            call(self.leftBackward, GPIO.LOW),
+            call(self.rightBackward, GPIO.LOW)
+        ]
+
+        mock_output.assert_has_calls(calls, any_order=True)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
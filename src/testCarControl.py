@@ -0,0 +1,298 @@
+import unittest
+from unittest.mock import patch
+from multiprocessing import Value, set_start_method
+from threading import Thread
+from time import sleep, monotonic
+import os
+import numpy as np
+
+from carControl import CarControl
+from loopMonitor import LoopMonitor
+
+class FakeArduinoCommunicator:
+    # crashes in the first given number of workers, or hangs if hang is set
+    def __init__(self, crashes=0, hang=False):
+        self._crashes = crashes
+        self._hang = hang
+        self.setups = Value('i', 0)
+        self.serialPort = None
+
+    def setup(self):
+        self.setups.value += 1
+
+    def start(self):
+        if self.setups.value <= self._crashes:
+            os._exit(1)
+
+        while self._hang:
+            sleep(0.1)
+
+    def get_time_until_next_update(self):
+        return 0.01
+
+    def cleanup(self):
+        pass
+
+
+class FakeCamera:
+    # writes a small frame to the frame ring every cycle
+    def __init__(self):
+        self._frameRing = None
+
+    def set_car_enabled(self):
+        pass
+
+    def set_servo_enabled(self):
+        pass
+
+    def add_frame_ring(self, frameRing):
+        self._frameRing = frameRing
+
+    def setup(self):
+        pass
+
+    def show_camera_feed(self, stateSubscriber):
+        self._frameRing.write(np.zeros((6, 8, 3), dtype=np.uint8))
+        sleep(0.01)
+
+    def cleanup(self):
+        pass
+
+
+class FakeFrameConsumer:
+    def __init__(self):
+        self.frames = Value('i', 0)
+
+    def setup(self):
+        pass
+
+    def handle_frame(self, image, timestamp):
+        self.frames.value += 1
+
+    def cleanup(self):
+        pass
+
+
+class FakeComponentSpec:
+    # builds the communicator and camera in their workers, like a spec from config.ini does
+    def __init__(self, communicator, camera=None):
+        self._communicator = communicator
+        self._camera = camera
+        self.workerBuilds = Value('i', 0)
+        self.controllersOpened = Value('i', 0)
+
+    def get_enabled_components(self):
+        return {"arduino", "camera"} if self._camera else {"arduino"}
+
+    def get_max_camera_resolution(self):
+        return 8, 6
+
+    def run_worker(self, workerName, workerState, readyWriter, targetName, args):
+        # the worker may be spawned, so the controller is faked in the worker itself
+        with patch("xboxControl.XboxControl") as mock_xbox:
+            mock_xbox.return_value.wait_for_controller_events.side_effect = lambda timeout: sleep(0.01) or []
+            mock_xbox.return_value.coalesce_axis_events.side_effect = lambda events: events
+
+            carControl = CarControl(x11Required=False, controllerRequired=workerName == "control")
+            carControl.set_component_spec(self)
+            if workerName == "arduino":
+                carControl.add_arduino_communicator(self._communicator)
+            elif workerName == "camera":
+                carControl.add_camera(self._camera)
+
+            self.controllersOpened.value += mock_xbox.call_count
+            self.workerBuilds.value += 1
+
+            carControl.run_worker(workerState, readyWriter, targetName, args)
+
+
+def wait_for_value(value, expected, timeout=5.0):
+    wait_until(lambda: value.value >= expected, timeout)
+
+
+def wait_until(condition, timeout=5.0):
+    endTime = monotonic() + timeout
+    while not condition() and monotonic() < endTime:
+        sleep(0.01)
+
+
+@patch("xboxControl.XboxControl")
+class TestCarControl(unittest.TestCase):
+    def get_car_control(self, mock_xbox, communicator):
+        # the controller never sends anything, it only waits a little
+        mock_xbox.return_value.wait_for_controller_events.side_effect = lambda timeout: sleep(0.01) or []
+        mock_xbox.return_value.coalesce_axis_events.side_effect = lambda events: events
+
+        carControl = CarControl(x11Required=False)
+        carControl.add_arduino_communicator(communicator)
+
+        # a test that fails would otherwise leave its workers running
+        self.addCleanup(self.stop_car_control, carControl)
+
+        return carControl
+
+    def run_supervisor(self, carControl):
+        supervisor = Thread(target=carControl.supervise)
+        supervisor.start()
+
+        # the cleanups run last first, so the supervisor is stopped before the workers are cleaned up
+        self.addCleanup(self.stop_supervisor, carControl, supervisor)
+
+        return supervisor
+
+    def stop_supervisor(self, carControl, supervisor):
+        carControl.shared_exit_event.set()
+        supervisor.join(5.0)
+
+    def stop_car_control(self, carControl):
+        carControl.shared_exit_event.set()
+        carControl.cleanup()
+
+    def test_crashed_worker_is_restarted(self, mock_xbox):
+        communicator = FakeArduinoCommunicator(crashes=1)
+        carControl = self.get_car_control(mock_xbox, communicator)
+        carControl.start()
+        firstProcess = carControl._processes["arduino"]
+
+        supervisor = self.run_supervisor(carControl)
+
+        # the new worker can be set up before the supervisor has stored its process
+        wait_for_value(communicator.setups, 2)
+        wait_until(lambda: carControl._processes["arduino"] is not firstProcess)
+
+        self.assertEqual(2, communicator.setups.value)
+        self.assertIsNot(firstProcess, carControl._processes["arduino"])
+        self.assertTrue(carControl._processes["arduino"].is_alive())
+        self.assertTrue(carControl._processes["control"].is_alive())
+
+        self.doCleanups()
+
+        self.assertFalse(supervisor.is_alive())
+        self.assertFalse(carControl._processes["arduino"].is_alive())
+
+    def test_worker_is_given_up_after_max_restarts(self, mock_xbox):
+        communicator = FakeArduinoCommunicator(crashes=100)
+        carControl = self.get_car_control(mock_xbox, communicator)
+        carControl.set_supervision(maxRestarts=2, joinTimeout=1.0)
+        carControl.start()
+
+        self.run_supervisor(carControl)
+        wait_for_value(communicator.setups, 3)
+        sleep(0.2)
+
+        # the first worker and two restarts, and the rest of the program carries on
+        self.assertEqual(3, communicator.setups.value)
+        self.assertNotIn("arduino", carControl._processes)
+        self.assertFalse(carControl.shared_exit_event.is_set())
+
+    def test_cleanup_terminates_worker_that_does_not_stop(self, mock_xbox):
+        communicator = FakeArduinoCommunicator(hang=True)
+        carControl = self.get_car_control(mock_xbox, communicator)
+        carControl.set_supervision(maxRestarts=3, joinTimeout=0.2)
+        carControl.start()
+        wait_for_value(communicator.setups, 1)
+
+        startTime = monotonic()
+        self.doCleanups()
+
+        self.assertLess(monotonic() - startTime, 3.0)
+        self.assertFalse(carControl._processes["arduino"].is_alive())
+        self.assertFalse(carControl._processes["control"].is_alive())
+
+    def test_bootstrapped_workers_build_their_own_components(self, mock_xbox):
+        communicator = FakeArduinoCommunicator()
+        componentSpec = FakeComponentSpec(communicator)
+
+        carControl = CarControl(x11Required=False, controllerRequired=False)
+        carControl.set_component_spec(componentSpec)
+        carControl.start()
+        self.addCleanup(self.stop_car_control, carControl)
+
+        wait_for_value(componentSpec.workerBuilds, 2)
+        wait_for_value(communicator.setups, 1)
+
+        # the controller is only opened in the control worker, and not in this process
+        self.assertEqual(2, componentSpec.workerBuilds.value)
+        self.assertEqual(1, componentSpec.controllersOpened.value)
+        self.assertEqual(0, mock_xbox.call_count)
+        self.assertEqual(1, communicator.setups.value)
+        self.assertIsNone(carControl._arduinoCommunicator)
+
+    def test_spawned_workers_share_state_with_this_process(self, mock_xbox):
+        # the frame ring, state bus and loop monitor are sent to the workers when they are spawned
+        set_start_method("spawn", force=True)
+        self.addCleanup(set_start_method, "fork", force=True)
+
+        communicator = FakeArduinoCommunicator()
+        frameConsumer = FakeFrameConsumer()
+        componentSpec = FakeComponentSpec(communicator, FakeCamera())
+        cameraMonitor = LoopMonitor("Camera", 0.1)
+
+        carControl = CarControl(x11Required=False, controllerRequired=False)
+        carControl.set_component_spec(componentSpec)
+        carControl.add_frame_consumer(frameConsumer)
+        carControl.add_loop_monitor("camera", cameraMonitor)
+        carControl.start()
+        self.addCleanup(self.stop_car_control, carControl)
+
+        wait_for_value(componentSpec.workerBuilds, 4, timeout=20.0)
+        wait_for_value(frameConsumer.frames, 3, timeout=20.0)
+        wait_for_value(communicator.setups, 1, timeout=20.0)
+
+        self.assertGreaterEqual(frameConsumer.frames.value, 3)
+        self.assertGreater(cameraMonitor.get_statistics()["cycles"], 0)
+        self.assertEqual(1, communicator.setups.value)
+        self.assertEqual(4, componentSpec.workerBuilds.value)
+
+    def test_worker_that_cannot_find_its_hardware_is_not_restarted(self, mock_xbox):
+        communicator = FakeArduinoCommunicator()
+        communicator.setup = lambda: exit(CarControl.startupErrorExitCode)
+        carControl = self.get_car_control(mock_xbox, communicator)
+        carControl.start()
+
+        # the supervisor removes the worker when it has stopped, which can be before it is joined here
+        process = carControl._processes["arduino"]
+        self.run_supervisor(carControl)
+        process.join(5.0)
+        sleep(0.2)
+
+        self.assertNotIn("arduino", carControl._processes)
+        self.assertNotIn("arduino", carControl._restartCounts)
+
+    def test_asyncio_runtime_runs_components_in_this_process(self, mock_xbox):
+        communicator = FakeArduinoCommunicator()
+        carControl = self.get_car_control(mock_xbox, communicator)
+        carControl.set_runtime("asyncio")
+        carControl.start()
+
+        supervisor = self.run_supervisor(carControl)
+        wait_for_value(communicator.setups, 1)
+
+        self.assertEqual(1, communicator.setups.value)
+        self.assertEqual({}, carControl._processes)
+
+        self.doCleanups()
+
+        self.assertFalse(supervisor.is_alive())
+
+    def test_asyncio_runtime_exits_when_a_component_crashes(self, mock_xbox):
+        communicator = FakeArduinoCommunicator()
+        communicator.start = lambda: 1 / 0
+        carControl = self.get_car_control(mock_xbox, communicator)
+        carControl.set_runtime("asyncio")
+        carControl.start()
+
+        supervisor = self.run_supervisor(carControl)
+        supervisor.join(5.0)
+
+        self.assertFalse(supervisor.is_alive())
+        self.assertTrue(carControl.shared_exit_event.is_set())
+
+    def test_unknown_runtime_raises_error(self, mock_xbox):
+        carControl = CarControl(x11Required=False)
+
+        with self.assertRaises(ValueError):
+            carControl.set_runtime("threads")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from configparser import ConfigParser
+import os
+import pickle
+import sys
+from threading import Barrier
+
+# mock the import of RPi.GPIO and pigpio
+MockRPi = MagicMock()
+modules = {
+    "RPi": MockRPi,
+    "RPi.GPIO": MockRPi.GPIO,
+    "pigpio": MagicMock()
+}
+patcher = patch.dict("sys.modules", modules)
+patcher.start()
+
+from componentSetup import ComponentSpec, add_components, add_hardware_components, setup_hardware_components, \
+    setup_startup_profiler
+
+class FakeCarControl:
+    def __init__(self):
+        self.components = {}
+
+    def add_car(self, car):
+        self.components["car"] = car
+
+    def add_servo(self, servo):
+        self.components.setdefault("servos", []).append(servo)
+
+    def add_camera_helper(self, cameraHelper):
+        self.components["cameraHelper"] = cameraHelper
+
+    def add_camera(self, camera):
+        self.components["camera"] = camera
+
+    def add_arduino_communicator(self, arduinoCommunicator):
+        self.components["arduino"] = arduinoCommunicator
+
+
+class TestComponentSetup(unittest.TestCase):
+    def get_parser(self):
+        parser = ConfigParser()
+        parser.read(os.path.join(os.path.dirname(__file__), "config.ini"))
+        parser["Components.enabled"]["ArduinoCommunicator"] = "false"
+
+        return parser
+
+    def test_spec_sent_to_worker_gives_same_config(self):
+        parser = self.get_parser()
+
+        componentSpec = pickle.loads(pickle.dumps(ComponentSpec(parser)))
+        workerParser = componentSpec.get_parser()
+
+        self.assertEqual(parser.sections(), workerParser.sections())
+        self.assertEqual(37, workerParser["Servo.handling.specs.horizontal"].getint("ServoPin"))
+
+    def test_enabled_components_are_read_from_spec(self):
+        parser = self.get_parser()
+        parser["Components.enabled"]["ServoHorizontal"] = "false"
+
+        enabledComponents = ComponentSpec(parser).get_enabled_components()
+
+        self.assertEqual({"car", "servo", "camera"}, enabledComponents)
+
+    def test_max_camera_resolution_comes_from_governor_ladder(self):
+        parser = self.get_parser()
+        self.assertEqual((384, 288), ComponentSpec(parser).get_max_camera_resolution())
+
+        parser["Camera.governor"]["Enabled"] = "true"
+        self.assertEqual((640, 480), ComponentSpec(parser).get_max_camera_resolution())
+
+    def test_worker_only_builds_its_own_components(self):
+        carControl = FakeCarControl()
+
+        add_hardware_components(carControl, self.get_parser(), "camera")
+
+        self.assertEqual(["camera"], list(carControl.components))
+
+    def test_control_worker_builds_car_servos_and_camera_helper(self):
+        carControl = FakeCarControl()
+
+        add_hardware_components(carControl, self.get_parser(), "control")
+
+        self.assertEqual({"car", "servos", "cameraHelper"}, set(carControl.components))
+        self.assertEqual(2, len(carControl.components["servos"]))
+
+    def test_frame_consumer_with_obstacle_score_is_given_to_arduino_communicator(self):
+        class FakeObstacleDetector:
+            providesObstacleScore = True
+
+        class FakeVideoRecorder:
+            pass
+
+        carControl = FakeCarControl()
+        arduinoCommunicator = MagicMock()
+        obstacleDetector = FakeObstacleDetector()
+
+        add_components(carControl, self.get_parser(), {"arduino communicator": arduinoCommunicator},
+                       [FakeVideoRecorder(), obstacleDetector])
+
+        arduinoCommunicator.add_obstacle_detector.assert_called_once_with(obstacleDetector)
+
+    def test_components_are_set_up_at_the_same_time(self):
+        # both setups have to be waiting at the barrier at once, or it times out
+        barrier = Barrier(2, timeout=5)
+
+        def setup_at_barrier(parser, *args):
+            barrier.wait()
+            return "component"
+
+        with patch("componentSetup.setup_car", setup_at_barrier), \
+                patch("componentSetup.setup_camera", setup_at_barrier):
+            components = setup_hardware_components(self.get_parser())
+
+        self.assertEqual("component", components["car"])
+        self.assertEqual("component", components["camera"])
+
+    def test_disabled_components_are_not_imported(self):
+        parser = self.get_parser()
+        for componentName in parser["Components.enabled"]:
+            parser["Components.enabled"][componentName] = "false"
+
+        with patch.dict("sys.modules"):
+            for moduleName in ("carHandling", "servoHandling", "camera", "arduinoCommunicator"):
+                sys.modules.pop(moduleName, None)
+
+            add_hardware_components(FakeCarControl(), parser)
+
+            for moduleName in ("carHandling", "servoHandling", "camera", "arduinoCommunicator"):
+                self.assertNotIn(moduleName, sys.modules)
+
+    def test_startup_profiler_is_only_made_when_enabled(self):
+        parser = self.get_parser()
+        self.assertIsNone(setup_startup_profiler(parser))
+
+        parser["Startup.profile"]["Enabled"] = "true"
+        self.assertIsNotNone(setup_startup_profiler(parser, "camera worker"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from multiprocessing import Process
+from threading import Thread
+from time import sleep
+
+from controlState import ControlState
+
+def write_matching_values(controlState, numberOfWrites):
+    for value in range(numberOfWrites):
+        controlState.write({"speed": value, "turn": value, "Zoom": value})
+
+class TestControlState(unittest.TestCase):
+    def test_read_returns_initial_values(self):
+        controlState = ControlState({"speed": 0.0, "HUD": 1.0, "Zoom": 1.0})
+
+        version, controlValues = controlState.read()
+
+        self.assertEqual(0, version)
+        self.assertEqual({"speed": 0.0, "HUD": 1.0, "Zoom": 1.0}, controlValues)
+        self.assertEqual(["speed", "HUD", "Zoom"], controlState.get_fields())
+
+    def test_write_changes_only_given_values_and_version(self):
+        controlState = ControlState({"speed": 0.0, "HUD": 1.0, "Zoom": 1.0})
+
+        controlState.write({"speed": 40.0, "Zoom": 2.5})
+        version, controlValues = controlState.read()
+
+        self.assertEqual(2, version)
+        self.assertEqual({"speed": 40.0, "HUD": 1.0, "Zoom": 2.5}, controlValues)
+
+    def test_read_changes_returns_fields_written_after_version(self):
+        controlState = ControlState({"speed": 0.0, "HUD": 1.0, "Zoom": 1.0})
+
+        controlState.write({"speed": 40.0})
+        firstVersion = controlState.get_version()
+        controlState.write({"Zoom": 2.5})
+
+        self.assertEqual((4, {"speed": 40.0, "HUD": 1.0, "Zoom": 2.5}), controlState.read_changes(-1))
+        self.assertEqual((4, {"speed": 40.0, "Zoom": 2.5}), controlState.read_changes(0))
+        self.assertEqual((4, {"Zoom": 2.5}), controlState.read_changes(firstVersion))
+        self.assertEqual((4, {}), controlState.read_changes(4))
+
+    def test_unknown_field_raises_error(self):
+        controlState = ControlState({"speed": 0.0})
+
+        with self.assertRaises(KeyError):
+            controlState.write({"servo": 1.0})
+
+    def test_read_waits_for_write_in_progress(self):
+        controlState = ControlState({"speed": 0.0})
+
+        # pretend that a writer has started a write, and let it finish a little later
+        controlState._version.value = 1
+
+        def finish_write():
+            sleep(0.05)
+            controlState._values[0] = 50.0
+            controlState._version.value = 2
+
+        writer = Thread(target=finish_write)
+        writer.start()
+
+        version, controlValues = controlState.read()
+        writer.join()
+
+        self.assertEqual(2, version)
+        self.assertEqual(50.0, controlValues["speed"])
+        self.assertGreater(controlState.get_read_retries(), 0)
+
+    def test_reads_from_other_process_are_never_torn(self):
+        controlState = ControlState({"speed": 0.0, "turn": 0.0, "Zoom": 0.0})
+        numberOfWrites = 20000
+
+        writer = Process(target=write_matching_values, args=(controlState, numberOfWrites))
+        writer.start()
+
+        # every write sets all values to the same number, so a mix of two writes is easy to spot
+        while writer.is_alive():
+            version, controlValues = controlState.read()
+            self.assertEqual(1, len(set(controlValues.values())), controlValues)
+
+        writer.join()
+
+        version, controlValues = controlState.read()
+        self.assertEqual(2 * numberOfWrites, version)
+        self.assertEqual(numberOfWrites - 1, controlValues["speed"])
+
+if __name__ == '__main__':
+    unittest.main()
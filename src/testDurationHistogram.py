@@ -0,0 +1,62 @@
+import unittest
+from multiprocessing import Process, Queue
+
+from durationHistogram import DurationHistogram
+
+def read_count_in_other_process(histogram, queue):
+    queue.put(histogram.get_statistics()["count"])
+
+class TestDurationHistogram(unittest.TestCase):
+    def test_statistics_of_recorded_durations(self):
+        histogram = DurationHistogram()
+
+        for duration in [0.010, 0.030]:
+            histogram.record(duration)
+
+        statistics = histogram.get_statistics()
+
+        self.assertEqual(2, statistics["count"])
+        self.assertAlmostEqual(0.020, statistics["mean"])
+        self.assertAlmostEqual(0.010, statistics["jitter"])
+        self.assertAlmostEqual(0.030, statistics["max"])
+
+    def test_percentiles_are_upper_limit_of_bucket(self):
+        histogram = DurationHistogram()
+
+        for i in range(9):
+            histogram.record(0.0001)
+        histogram.record(0.01)
+
+        statistics = histogram.get_statistics((("p50", 0.5), ("p90", 0.9), ("p99", 0.99)))
+
+        # 100 us falls in the bucket up to 128 us, 10 ms in the bucket up to 16384 us
+        self.assertAlmostEqual(0.000128, statistics["p50"])
+        self.assertAlmostEqual(0.000128, statistics["p90"])
+        self.assertAlmostEqual(0.016384, statistics["p99"])
+
+    def test_durations_longer_than_the_last_bucket_are_counted_in_it(self):
+        histogram = DurationHistogram(numberOfBuckets=4)
+
+        histogram.record(10.0)
+
+        self.assertAlmostEqual(8 / 1e6, histogram.get_statistics()["p99"])
+
+    def test_empty_histogram_has_zero_statistics(self):
+        statistics = DurationHistogram().get_statistics()
+
+        self.assertEqual({"count": 0, "mean": 0.0, "jitter": 0.0, "max": 0.0, "p50": 0.0, "p99": 0.0}, statistics)
+
+    def test_statistics_can_be_read_from_other_process(self):
+        histogram = DurationHistogram()
+        queue = Queue()
+
+        histogram.record(0.001)
+        process = Process(target=read_count_in_other_process, args=(histogram, queue))
+        process.start()
+        count = queue.get(timeout=5)
+        process.join()
+
+        self.assertEqual(1, count)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from threading import Event
+from time import sleep
+from frameGrabber import FrameGrabber
+
+class FakeCamera:
+    def __init__(self):
+        self.frameNumber = 0
+        self.allowCapture = Event()
+
+    def capture_array(self):
+        self.allowCapture.wait()
+        self.frameNumber += 1
+        sleep(0.001)
+        return self.frameNumber
+
+class TestFrameGrabber(unittest.TestCase):
+    def setUp(self):
+        self.camera = FakeCamera()
+        self.grabber = FrameGrabber(self.camera.capture_array)
+        self.grabber.start()
+
+    def tearDown(self):
+        self.camera.allowCapture.set()
+        self.grabber.stop()
+
+    def test_returns_none_when_no_frame_is_captured_before_timeout(self):
+        self.assertIsNone(self.grabber.get_latest_frame(timeout=0.01))
+
+    def test_returns_latest_frame_and_counts_dropped_frames(self):
+        self.camera.allowCapture.set()
+        sleep(0.05)
+        self.camera.allowCapture.clear()
+        sleep(0.01) # let the frame being captured finish
+
+        frame = self.grabber.get_latest_frame(timeout=1)
+
+        # the newest frame is returned and all the frames before it are counted as dropped
+        self.assertEqual(self.grabber.get_captured_frames(), frame)
+        self.assertEqual(frame - 1, self.grabber.get_dropped_frames())
+
+    def test_same_frame_is_not_returned_twice(self):
+        self.camera.allowCapture.set()
+        sleep(0.01)
+        self.camera.allowCapture.clear()
+        sleep(0.01)
+
+        self.grabber.get_latest_frame(timeout=1)
+
+        self.assertIsNone(self.grabber.get_latest_frame(timeout=0.01))
+
+    def test_capture_error_is_raised_when_taking_frame(self):
+        def capture_with_error():
+            raise RuntimeError("camera disconnected")
+
+        grabber = FrameGrabber(capture_with_error)
+        grabber.start()
+        self.addCleanup(grabber.stop)
+
+        # the error comes right away, and not after the timeout
+        with self.assertRaises(RuntimeError):
+            grabber.get_latest_frame(timeout=5)
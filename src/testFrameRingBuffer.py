@@ -0,0 +1,147 @@
+import unittest
+from multiprocessing import Process, Queue, Event
+from threading import Timer
+from time import time
+import numpy as np
+import numpy.testing as npt
+
+from frameRingBuffer import FrameRingBuffer, FrameRingReader
+
+def read_frame_in_other_process(frameRingInfo, queue):
+    reader = FrameRingReader(*frameRingInfo)
+    sequence, timestamp, image = reader.wait_for_latest_frame(timeout=5)
+    queue.put((sequence, timestamp, int(image.sum())))
+    reader.cleanup()
+
+class TestFrameRingBuffer(unittest.TestCase):
+    frameShape = (4, 6, 3)
+
+    def setUp(self):
+        self.ring = FrameRingBuffer(self.frameShape, 3)
+        self.reader = FrameRingReader(*self.ring.get_attach_info())
+
+    def tearDown(self):
+        self.reader.cleanup()
+        self.ring.cleanup()
+
+    def get_frame(self, value):
+        return np.full(self.frameShape, value, dtype=np.uint8)
+
+    def test_read_returns_none_before_any_frame_is_written(self):
+        self.assertIsNone(self.reader.read_latest_frame())
+
+    def test_read_returns_written_frame_with_sequence_and_timestamp(self):
+        self.ring.write(self.get_frame(7), 12.5)
+
+        sequence, timestamp, image = self.reader.read_latest_frame()
+
+        self.assertEqual(1, sequence)
+        self.assertEqual(12.5, timestamp)
+        npt.assert_array_equal(self.get_frame(7), image)
+
+    def test_same_frame_is_not_returned_twice(self):
+        self.ring.write(self.get_frame(1))
+
+        self.reader.read_latest_frame()
+
+        self.assertIsNone(self.reader.read_latest_frame())
+
+    def test_slow_reader_gets_latest_frame_and_counts_skipped_frames(self):
+        self.ring.write(self.get_frame(1))
+        self.reader.read_latest_frame()
+
+        # write more frames than there are slots in the ring
+        for value in range(2, 7):
+            self.ring.write(self.get_frame(value))
+
+        sequence, timestamp, image = self.reader.read_latest_frame()
+
+        self.assertEqual(6, sequence)
+        npt.assert_array_equal(self.get_frame(6), image)
+        self.assertEqual(4, self.reader.get_skipped_frames())
+
+    def test_frame_is_invalid_after_writer_laps_the_slot(self):
+        self.ring.write(self.get_frame(1))
+        sequence, timestamp, image = self.reader.read_latest_frame()
+
+        self.assertTrue(self.reader.is_frame_still_valid(sequence))
+
+        for value in range(3):
+            self.ring.write(self.get_frame(value))
+
+        self.assertFalse(self.reader.is_frame_still_valid(sequence))
+
+    def test_copied_frame_is_kept_when_writer_laps_the_slot(self):
+        self.ring.write(self.get_frame(1))
+        sequence, timestamp, image = self.reader.read_latest_frame()
+
+        frameCopy = self.reader.copy_frame(sequence, image)
+        for value in range(3):
+            self.ring.write(self.get_frame(value + 2))
+
+        npt.assert_array_equal(self.get_frame(1), frameCopy)
+        self.assertEqual(0, self.reader.get_torn_frames())
+
+    def test_frame_overwritten_before_it_is_copied_is_dropped(self):
+        self.ring.write(self.get_frame(1))
+        sequence, timestamp, image = self.reader.read_latest_frame()
+
+        for value in range(3):
+            self.ring.write(self.get_frame(value + 2))
+
+        self.assertIsNone(self.reader.copy_frame(sequence, image))
+        self.assertEqual(1, self.reader.get_torn_frames())
+
+    def test_wait_returns_none_on_timeout(self):
+        self.assertIsNone(self.reader.wait_for_latest_frame(timeout=0.01))
+
+    def test_stop_event_ends_wait_without_new_frame(self):
+        stopEvent = Event()
+
+        # the writer stops and wakes up the reader instead of writing a new frame
+        def stop_writer():
+            stopEvent.set()
+            self.ring.wake_readers()
+
+        Timer(0.05, stop_writer).start()
+
+        startTime = time()
+        frame = self.reader.wait_for_latest_frame(timeout=5, stopEvent=stopEvent)
+
+        self.assertIsNone(frame)
+        self.assertLess(time() - startTime, 1)
+
+    def test_frame_can_be_read_from_other_process(self):
+        queue = Queue()
+        process = Process(target=read_frame_in_other_process, args=(self.ring.get_attach_info(), queue))
+        process.start()
+
+        self.ring.write(self.get_frame(2), 3.0)
+
+        sequence, timestamp, pixelSum = queue.get(timeout=5)
+        process.join()
+
+        self.assertEqual(1, sequence)
+        self.assertEqual(3.0, timestamp)
+        self.assertEqual(2 * 4 * 6 * 3, pixelSum)
+
+    def test_ring_sent_to_spawned_worker_writes_to_same_shared_memory(self):
+        state = self.ring.__getstate__()
+        self.assertNotIn("_frames", state)
+
+        ringCopy = FrameRingBuffer.__new__(FrameRingBuffer)
+        ringCopy.__setstate__(state)
+        ringCopy.write(self.get_frame(5), 2.0)
+
+        sequence, timestamp, image = self.reader.read_latest_frame()
+
+        self.assertEqual(1, sequence)
+        npt.assert_array_equal(self.get_frame(5), image)
+
+    def test_smaller_frame_is_read_back_with_its_own_shape(self):
+        smallFrame = np.arange(2 * 3 * 3, dtype=np.uint8).reshape((2, 3, 3))
+        self.ring.write(smallFrame)
+
+        sequence, timestamp, image = self.reader.read_latest_frame()
+
+        npt.assert_array_equal(smallFrame, image)
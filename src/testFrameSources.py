@@ -0,0 +1,99 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import numpy as np
+
+# mock the import of picam2 and cv2
+MockPicam2 = MagicMock()
+MockLibCam = MagicMock()
+MockCv2 = MagicMock()
+modules = {
+    "picamera2": MockPicam2,
+    "libcamera": MockLibCam,
+    "cv2": MockCv2
+}
+patcher = patch.dict("sys.modules", modules)
+patcher.start()
+
+from frameSources import Picamera2Source, VideoFileSource, SyntheticSource, FrameSourceError
+
+class TestSyntheticSource(unittest.TestCase):
+    def test_frames_have_requested_resolution(self):
+        source = SyntheticSource()
+        source.open((160, 120))
+
+        self.assertEqual((120, 160, 3), source.capture().shape)
+
+        source.reconfigure((80, 60))
+
+        self.assertEqual((60, 80, 3), source.capture().shape)
+
+    def test_every_capture_returns_a_new_array(self):
+        source = SyntheticSource(numberOfFrames=1)
+        source.open((16, 12))
+
+        firstFrame = source.capture()
+        firstFrame[:] = 0
+
+        self.assertTrue(source.capture().any())
+
+    def test_frames_change_over_time(self):
+        source = SyntheticSource(numberOfFrames=4)
+        source.open((64, 48))
+
+        self.assertFalse(np.array_equal(source.capture(), source.capture()))
+
+    @patch("frameSources.sleep")
+    @patch("frameSources.time")
+    def test_frame_rate_is_kept(self, mock_time, mock_sleep):
+        mock_time.side_effect = [1.0, 1.01, 1.1]
+
+        source = SyntheticSource(frameRate=20)
+        source.open((16, 12))
+        source.capture()
+        source.capture()
+
+        mock_sleep.assert_called_once()
+        self.assertAlmostEqual(0.04, mock_sleep.call_args.args[0])
+
+@patch("frameSources.cv2")
+class TestVideoFileSource(unittest.TestCase):
+    def test_raises_error_when_file_can_not_be_opened(self, mock_cv2):
+        mock_cv2.VideoCapture.return_value.isOpened.return_value = False
+
+        with self.assertRaises(FrameSourceError):
+            VideoFileSource("missing.mp4").open((320, 240))
+
+    def test_starts_over_at_end_of_file(self, mock_cv2):
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        mockVideoCapture = mock_cv2.VideoCapture.return_value
+        mockVideoCapture.read.side_effect = [(False, None), (True, frame)]
+
+        source = VideoFileSource("drive.mp4")
+        source.open((320, 240))
+
+        self.assertIs(frame, source.capture())
+        mockVideoCapture.set.assert_called_once_with(mock_cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def test_frames_are_resized_to_resolution(self, mock_cv2):
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        mock_cv2.VideoCapture.return_value.read.return_value = (True, frame)
+
+        source = VideoFileSource("drive.mp4")
+        source.open((320, 240))
+        source.capture()
+
+        mock_cv2.resize.assert_called_once_with(frame, (320, 240))
+
+@patch("frameSources.Picamera2")
+class TestPicamera2Source(unittest.TestCase):
+    def test_reconfigure_restarts_camera_with_new_resolution(self, mock_picam):
+        mockPiCamInstance = mock_picam.return_value
+
+        source = Picamera2Source()
+        source.open((640, 480))
+        source.reconfigure((320, 240), 20)
+
+        mockPiCamInstance.stop.assert_called_once()
+        calledArgs, calledKwargs = mockPiCamInstance.create_preview_configuration.call_args
+        self.assertEqual((320, 240), calledArgs[0]["size"])
+        self.assertEqual({"FrameRate": 20}, calledKwargs["controls"])
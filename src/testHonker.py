@@ -169,5 +169,93 @@ class TestHonker(unittest.TestCase):
         # check that honk is turned off now that it's outside the treshold
         mock_gpioOutput.assert_called_with(self.buzzerPin, False)
 
+    @patch("RPi.GPIO.output")
+    def test_honker_turns_off_beep_when_no_sensor_has_a_reading(self, mock_gpioOutput, mock_gpioSetup):
+        honker = Honker(self.buzzerPin)
+        honker.setup()
+
+        honker.set_distance_treshold(15)
+
+        honker.prepare_for_honking([None, 10])
+        honker.alert_if_too_close()
+        mock_gpioOutput.assert_called_with(self.buzzerPin, True)
+
+        # every reading is missing, like when the arduino doesn't answer
+        honker.prepare_for_honking([None, None])
+        honker.alert_if_too_close()
+
+        mock_gpioOutput.assert_called_with(self.buzzerPin, False)
+        self.assertIsNone(honker.get_time_until_next_honk_change())
+
+    @patch("RPi.GPIO.output")
+    def test_honker_honks_when_obstacle_score_is_high(self, mock_gpioOutput, mock_gpioSetup):
+        honker = Honker(self.buzzerPin)
+        honker.setup()
+
+        honker.set_distance_treshold(15)
+        honker.set_obstacle_score_treshold(0.5)
+
+        # the sensors are outside the treshold, but the camera sees an obstacle
+        distances = [30, None]
+        honker.prepare_for_honking(distances, 0.9)
+        honker.alert_if_too_close()
+
+        mock_gpioOutput.assert_called_once_with(self.buzzerPin, True)
+
+    @patch("RPi.GPIO.output")
+    def test_honker_ignores_low_or_missing_obstacle_score(self, mock_gpioOutput, mock_gpioSetup):
+        honker = Honker(self.buzzerPin)
+        honker.setup()
+
+        honker.set_distance_treshold(15)
+        honker.set_obstacle_score_treshold(0.5)
+
+        distances = [30, None]
+        honker.prepare_for_honking(distances, 0.3)
+        honker.alert_if_too_close()
+
+        honker.prepare_for_honking(distances, None)
+        honker.alert_if_too_close()
+
+        mock_gpioOutput.assert_called_with(self.buzzerPin, False)
+        self.assertEqual(mock_gpioOutput.call_count, 2)
+
+    @patch("RPi.GPIO.output")
+    def test_highest_obstacle_score_gives_shortest_beep(self, mock_gpioOutput, mock_gpioSetup):
+        honker = Honker(self.buzzerPin)
+        honker.setup()
+
+        honker.set_distance_treshold(10)
+        honker.set_obstacle_score_treshold(0.5)
+        honker.set_long_beep_time(0.4)
+        honker.set_short_beep_time(0.01)
+
+        # a score of 1 is as close as an obstacle can get
+        honker.prepare_for_honking([None, None], 1.0)
+
+        self.assertAlmostEqual(honker._currentTimeBetweenEachHonk, 0.01, places=2)
+
+    @patch("honker.time")
+    def test_time_until_next_honk_change(self, mock_time, mock_gpioSetup):
+        honker = Honker(self.buzzerPin)
+        honker.set_distance_treshold(10)
+        honker.set_long_beep_time(0.4)
+        honker.set_short_beep_time(0.01)
+
+        # nothing to wait for when there is no obstacle
+        honker.prepare_for_honking([20, None])
+        self.assertIsNone(honker.get_time_until_next_honk_change())
+
+        # an obstacle at 5 cm gives 0.21 seconds between each change of the buzzer
+        mock_time.return_value = 1.0
+        honker.prepare_for_honking([5, None])
+        self.assertEqual(0.0, honker.get_time_until_next_honk_change())
+
+        with patch("RPi.GPIO.output"):
+            honker.alert_if_too_close()
+
+        mock_time.return_value = 1.1
+        self.assertAlmostEqual(0.11, honker.get_time_until_next_honk_change())
+
 if __name__ == '__main__':
     unittest.main()
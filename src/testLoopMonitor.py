@@ -0,0 +1,94 @@
+import unittest
+from unittest.mock import patch
+from multiprocessing import Process
+
+from loopMonitor import LoopMonitor
+
+def run_cycles(loopMonitor, cycleTimes):
+    with patch("loopMonitor.monotonic") as mock_monotonic:
+        currentTime = 100.0
+        for cycleTime in cycleTimes:
+            mock_monotonic.side_effect = [currentTime, currentTime + cycleTime]
+            loopMonitor.start_cycle()
+            loopMonitor.end_cycle()
+            currentTime += 1.0
+
+@patch("loopMonitor.monotonic")
+class TestLoopMonitor(unittest.TestCase):
+    def test_cycles_and_deadline_misses_are_counted(self, mock_monotonic):
+        loopMonitor = LoopMonitor("Control", 0.02)
+
+        # two cycles within the deadline and one over
+        mock_monotonic.side_effect = [1.0, 1.005, 2.0, 2.010, 3.0, 3.050]
+        for _ in range(3):
+            loopMonitor.start_cycle()
+            loopMonitor.end_cycle()
+
+        statistics = loopMonitor.get_statistics()
+
+        self.assertEqual(3, statistics["cycles"])
+        self.assertEqual(1, statistics["misses"])
+        self.assertAlmostEqual(0.05, statistics["max"])
+        self.assertAlmostEqual(0.065 / 3, statistics["mean"])
+        self.assertGreater(statistics["jitter"], 0.0)
+
+    def test_end_cycle_without_start_is_ignored(self, mock_monotonic):
+        loopMonitor = LoopMonitor("Control", 0.02)
+
+        loopMonitor.end_cycle()
+
+        self.assertEqual(0, loopMonitor.get_statistics()["cycles"])
+
+    def test_waiting_loop_is_not_overdue(self, mock_monotonic):
+        loopMonitor = LoopMonitor("Control", 0.02)
+
+        mock_monotonic.side_effect = [1.0, 1.5]
+        loopMonitor.start_cycle()
+        loopMonitor.end_cycle()
+
+        # the last cycle missed the deadline, but the loop is waiting for the next cycle now
+        self.assertEqual(0.0, loopMonitor.get_overdue_time(10.0))
+
+    def test_stuck_cycle_is_overdue(self, mock_monotonic):
+        loopMonitor = LoopMonitor("Control", 0.02)
+
+        mock_monotonic.side_effect = [1.0]
+        loopMonitor.start_cycle()
+
+        self.assertEqual(0.0, loopMonitor.get_overdue_time(1.01))
+        self.assertAlmostEqual(0.5, loopMonitor.get_overdue_time(1.5))
+
+    def test_overdue_time_includes_missed_cycles_in_a_row(self, mock_monotonic):
+        loopMonitor = LoopMonitor("Control", 0.02)
+
+        # two cycles in a row miss the deadline, and the third is still running
+        mock_monotonic.side_effect = [1.0, 1.1, 1.1, 1.2, 1.2]
+        for _ in range(2):
+            loopMonitor.start_cycle()
+            loopMonitor.end_cycle()
+        loopMonitor.start_cycle()
+
+        self.assertAlmostEqual(0.3, loopMonitor.get_overdue_time(1.3))
+
+        # a cycle within the deadline ends the streak
+        mock_monotonic.side_effect = [1.21, 1.4]
+        loopMonitor.end_cycle()
+        loopMonitor.start_cycle()
+
+        self.assertAlmostEqual(0.1, loopMonitor.get_overdue_time(1.5))
+
+    def test_statistics_can_be_read_from_other_process(self, mock_monotonic):
+        loopMonitor = LoopMonitor("Arduino", 0.05)
+
+        process = Process(target=run_cycles, args=(loopMonitor, [0.01, 0.02, 0.1]))
+        process.start()
+        process.join()
+
+        statistics = loopMonitor.get_statistics()
+
+        self.assertEqual(3, statistics["cycles"])
+        self.assertEqual(1, statistics["misses"])
+        self.assertIn("Arduino loop: 3 cycles, 1 over 50 ms", loopMonitor.get_report())
+
+if __name__ == '__main__':
+    unittest.main()
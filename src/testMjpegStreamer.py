@@ -0,0 +1,108 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from http.client import HTTPConnection
+from time import sleep, time
+import numpy as np
+
+# mock the import of cv2
+MockCv2 = MagicMock()
+modules = {
+    "cv2": MockCv2
+}
+patcher = patch.dict("sys.modules", modules)
+patcher.start()
+
+from mjpegStreamer import MjpegStreamer
+
+def get_synthetic_frame(value):
+    return np.full((288, 384, 3), value, dtype=np.uint8)
+
+def fake_imencode(extension, frame, parameters):
+    # use the pixel value of the frame as the jpeg content, so the test can tell the frames apart
+    return True, np.frombuffer(b"jpeg" + bytes([frame[0, 0, 0]]), dtype=np.uint8)
+
+@patch("mjpegStreamer.cv2")
+class TestMjpegStreamer(unittest.TestCase):
+    def setUp(self):
+        self.streamer = MjpegStreamer(0, host="127.0.0.1")
+        self.streamer.start()
+        self.connections = []
+
+    def tearDown(self):
+        for connection in self.connections:
+            connection.close()
+        self.streamer.stop()
+
+    def connect_client(self):
+        connection = HTTPConnection("127.0.0.1", self.streamer.get_port(), timeout=5)
+        connection.request("GET", "/")
+        self.connections.append(connection)
+
+        return connection.getresponse()
+
+    def wait_for_clients(self, count):
+        startTime = time()
+        while self.streamer.get_client_count() != count and time() - startTime < 5:
+            sleep(0.01)
+
+    def read_jpeg(self, response):
+        self.assertEqual(b"--frame\r\n", response.readline())
+        self.assertEqual(b"Content-Type: image/jpeg\r\n", response.readline())
+        length = int(response.readline().split(b":")[1])
+        response.readline()
+
+        jpeg = response.read(length)
+        response.readline()
+
+        return jpeg
+
+    def test_frames_are_not_encoded_without_clients(self, mock_cv2):
+        self.streamer.publish(get_synthetic_frame(1))
+
+        mock_cv2.imencode.assert_not_called()
+
+    def test_unknown_path_is_not_found(self, mock_cv2):
+        connection = HTTPConnection("127.0.0.1", self.streamer.get_port(), timeout=5)
+        connection.request("GET", "/other")
+        self.connections.append(connection)
+
+        self.assertEqual(404, connection.getresponse().status)
+
+    def test_every_client_gets_the_same_frames_encoded_once(self, mock_cv2):
+        mock_cv2.imencode.side_effect = fake_imencode
+
+        firstResponse = self.connect_client()
+        secondResponse = self.connect_client()
+        self.wait_for_clients(2)
+
+        self.assertEqual("multipart/x-mixed-replace; boundary=frame", firstResponse.getheader("Content-Type"))
+
+        self.streamer.publish(get_synthetic_frame(1))
+        self.assertEqual(b"jpeg\x01", self.read_jpeg(firstResponse))
+        self.assertEqual(b"jpeg\x01", self.read_jpeg(secondResponse))
+
+        self.streamer.publish(get_synthetic_frame(2))
+        self.assertEqual(b"jpeg\x02", self.read_jpeg(firstResponse))
+        self.assertEqual(b"jpeg\x02", self.read_jpeg(secondResponse))
+
+        self.assertEqual(2, mock_cv2.imencode.call_count)
+
+    def test_client_count_drops_when_client_disconnects(self, mock_cv2):
+        mock_cv2.imencode.side_effect = fake_imencode
+
+        response = self.connect_client()
+        self.wait_for_clients(1)
+
+        self.streamer.publish(get_synthetic_frame(1))
+        self.read_jpeg(response)
+
+        self.connections.pop().close()
+        response.close()
+
+        # the handler only notices the closed connection when it writes the next frame
+        startTime = time()
+        while self.streamer.get_client_count() and time() - startTime < 5:
+            self.streamer.publish(get_synthetic_frame(2))
+            sleep(0.01)
+
+        self.assertEqual(0, self.streamer.get_client_count())
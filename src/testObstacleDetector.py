@@ -0,0 +1,95 @@
+import unittest
+from unittest.mock import patch
+import numpy as np
+
+from obstacleDetector import ObstacleDetector
+
+def get_empty_floor(shape=(240, 320, 3)):
+    # a smooth gradient, like an evenly lit floor
+    rows = np.linspace(60, 120, shape[0], dtype=np.uint8)
+    return np.repeat(rows[:, np.newaxis, np.newaxis], shape[1], axis=1).repeat(shape[2], axis=2)
+
+def get_floor_with_obstacle(shape=(240, 320, 3)):
+    # a checkered box standing on the floor in front of the car
+    image = get_empty_floor(shape)
+    height, width = shape[:2]
+    blockRows = (np.arange(height) // 16) % 2
+    blockColumns = (np.arange(width) // 16) % 2
+    checkers = ((blockRows[:, np.newaxis] ^ blockColumns[np.newaxis, :]) * 255).astype(np.uint8)
+    image[height // 2:, width // 4:3 * width // 4] = checkers[height // 2:, width // 4:3 * width // 4, np.newaxis]
+
+    return image
+
+class TestObstacleDetector(unittest.TestCase):
+    def test_empty_floor_gives_low_score(self):
+        detector = ObstacleDetector()
+        detector.setup()
+
+        self.assertEqual(0.0, detector.calculate_obstacle_score(get_empty_floor()))
+
+    def test_obstacle_gives_high_score(self):
+        detector = ObstacleDetector()
+        detector.setup()
+
+        self.assertGreater(detector.calculate_obstacle_score(get_floor_with_obstacle()), 0.8)
+
+    def test_obstacle_above_floor_region_is_ignored(self):
+        detector = ObstacleDetector(floorRegion=0.4)
+        detector.setup()
+
+        # the obstacle is moved to the top of the frame, far away from the car
+        image = np.flipud(get_floor_with_obstacle()).copy()
+
+        self.assertEqual(0.0, detector.calculate_obstacle_score(image))
+
+    @patch("obstacleDetector.time")
+    def test_score_is_smoothed_and_shared(self, mock_time):
+        mock_time.return_value = 10.0
+
+        detector = ObstacleDetector(maxRate=10)
+        detector.setup()
+
+        detector.handle_frame(get_floor_with_obstacle(), 9.8)
+        firstScore = detector.get_obstacle_score()
+
+        detector.handle_frame(get_floor_with_obstacle(), 9.95)
+        secondScore = detector.get_obstacle_score()
+
+        # a single frame only moves the score part of the way, so one bad frame can't set off the buzzer
+        self.assertGreater(firstScore, 0.0)
+        self.assertLess(firstScore, 0.5)
+        self.assertGreater(secondScore, firstScore)
+
+    @patch("obstacleDetector.time")
+    def test_frames_faster_than_max_rate_are_skipped(self, mock_time):
+        mock_time.return_value = 10.0
+
+        detector = ObstacleDetector(maxRate=10)
+        detector.setup()
+
+        detector.handle_frame(get_floor_with_obstacle(), 9.9)
+        score = detector.get_obstacle_score()
+
+        # 50 ms later is faster than 10 detections per second
+        detector.handle_frame(get_floor_with_obstacle(), 9.95)
+
+        self.assertEqual(score, detector.get_obstacle_score())
+        self.assertEqual(1, detector._detections)
+
+    @patch("obstacleDetector.time")
+    def test_outdated_score_is_not_used(self, mock_time):
+        detector = ObstacleDetector(maxScoreAge=1.0)
+        detector.setup()
+
+        mock_time.return_value = 5.0
+        detector.handle_frame(get_floor_with_obstacle(), 5.0)
+
+        mock_time.return_value = 5.5
+        self.assertIsNotNone(detector.get_obstacle_score())
+
+        # the detector has not seen a frame for more than a second
+        mock_time.return_value = 6.5
+        self.assertIsNone(detector.get_obstacle_score())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import patch
+from multiprocessing import Process, Queue
+from pipelineProfiler import PipelineProfiler
+
+def read_statistics_in_other_process(profiler, queue):
+    queue.put((profiler.get_stage_statistics()["zoom"]["count"], profiler.get_frame_counts()))
+
+@patch("pipelineProfiler.perf_counter")
+class TestPipelineProfiler(unittest.TestCase):
+    def run_frame(self, profiler, mock_perf_counter, captureTime, zoomTime):
+        mock_perf_counter.side_effect = [0, captureTime, captureTime + zoomTime, captureTime + zoomTime]
+
+        profiler.start_frame()
+        profiler.mark("capture")
+        profiler.mark("zoom")
+        profiler.end_frame()
+
+    def test_stage_durations_are_recorded(self, mock_perf_counter):
+        profiler = PipelineProfiler(["capture", "zoom"], 0.1)
+
+        self.run_frame(profiler, mock_perf_counter, 0.010, 0.002)
+        self.run_frame(profiler, mock_perf_counter, 0.030, 0.002)
+
+        statistics = profiler.get_stage_statistics()
+
+        self.assertEqual(2, statistics["capture"]["count"])
+        self.assertAlmostEqual(0.020, statistics["capture"]["mean"])
+        self.assertAlmostEqual(0.030, statistics["capture"]["max"])
+        self.assertAlmostEqual(0.032, statistics["total"]["max"])
+
+    def test_percentiles_are_upper_limit_of_bucket(self, mock_perf_counter):
+        profiler = PipelineProfiler(["capture", "zoom"], 0.1)
+
+        for i in range(9):
+            self.run_frame(profiler, mock_perf_counter, 0.0001, 0.001)
+        self.run_frame(profiler, mock_perf_counter, 0.01, 0.001)
+
+        statistics = profiler.get_stage_statistics()["capture"]
+
+        # 100 us falls in the bucket up to 128 us, 10 ms in the bucket up to 16384 us
+        self.assertAlmostEqual(0.000128, statistics["p50"])
+        self.assertAlmostEqual(0.016384, statistics["p99"])
+
+    def test_late_and_dropped_frames_are_counted(self, mock_perf_counter):
+        profiler = PipelineProfiler(["capture", "zoom"], 0.02)
+
+        self.run_frame(profiler, mock_perf_counter, 0.010, 0.002)
+        self.run_frame(profiler, mock_perf_counter, 0.030, 0.002)
+        profiler.set_dropped_frames(3)
+
+        self.assertEqual({"frames": 2, "late": 1, "dropped": 3}, profiler.get_frame_counts())
+
+    def test_report_lists_stages_that_were_recorded(self, mock_perf_counter):
+        profiler = PipelineProfiler(["capture", "zoom", "hud"], 0.02)
+
+        self.run_frame(profiler, mock_perf_counter, 0.010, 0.002)
+
+        report = profiler.get_report()
+
+        self.assertIn("capture", report)
+        self.assertIn("total", report)
+        self.assertNotIn("hud", report)
+
+    def test_statistics_can_be_read_from_other_process(self, mock_perf_counter):
+        profiler = PipelineProfiler(["capture", "zoom"], 0.02)
+        queue = Queue()
+
+        self.run_frame(profiler, mock_perf_counter, 0.010, 0.002)
+        process = Process(target=read_statistics_in_other_process, args=(profiler, queue))
+        process.start()
+        zoomCount, frameCounts = queue.get(timeout=5)
+        process.join()
+
+        self.assertEqual(1, zoomCount)
+        self.assertEqual(1, frameCounts["frames"])
@@ -0,0 +1,87 @@
+import unittest
+from unittest.mock import patch
+import os
+
+from processTuning import ProcessTuning
+
+def raise_permission_error(*args):
+    raise PermissionError(1, "Operation not permitted")
+
+@patch("processTuning.os.cpu_count", return_value=4)
+class TestProcessTuning(unittest.TestCase):
+    def test_unknown_scheduler_raises_error(self, mock_cpu_count):
+        with self.assertRaises(ValueError):
+            ProcessTuning(scheduler="deadline")
+
+    @patch("processTuning.os.sched_setaffinity")
+    def test_affinity_is_set_to_given_cores(self, mock_setaffinity, mock_cpu_count):
+        processTuning = ProcessTuning(cores=[1, 2])
+        processTuning.apply()
+
+        mock_setaffinity.assert_called_once_with(0, {1, 2})
+        self.assertEqual([], processTuning.get_warnings())
+
+    @patch("processTuning.os.sched_setaffinity")
+    def test_missing_cores_are_left_out(self, mock_setaffinity, mock_cpu_count):
+        processTuning = ProcessTuning(cores=[3, 6])
+        processTuning.apply()
+
+        mock_setaffinity.assert_called_once_with(0, {3})
+        self.assertEqual(1, len(processTuning.get_warnings()))
+
+    @patch("processTuning.os.sched_setaffinity")
+    def test_affinity_is_unchanged_if_no_cores_exist(self, mock_setaffinity, mock_cpu_count):
+        processTuning = ProcessTuning(cores=[6, 7])
+        processTuning.apply()
+
+        mock_setaffinity.assert_not_called()
+        self.assertEqual(1, len(processTuning.get_warnings()))
+
+    @patch("processTuning.os.sched_setscheduler")
+    def test_fifo_scheduler_is_set_with_priority(self, mock_setscheduler, mock_cpu_count):
+        processTuning = ProcessTuning(scheduler="fifo", priority=10)
+        processTuning.apply()
+
+        policy, param = mock_setscheduler.call_args.args[1:]
+        self.assertEqual(os.SCHED_FIFO, policy)
+        self.assertEqual(10, param.sched_priority)
+
+    @patch("processTuning.os.sched_setscheduler")
+    def test_priority_is_limited_to_range_of_policy(self, mock_setscheduler, mock_cpu_count):
+        processTuning = ProcessTuning(scheduler="fifo", priority=500)
+        processTuning.apply()
+
+        param = mock_setscheduler.call_args.args[2]
+        self.assertEqual(os.sched_get_priority_max(os.SCHED_FIFO), param.sched_priority)
+
+    @patch("processTuning.os.setpriority", side_effect=raise_permission_error)
+    @patch("processTuning.os.sched_setscheduler", side_effect=raise_permission_error)
+    @patch("processTuning.os.sched_setaffinity", side_effect=raise_permission_error)
+    def test_settings_that_are_not_allowed_give_warnings(self, mock_setaffinity, mock_setscheduler,
+                                                         mock_setpriority, mock_cpu_count):
+        processTuning = ProcessTuning(cores=[1], scheduler="fifo", priority=10, niceness=-5)
+        processTuning.apply()
+
+        # every setting was tried, even though the ones before it failed
+        mock_setaffinity.assert_called_once()
+        mock_setscheduler.assert_called_once()
+        mock_setpriority.assert_called_once_with(os.PRIO_PROCESS, 0, -5)
+
+        warnings = processTuning.get_warnings()
+        self.assertEqual(3, len(warnings))
+        self.assertIn("SCHED_FIFO", warnings[1])
+
+    @patch("processTuning.os.sched_setaffinity")
+    def test_report_shows_effective_settings_and_warnings(self, mock_setaffinity, mock_cpu_count):
+        processTuning = ProcessTuning(cores=[1, 9])
+        processTuning.apply()
+
+        report = processTuning.get_report("Control")
+
+        self.assertTrue(report.startswith(f"Control process {os.getpid()}: cores "))
+        self.assertIn("priority", report)
+        self.assertIn("nice", report)
+        self.assertIn("cores [9] don't exist", report)
+
+if __name__ == '__main__':
+    unittest.main()
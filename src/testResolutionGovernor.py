@@ -0,0 +1,65 @@
+import unittest
+from resolutionGovernor import ResolutionGovernor
+
+class TestResolutionGovernor(unittest.TestCase):
+    ladder = [((640, 480), 30), ((384, 288), 30), ((320, 240), 20)]
+
+    def get_governor(self):
+        return ResolutionGovernor(self.ladder, downgradeTime=3, upgradeTime=10, headroom=1.2)
+
+    def test_start_resolution_is_found_in_ladder(self):
+        governor = self.get_governor()
+        governor.set_start_resolution((384, 288))
+
+        self.assertEqual((384, 288), governor.get_resolution())
+        self.assertEqual(30, governor.get_frame_rate())
+
+    def test_unknown_start_resolution_starts_at_top_of_ladder(self):
+        governor = self.get_governor()
+        governor.set_start_resolution((1080, 720))
+
+        self.assertEqual((640, 480), governor.get_resolution())
+
+    def test_max_resolution(self):
+        self.assertEqual((640, 480), self.get_governor().get_max_resolution())
+
+    def test_steps_down_when_below_target_for_too_long(self):
+        governor = self.get_governor()
+
+        self.assertFalse(governor.update(20, 25, 0))
+        self.assertFalse(governor.update(20, 25, 2.9))
+        self.assertTrue(governor.update(20, 25, 3))
+
+        self.assertEqual((384, 288), governor.get_resolution())
+
+    def test_short_dip_below_target_does_not_step_down(self):
+        governor = self.get_governor()
+
+        governor.update(20, 25, 0)
+        governor.update(30, 25, 2) # back on target, so the timer is reset
+
+        self.assertFalse(governor.update(20, 25, 3))
+        self.assertEqual((640, 480), governor.get_resolution())
+
+    def test_does_not_step_below_lowest_resolution(self):
+        governor = self.get_governor()
+        governor.set_start_resolution((320, 240))
+
+        governor.update(5, 5, 0)
+
+        self.assertFalse(governor.update(5, 5, 10))
+        self.assertEqual((320, 240), governor.get_resolution())
+
+    def test_steps_up_when_there_is_headroom_for_long_enough(self):
+        governor = self.get_governor()
+        governor.set_start_resolution((384, 288))
+
+        # processing at 90 FPS at 384x288 is about 32 FPS at 640x480, which is not enough headroom
+        self.assertFalse(governor.update(30, 90, 0))
+        self.assertFalse(governor.update(30, 90, 20))
+
+        # processing at 120 FPS is about 43 FPS at 640x480
+        self.assertFalse(governor.update(30, 120, 21))
+        self.assertTrue(governor.update(30, 120, 31))
+
+        self.assertEqual((640, 480), governor.get_resolution())
@@ -26,6 +26,15 @@ class TestServoHandling(unittest.TestCase):
         mock_pi.set_mode.assert_called_once_with(self.servoPin, pigpio.OUTPUT)
         mock_pi.set_PWM_frequency.assert_called_once_with(self.servoPin, 50)
 
+    def test_pigpio_is_connected_once_when_first_servo_is_set_up(self, mock_pi):
+        ServoHandling.pigpioPwm = None
+        MockPigpio.pi.reset_mock()
+
+        ServoHandling(self.servoPin, "horizontal").setup()
+        ServoHandling(27, "vertical").setup()
+
+        MockPigpio.pi.assert_called_once()
+
     def test_handle_xbox_input_calls_pulsewidth(self, mock_pi):
         servo = ServoHandling(self.servoPin, "vertical")
 
@@ -0,0 +1,87 @@
+import unittest
+import builtins
+import os
+import sys
+import tempfile
+from time import monotonic
+
+from startupProfiler import StartupProfiler, measure_startup
+
+class TestStartupProfiler(unittest.TestCase):
+    def setUp(self):
+        # a module that imports another one, neither of which has been imported before
+        self.moduleFolder = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.moduleFolder.name, "profiledParent.py"), "w") as parentFile:
+            parentFile.write("import profiledChild\n")
+        with open(os.path.join(self.moduleFolder.name, "profiledChild.py"), "w") as childFile:
+            childFile.write("value = 1\n")
+
+        sys.path.insert(0, self.moduleFolder.name)
+
+    def tearDown(self):
+        sys.path.remove(self.moduleFolder.name)
+        for moduleName in ("profiledParent", "profiledChild"):
+            sys.modules.pop(moduleName, None)
+        self.moduleFolder.cleanup()
+
+    def test_nested_imports_are_reported_under_their_parent(self):
+        profiler = StartupProfiler(minImportTime=0)
+
+        profiler.start_import_timing()
+        import profiledParent
+        profiler.stop_import_timing()
+
+        report = profiler.get_report().splitlines()
+        parentLine = next(line for line in report if line.endswith("ms  profiledParent"))
+        childLine = next(line for line in report if line.endswith("ms    profiledChild"))
+
+        self.assertLess(report.index(parentLine), report.index(childLine))
+
+    def test_modules_that_are_already_imported_are_not_reported(self):
+        import profiledParent
+        profiler = StartupProfiler(minImportTime=0)
+
+        profiler.start_import_timing()
+        import profiledParent
+        profiler.stop_import_timing()
+
+        self.assertNotIn("profiledParent", profiler.get_report())
+
+    def test_imports_deeper_than_import_depth_are_left_out(self):
+        profiler = StartupProfiler(minImportTime=0, importDepth=1)
+
+        profiler.start_import_timing()
+        import profiledParent
+        profiler.stop_import_timing()
+
+        self.assertIn("profiledParent", profiler.get_report())
+        self.assertNotIn("profiledChild", profiler.get_report())
+
+    def test_stop_puts_back_original_import(self):
+        originalImport = builtins.__import__
+        profiler = StartupProfiler()
+
+        profiler.start_import_timing()
+        self.assertIsNot(originalImport, builtins.__import__)
+        profiler.stop_import_timing()
+
+        self.assertIs(originalImport, builtins.__import__)
+
+    def test_component_setup_and_ready_time_are_reported(self):
+        profiler = StartupProfiler()
+
+        with measure_startup(profiler, "camera"):
+            pass
+        profiler.add_event("control worker ready", monotonic() + 0.5)
+
+        report = profiler.get_report()
+
+        self.assertIn("ms  camera", report)
+        self.assertRegex(report, r"(49\d|50\d)\.\d ms  control worker ready")
+
+    def test_measure_does_nothing_without_profiler(self):
+        with measure_startup(None, "camera"):
+            pass
+
+if __name__ == '__main__':
+    unittest.main()
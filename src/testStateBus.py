@@ -0,0 +1,168 @@
+import unittest
+from multiprocessing import Process, Event
+from threading import Thread
+from time import sleep, monotonic
+
+from stateBus import StateBus
+
+def publish_speeds(stateBus, numberOfPublishes):
+    for speed in range(1, numberOfPublishes + 1):
+        stateBus.publish({"speed": float(speed), "turn": 0.0})
+
+def wait_for_changes_forever(stateBus, isWaiting):
+    stateSubscriber = stateBus.subscribe()
+    stateSubscriber.get_changes()
+    isWaiting.set()
+    stateSubscriber.wait_for_changes()
+
+class TestStateBus(unittest.TestCase):
+    def test_first_changes_are_all_fields(self):
+        stateBus = StateBus({"speed": 0.0, "HUD": 1.0})
+        stateSubscriber = stateBus.subscribe()
+
+        self.assertEqual({"speed": 0.0, "HUD": 1.0}, stateSubscriber.get_changes())
+        self.assertEqual({}, stateSubscriber.get_changes())
+
+    def test_publish_writes_only_changed_fields(self):
+        stateBus = StateBus({"speed": 0.0, "turn": 0.0, "HUD": 1.0})
+        stateSubscriber = stateBus.subscribe()
+        stateSubscriber.get_changes()
+
+        self.assertTrue(stateBus.publish({"speed": 40.0, "turn": 0.0, "HUD": 1.0}))
+
+        self.assertEqual({"speed": 40.0}, stateSubscriber.get_changes())
+
+    def test_publish_without_changes_writes_nothing(self):
+        stateBus = StateBus({"speed": 0.0, "HUD": 1.0})
+        stateSubscriber = stateBus.subscribe()
+        stateSubscriber.get_changes()
+
+        self.assertFalse(stateBus.publish({"speed": 0.0, "HUD": 1.0}))
+
+        self.assertEqual(0, stateBus.get_version())
+        self.assertFalse(stateSubscriber.has_changes())
+        self.assertEqual((0, 1), stateBus.get_publish_counts())
+
+    def test_subscribers_keep_track_of_their_own_changes(self):
+        stateBus = StateBus({"speed": 0.0, "turn": 0.0})
+        firstSubscriber = stateBus.subscribe()
+        secondSubscriber = stateBus.subscribe()
+        firstSubscriber.get_changes()
+        secondSubscriber.get_changes()
+
+        stateBus.publish({"speed": 40.0})
+        self.assertEqual({"speed": 40.0}, firstSubscriber.get_changes())
+
+        stateBus.publish({"turn": 2.0})
+
+        # the second subscriber missed the first publish, so it gets both changes
+        self.assertEqual({"turn": 2.0}, firstSubscriber.get_changes())
+        self.assertEqual({"speed": 40.0, "turn": 2.0}, secondSubscriber.get_changes())
+
+    def test_wait_for_changes_wakes_up_on_publish(self):
+        stateBus = StateBus({"speed": 0.0})
+        stateSubscriber = stateBus.subscribe()
+        stateSubscriber.get_changes()
+
+        publisher = Thread(target=lambda: (sleep(0.1), stateBus.publish({"speed": 40.0})))
+        publisher.start()
+
+        startTime = monotonic()
+        changes = stateSubscriber.wait_for_changes(timeout=5.0)
+        publisher.join()
+
+        self.assertEqual({"speed": 40.0}, changes)
+        self.assertLess(monotonic() - startTime, 2.0)
+
+    def test_wait_for_changes_times_out_without_changes(self):
+        stateBus = StateBus({"speed": 0.0})
+        stateSubscriber = stateBus.subscribe()
+        stateSubscriber.get_changes()
+
+        self.assertEqual({}, stateSubscriber.wait_for_changes(timeout=0.05))
+
+    def test_wait_for_changes_wakes_up_on_stop_event(self):
+        stateBus = StateBus({"speed": 0.0})
+        stateSubscriber = stateBus.subscribe()
+        stateSubscriber.get_changes()
+        stopEvent = Event()
+
+        def stop():
+            sleep(0.1)
+            stopEvent.set()
+            stateBus.wake_subscribers()
+
+        stopper = Thread(target=stop)
+        stopper.start()
+
+        startTime = monotonic()
+        changes = stateSubscriber.wait_for_changes(timeout=5.0, stopEvent=stopEvent)
+        stopper.join()
+
+        self.assertEqual({}, changes)
+        self.assertLess(monotonic() - startTime, 2.0)
+
+    def test_subscriber_in_other_process_sees_last_value(self):
+        stateBus = StateBus({"speed": 0.0, "turn": 0.0})
+        stateSubscriber = stateBus.subscribe()
+        stateSubscriber.get_changes()
+
+        publisher = Process(target=publish_speeds, args=(stateBus, 200))
+        publisher.start()
+
+        lastSpeed = 0.0
+        while publisher.is_alive() or stateSubscriber.has_changes():
+            changes = stateSubscriber.wait_for_changes(timeout=0.1)
+
+            # the turn is never changed, so it is never sent to the subscriber
+            self.assertNotIn("turn", changes)
+            lastSpeed = changes.get("speed", lastSpeed)
+
+        publisher.join()
+
+        self.assertEqual(200.0, lastSpeed)
+
+    def test_restarted_publisher_publishes_change_back_to_initial_value(self):
+        stateBus = StateBus({"speed": 0.0, "turn": 0.0})
+
+        # the publisher that crashed had published a speed this process never saw
+        publisher = Process(target=publish_speeds, args=(stateBus, 1))
+        publisher.start()
+        publisher.join()
+
+        stateSubscriber = stateBus.subscribe()
+        stateSubscriber.get_changes()
+
+        stateBus.reset_published_values()
+
+        self.assertTrue(stateBus.publish({"speed": 0.0, "turn": 0.0}))
+        self.assertEqual({"speed": 0.0}, stateSubscriber.get_changes())
+
+    def test_publish_is_not_held_up_by_terminated_subscriber(self):
+        stateBus = StateBus({"speed": 0.0})
+        isWaiting = Event()
+
+        subscriber = Process(target=wait_for_changes_forever, args=(stateBus, isWaiting))
+        subscriber.start()
+        isWaiting.wait(5.0)
+        sleep(0.1) # let it start sleeping
+        subscriber.terminate()
+        subscriber.join()
+
+        publisher = Thread(target=publish_speeds, args=(stateBus, 3), daemon=True)
+        publisher.start()
+        publisher.join(2.0)
+
+        self.assertFalse(publisher.is_alive())
+
+        # the subscribers that are left still wake up on a publish
+        stateSubscriber = stateBus.subscribe()
+        stateSubscriber.get_changes()
+        Thread(target=lambda: sleep(0.05) or stateBus.publish({"speed": 10.0})).start()
+
+        startTime = monotonic()
+        self.assertEqual({"speed": 10.0}, stateSubscriber.wait_for_changes(timeout=5.0))
+        self.assertLess(monotonic() - startTime, 2.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import csv
+import os
+import tempfile
+
+from telemetryLogger import TelemetryLogger
+
+class TestTelemetryLogger(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def read_rows(self, logger):
+        with open(logger.get_log_path(), newline="") as logFile:
+            return list(csv.reader(logFile))
+
+    def test_setup_creates_log_with_header(self):
+        logger = TelemetryLogger(os.path.join(self.folder.name, "telemetry"))
+        logger.setup()
+        logger.cleanup()
+
+        self.assertEqual([["timestamp", "field", "value"]], self.read_rows(logger))
+
+    def test_each_changed_field_is_written_as_one_row(self):
+        logger = TelemetryLogger(self.folder.name)
+        logger.setup()
+
+        logger.handle_state_changes({"speed": 40.0, "turn": 1.0}, 10.0)
+        logger.handle_state_changes({"speed": 60.0}, 10.5)
+        logger.cleanup()
+
+        rows = self.read_rows(logger)
+
+        self.assertEqual(3, logger.get_written_rows())
+        self.assertEqual(["10.000", "speed", "40.0"], rows[1])
+        self.assertEqual(["10.000", "turn", "1.0"], rows[2])
+        self.assertEqual(["10.500", "speed", "60.0"], rows[3])
+
+    def test_rows_are_flushed_after_flush_interval(self):
+        logger = TelemetryLogger(self.folder.name, flushInterval=1.0)
+        logger.setup()
+
+        logger.handle_state_changes({"speed": 40.0}, 10.0)
+        logger.handle_state_changes({"speed": 50.0}, 10.5)
+
+        # only the first change has been flushed so far
+        self.assertEqual(2, len(self.read_rows(logger)))
+
+        logger.handle_state_changes({"speed": 60.0}, 11.0)
+
+        self.assertEqual(4, len(self.read_rows(logger)))
+
+        logger.cleanup()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import tempfile
+import numpy as np
+
+# mock the import of cv2
+MockCv2 = MagicMock()
+modules = {
+    "cv2": MockCv2
+}
+patcher = patch.dict("sys.modules", modules)
+patcher.start()
+
+from videoRecorder import VideoRecorder
+
+def get_frame(value, shape=(48, 64, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+@patch("videoRecorder.cv2")
+class TestVideoRecorder(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def get_queued_values(self, recorder):
+        values = []
+        while not recorder._frameQueue.empty():
+            image, timestamp = recorder._frameQueue.get_nowait()
+            values.append(int(image[0, 0, 0]))
+
+        return values
+
+    def test_unknown_drop_policy_raises_error(self, mock_cv2):
+        with self.assertRaises(ValueError):
+            VideoRecorder(self.folder.name, dropPolicy="random")
+
+    @patch("videoRecorder.Thread")
+    def test_drop_oldest_keeps_newest_frames(self, mock_thread, mock_cv2):
+        recorder = VideoRecorder(self.folder.name, queueSize=2, dropPolicy="oldest")
+        recorder.setup()
+
+        for value in range(4):
+            recorder.handle_frame(get_frame(value), value)
+
+        self.assertEqual([2, 3], self.get_queued_values(recorder))
+        self.assertEqual(2, recorder.get_statistics()["dropped"])
+
+    @patch("videoRecorder.Thread")
+    def test_drop_newest_keeps_oldest_frames(self, mock_thread, mock_cv2):
+        recorder = VideoRecorder(self.folder.name, queueSize=2, dropPolicy="newest")
+        recorder.setup()
+
+        for value in range(4):
+            recorder.handle_frame(get_frame(value), value)
+
+        self.assertEqual([0, 1], self.get_queued_values(recorder))
+        self.assertEqual(2, recorder.get_statistics()["dropped"])
+
+    @patch("videoRecorder.Thread")
+    def test_queued_frame_is_a_copy(self, mock_thread, mock_cv2):
+        recorder = VideoRecorder(self.folder.name)
+        recorder.setup()
+
+        image = get_frame(1)
+        recorder.handle_frame(image, 0)
+        image[:] = 9 # the camera overwrites the slot in the frame ring
+
+        self.assertEqual([1], self.get_queued_values(recorder))
+
+    def test_new_segment_is_started_after_segment_length(self, mock_cv2):
+        recorder = VideoRecorder(self.folder.name, segmentLength=10)
+        recorder.setup()
+
+        for timestamp in [100, 105, 109.9, 110, 115]:
+            recorder.handle_frame(get_frame(1), timestamp)
+        recorder.cleanup()
+
+        self.assertEqual(2, mock_cv2.VideoWriter.call_count)
+        self.assertEqual(5, mock_cv2.VideoWriter.return_value.write.call_count)
+        self.assertEqual(2, mock_cv2.VideoWriter.return_value.release.call_count)
+
+    def test_new_segment_is_started_when_resolution_changes(self, mock_cv2):
+        recorder = VideoRecorder(self.folder.name, segmentLength=10)
+        recorder.setup()
+
+        recorder.handle_frame(get_frame(1), 100)
+        recorder.handle_frame(get_frame(1, (24, 32, 3)), 101)
+        recorder.cleanup()
+
+        segmentSizes = [call.args[3] for call in mock_cv2.VideoWriter.call_args_list]
+        self.assertEqual([(64, 48), (32, 24)], segmentSizes)
+
+    def test_cleanup_writes_all_queued_frames(self, mock_cv2):
+        recorder = VideoRecorder(self.folder.name, queueSize=100)
+        recorder.setup()
+
+        for value in range(20):
+            recorder.handle_frame(get_frame(value), 100 + value / 30)
+        recorder.cleanup()
+
+        statistics = recorder.get_statistics()
+        self.assertEqual(20, statistics["written"])
+        self.assertEqual(0, statistics["dropped"])
+        self.assertEqual(1, statistics["segments"])
@@ -1,7 +1,7 @@
 import unittest
 import pygame
 from pygame.event import Event
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, call
 from xboxControl import XboxControl, NoControllerDetected
 
 class TestXboxControl(unittest.TestCase):
@@ -129,3 +129,127 @@ class TestXboxControl(unittest.TestCase):
         button, pressValue = xboxControl.get_button_and_press_value_from_event(eventButtonDown)
         exitCheck = xboxControl.check_for_exit_event(button)
         self.assertFalse(exitCheck)
+
+    @patch("pygame.event.get")
+    @patch("pygame.event.wait")
+    def test_wait_for_controller_events_returns_all_queued_events(self, mock_wait, mock_get):
+        firstEvent = Event(pygame.JOYBUTTONDOWN, {'joy': 0, 'instance_id': 0, 'button': 0})
+        secondEvent = Event(pygame.JOYBUTTONUP, {'joy': 0, 'instance_id': 0, 'button': 0})
+        mock_wait.return_value = firstEvent
+        mock_get.return_value = [secondEvent]
+
+        xboxControl = self.get_xbox_control()
+        events = xboxControl.wait_for_controller_events(timeout=0.5)
+
+        # the timeout is given to pygame in milliseconds
+        mock_wait.assert_called_once_with(500)
+        self.assertEqual([firstEvent, secondEvent], events)
+
+    @patch("pygame.event.get")
+    @patch("pygame.event.wait")
+    def test_wait_for_controller_events_returns_nothing_on_timeout(self, mock_wait, mock_get):
+        mock_wait.return_value = Event(pygame.NOEVENT)
+
+        xboxControl = self.get_xbox_control()
+        events = xboxControl.wait_for_controller_events(timeout=0.5)
+
+        self.assertEqual([], events)
+        mock_get.assert_not_called()
+
+    @patch("pygame.event.post")
+    def test_wake_up_posts_event_that_is_not_a_button(self, mock_post):
+        xboxControl = self.get_xbox_control()
+        xboxControl.wake_up()
+
+        wakeUpEvent = mock_post.call_args[0][0]
+        button, pressValue = xboxControl.get_button_and_press_value_from_event(wakeUpEvent)
+
+        self.assertIsNone(button)
+        self.assertFalse(xboxControl.check_for_exit_event(button))
+
+    def test_coalesce_axis_events_keeps_newest_value_of_each_axis(self):
+        triggerEvents = [Event(pygame.JOYAXISMOTION, {'joy': 0, 'instance_id': 0, 'axis': 4, 'value': value})
+                         for value in (0.1, 0.2, 0.3)]
+        stickEvent = Event(pygame.JOYAXISMOTION, {'joy': 0, 'instance_id': 0, 'axis': 2, 'value': 0.5})
+        buttonDown = Event(pygame.JOYBUTTONDOWN, {'joy': 0, 'instance_id': 0, 'button': 7})
+        buttonUp = Event(pygame.JOYBUTTONUP, {'joy': 0, 'instance_id': 0, 'button': 7})
+        hatEvent = Event(pygame.JOYHATMOTION, {'joy': 0, 'instance_id': 0, 'hat': 0, 'value': (-1, 0)})
+
+        events = [triggerEvents[0], buttonDown, stickEvent, triggerEvents[1], hatEvent, buttonUp, triggerEvents[2]]
+
+        xboxControl = self.get_xbox_control()
+        coalescedEvents = xboxControl.coalesce_axis_events(events)
+
+        # button and d-pad events keep their order, and only the newest trigger value is left
+        self.assertEqual([buttonDown, stickEvent, hatEvent, buttonUp, triggerEvents[2]], coalescedEvents)
+
+    def test_coalesce_axis_events_keeps_double_tap_of_exit_button(self):
+        startDown = Event(pygame.JOYBUTTONDOWN, {'joy': 0, 'instance_id': 0, 'button': 11})
+        startUp = Event(pygame.JOYBUTTONUP, {'joy': 0, 'instance_id': 0, 'button': 11})
+        triggerEvents = [Event(pygame.JOYAXISMOTION, {'joy': 0, 'instance_id': 0, 'axis': 4, 'value': value})
+                         for value in (0.1, 0.2)]
+
+        events = [startDown, triggerEvents[0], startUp, triggerEvents[1], startDown]
+
+        xboxControl = self.get_xbox_control()
+        exitDetected = False
+        for event in xboxControl.coalesce_axis_events(events):
+            button, pressValue = xboxControl.get_button_and_press_value_from_event(event)
+            exitDetected = exitDetected or xboxControl.check_for_exit_event(button)
+
+        self.assertTrue(exitDetected)
+
+    def test_dispatch_table_calls_handlers_with_press_values(self):
+        gasHandler = Mock()
+        hudHandler = Mock()
+        leftHandler = Mock()
+
+        xboxControl = self.get_xbox_control()
+        xboxControl.compile_dispatch_table({"RT": gasHandler, "RB": hudHandler, "D-PAD left": leftHandler})
+
+        events = [
+            Event(pygame.JOYAXISMOTION, {'joy': 0, 'instance_id': 0, 'axis': 4, 'value': 0.5}),
+            Event(pygame.JOYBUTTONDOWN, {'joy': 0, 'instance_id': 0, 'button': 7}),
+            Event(pygame.JOYBUTTONUP, {'joy': 0, 'instance_id': 0, 'button': 7}),
+            Event(pygame.JOYHATMOTION, {'joy': 0, 'instance_id': 0, 'hat': 0, 'value': (-1, 0)}),
+            Event(pygame.JOYHATMOTION, {'joy': 0, 'instance_id': 0, 'hat': 0, 'value': (0, 0)})
+        ]
+
+        for event in events:
+            self.assertTrue(xboxControl.dispatch_event(event))
+
+        gasHandler.assert_called_once_with(0.5)
+        hudHandler.assert_has_calls([call(1), call(0)])
+        leftHandler.assert_has_calls([call(1), call(0)])
+
+    def test_dispatch_table_ignores_events_without_handler(self):
+        xboxControl = self.get_xbox_control()
+        xboxControl.compile_dispatch_table({"RT": Mock()})
+
+        events = [
+            Event(pygame.JOYAXISMOTION, {'joy': 0, 'instance_id': 0, 'axis': 2, 'value': 0.5}),
+            Event(pygame.JOYBUTTONDOWN, {'joy': 0, 'instance_id': 0, 'button': 0}),
+            Event(pygame.JOYHATMOTION, {'joy': 0, 'instance_id': 0, 'hat': 0, 'value': (0, 0)}),
+            Event(pygame.USEREVENT)
+        ]
+
+        for event in events:
+            self.assertFalse(xboxControl.dispatch_event(event))
+
+    @patch("xboxControl.time", autospec=True)
+    def test_dispatch_table_detects_double_tap_of_exit_button(self, mock_time):
+        startDown = Event(pygame.JOYBUTTONDOWN, {'joy': 0, 'instance_id': 0, 'button': 11})
+
+        xboxControl = self.get_xbox_control()
+        xboxControl.compile_dispatch_table({})
+
+        mock_time.return_value = 1.0
+        xboxControl.dispatch_event(startDown)
+        self.assertFalse(xboxControl.is_exit_requested())
+
+        mock_time.return_value = 1.3
+        xboxControl.dispatch_event(startDown)
+        self.assertTrue(xboxControl.is_exit_requested())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import numpy as np
+import numpy.testing as npt
+
+# mock the import of cv2
+MockCv2 = MagicMock()
+modules = {
+    "cv2": MockCv2
+}
+patcher = patch.dict("sys.modules", modules)
+patcher.start()
+
+from zoomEngine import ZoomEngine
+
+@patch("zoomEngine.cv2")
+class TestZoomEngine(unittest.TestCase):
+    resolution = (384, 288)
+
+    def get_image(self):
+        width, height = self.resolution
+        return np.random.randint(0, 256, size=(height, width, 3), dtype=np.uint8)
+
+    def test_crop_bounds_are_centered(self, mock_cv2):
+        engine = ZoomEngine(self.resolution)
+
+        self.assertEqual((72, 216, 96, 288), engine.get_crop_bounds(2.0))
+        self.assertEqual((14, 274, 18, 366), engine.get_crop_bounds(1.1))
+
+    def test_integer_zoom_repeats_pixels(self, mock_cv2):
+        mock_cv2.resize.return_value = self.get_image()
+        image = self.get_image()
+
+        engine = ZoomEngine(self.resolution)
+        engine.zoom(image, 2.0)
+
+        calledArgs, calledKwargs = mock_cv2.resize.call_args
+        npt.assert_array_equal(image[72:216, 96:288], calledArgs[0])
+        self.assertEqual(self.resolution, calledArgs[1])
+        self.assertEqual(mock_cv2.INTER_NEAREST, calledKwargs["interpolation"])
+
+    def test_non_integer_zoom_interpolates(self, mock_cv2):
+        mock_cv2.resize.return_value = self.get_image()
+
+        engine = ZoomEngine(self.resolution)
+        engine.zoom(self.get_image(), 1.5)
+
+        calledArgs, calledKwargs = mock_cv2.resize.call_args
+        self.assertEqual(mock_cv2.INTER_LINEAR, calledKwargs["interpolation"])
+
+    def test_output_buffer_is_reused(self, mock_cv2):
+        outputBuffer = self.get_image()
+        mock_cv2.resize.return_value = outputBuffer
+
+        engine = ZoomEngine(self.resolution)
+        firstImage = engine.zoom(self.get_image(), 1.5)
+        secondImage = engine.zoom(self.get_image(), 2.5)
+
+        # the second call resizes into the buffer returned by the first call
+        calledArgs, calledKwargs = mock_cv2.resize.call_args
+        self.assertIs(outputBuffer, calledKwargs["dst"])
+        self.assertIs(firstImage, secondImage)
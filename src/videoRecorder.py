@@ -0,0 +1,140 @@
+import cv2
+import os
+from datetime import datetime
+from queue import Queue, Empty, Full
+from threading import Thread
+from time import time
+
+class VideoRecorder:
+    def __init__(self, folder, segmentLength=60, queueSize=30, dropPolicy="oldest", codec="MJPG", frameRate=30):
+        if dropPolicy not in ("oldest", "newest"):
+            raise ValueError(f"Unknown drop policy {dropPolicy}, use oldest or newest")
+
+        self._folder = folder
+        self._segmentLength = segmentLength
+        self._queueSize = queueSize
+        self._dropPolicy = dropPolicy
+        self._codec = codec
+        self._frameRate = frameRate
+
+        self._frameQueue = None
+        self._writerThread = None
+
+        self._videoWriter = None
+        self._segmentPath = None
+        self._segmentStartTime = None
+        self._segmentSize = None
+
+        self._receivedFrames = 0
+        self._droppedFrames = 0
+        self._writtenFrames = 0
+        self._writtenBytes = 0
+        self._segmentCount = 0
+        self._writeTime = 0.0
+
+    def setup(self):
+        os.makedirs(self._folder, exist_ok=True)
+
+        # frames are encoded in a separate thread, so a slow disk only fills up the queue
+        self._frameQueue = Queue(maxsize=self._queueSize)
+        self._writerThread = Thread(target=self._write_frames)
+        self._writerThread.start()
+
+    def handle_frame(self, image, timestamp):
+        self._receivedFrames += 1
+
+        # the image is a view into the camera's frame ring, so it has to be copied before it is queued
+        frame = (image.copy(), timestamp)
+
+        try:
+            self._frameQueue.put_nowait(frame)
+        except Full:
+            self._droppedFrames += 1
+            if self._dropPolicy == "oldest":
+                self._replace_oldest_frame(frame)
+
+    def cleanup(self):
+        # None tells the writer thread to finish the queued frames and stop
+        self._frameQueue.put(None)
+        self._writerThread.join()
+
+        print(self.get_report())
+
+    def get_statistics(self):
+        return {
+            "received": self._receivedFrames,
+            "written": self._writtenFrames,
+            "dropped": self._droppedFrames,
+            "segments": self._segmentCount,
+            "bytes": self._writtenBytes,
+            "writeTime": self._writeTime
+        }
+
+    def get_report(self):
+        statistics = self.get_statistics()
+        writeTime = max(statistics["writeTime"], 1e-9)
+
+        return (f"Recorder wrote {statistics['written']} of {statistics['received']} frames "
+                f"({statistics['dropped']} dropped) to {statistics['segments']} segments, "
+                f"{statistics['bytes'] / 1e6:.1f} MB at {statistics['written'] / writeTime:.1f} FPS "
+                f"and {statistics['bytes'] / 1e6 / writeTime:.2f} MB/s")
+
+    def _replace_oldest_frame(self, frame):
+        try:
+            self._frameQueue.get_nowait()
+        except Empty:
+            pass
+
+        try:
+            self._frameQueue.put_nowait(frame)
+        except Full:
+            pass # the queue filled up again in the meantime, so the new frame is dropped as well
+
+    def _write_frames(self):
+        while True:
+            frame = self._frameQueue.get()
+            if frame is None:
+                break
+
+            image, timestamp = frame
+
+            startTime = time()
+            self._write_frame(image, timestamp)
+            self._writeTime += time() - startTime
+
+        self._close_segment()
+
+    def _write_frame(self, image, timestamp):
+        frameSize = (image.shape[1], image.shape[0])
+
+        # start a new segment when the current one is long enough, or when the camera changed resolution
+        if not self._videoWriter or frameSize != self._segmentSize or \
+                timestamp - self._segmentStartTime >= self._segmentLength:
+            self._close_segment()
+            self._open_segment(frameSize, timestamp)
+
+        self._videoWriter.write(image)
+        self._writtenFrames += 1
+
+    def _open_segment(self, frameSize, timestamp):
+        self._segmentCount += 1
+
+        # the segment number keeps the names unique if two segments start within the same second
+        startTime = datetime.fromtimestamp(timestamp).strftime("%Y%m%d_%H%M%S")
+        fileName = f"drive_{startTime}_{self._segmentCount:03d}.avi"
+        self._segmentPath = os.path.join(self._folder, fileName)
+        self._segmentStartTime = timestamp
+        self._segmentSize = frameSize
+
+        fourcc = cv2.VideoWriter_fourcc(*self._codec)
+        self._videoWriter = cv2.VideoWriter(self._segmentPath, fourcc, self._frameRate, frameSize)
+
+    def _close_segment(self):
+        if not self._videoWriter:
+            return
+
+        self._videoWriter.release()
+        self._videoWriter = None
+
+        if os.path.exists(self._segmentPath):
+            self._writtenBytes += os.path.getsize(self._segmentPath)
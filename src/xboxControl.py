@@ -1,6 +1,8 @@
 import os
 os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide" # disable pygame welcome message
 import pygame
+from roboCarHelper import StartupError
+from functools import partial
 from time import time
 
 class XboxControl:
@@ -45,9 +47,57 @@ class XboxControl:
         self._exitButton = "Start"
         self._exitButtonLastPush = None # keeps track of last time exit button was pushed
 
+        self._wakeUpEventType = pygame.USEREVENT
+
+        # handlers for each axis, button and d-pad direction, keyed by the numbers in the pygame events
+        self._axisHandlers = {}
+        self._buttonDownHandlers = {}
+        self._buttonUpHandlers = {}
+        self._dpadHandlers = {}
+        self._dpadPressedDirection = 0
+        self._exitRequested = False
+
+        self._eventDispatchers = {
+            pygame.JOYAXISMOTION: self._dispatch_axis_event,
+            pygame.JOYBUTTONDOWN: self._dispatch_button_down_event,
+            pygame.JOYBUTTONUP: self._dispatch_button_up_event,
+            pygame.JOYHATMOTION: self._dispatch_hat_event
+        }
+
     def get_controller_events(self):
         return pygame.event.get()
 
+    def wait_for_controller_events(self, timeout):
+        # sleep until the controller sends an event, then take the rest of the queue as well
+        event = pygame.event.wait(int(timeout * 1000))
+        if event.type == pygame.NOEVENT:
+            return []
+
+        return [event] + pygame.event.get()
+
+    def coalesce_axis_events(self, events):
+        # only the newest value of each axis in a batch matters, so older axis events are
+        # left out, while button and d-pad events are all kept in their order
+        lastAxisEvents = {}
+        numberOfAxisEvents = 0
+        for index, event in enumerate(events):
+            if event.type == pygame.JOYAXISMOTION:
+                lastAxisEvents[event.axis] = index
+                numberOfAxisEvents += 1
+
+        # nothing to leave out when each axis moved at most once
+        if numberOfAxisEvents == len(lastAxisEvents):
+            return events
+
+        eventsToKeep = set(lastAxisEvents.values())
+
+        return [event for index, event in enumerate(events)
+                if event.type != pygame.JOYAXISMOTION or index in eventsToKeep]
+
+    def wake_up(self):
+        # posting an event is thread safe, so another thread can end a wait for controller events
+        pygame.event.post(pygame.event.Event(self._wakeUpEventType))
+
     def get_button_and_press_value_from_event(self, event):
         button = None
         buttonPressValue = None
@@ -66,19 +116,44 @@ class XboxControl:
 
         return button, buttonPressValue
 
+    def compile_dispatch_table(self, buttonHandlers):
+        # the button names are only used here, after this the events are dispatched
+        # by their event type and axis, button or hat number
+        self._axisHandlers = {}
+        for axis, button in self._joyAxisMotionToButtons.items():
+            if button in buttonHandlers:
+                self._axisHandlers[axis] = buttonHandlers[button]
+
+        self._buttonDownHandlers = {}
+        self._buttonUpHandlers = {}
+        for buttonNumber, button in self._pushButtons.items():
+            if button == self._exitButton:
+                self._buttonDownHandlers[buttonNumber] = self._handle_exit_button_push
+            elif button in buttonHandlers:
+                self._buttonDownHandlers[buttonNumber] = partial(buttonHandlers[button], 1)
+                self._buttonUpHandlers[buttonNumber] = partial(buttonHandlers[button], 0)
+
+        self._dpadHandlers = {}
+        for direction, button in self._joyHatMotionToButtons.items():
+            if button in buttonHandlers:
+                self._dpadHandlers[direction] = buttonHandlers[button]
+
+    def dispatch_event(self, event):
+        # returns True if the event was passed on to a handler
+        dispatcher = self._eventDispatchers.get(event.type)
+        if not dispatcher:
+            return False
+
+        return dispatcher(event)
+
+    def is_exit_requested(self):
+        return self._exitRequested
+
     def check_for_exit_event(self, button):
         if button == self._exitButton:
             # check if exit button has been pushed
             if self._pushButtonsStates[self._exitButton] == 1:
-
-                # check how long ago it was pushed
-                if self._exitButtonLastPush:
-                    if (time() - self._exitButtonLastPush) < 0.5:
-                        return True
-                    else:
-                        self._exitButtonLastPush = time()
-                else:
-                    self._exitButtonLastPush = time()
+                return self._check_for_double_tap_of_exit_button()
 
         return False
 
@@ -88,6 +163,60 @@ class XboxControl:
     def cleanup(self):
         pygame.quit()
 
+    def _check_for_double_tap_of_exit_button(self):
+        # check how long ago it was pushed
+        if self._exitButtonLastPush:
+            if (time() - self._exitButtonLastPush) < 0.5:
+                return True
+            else:
+                self._exitButtonLastPush = time()
+        else:
+            self._exitButtonLastPush = time()
+
+        return False
+
+    def _handle_exit_button_push(self):
+        self._exitRequested = self._check_for_double_tap_of_exit_button()
+
+    def _dispatch_axis_event(self, event):
+        handler = self._axisHandlers.get(event.axis)
+        if not handler:
+            return False
+
+        handler(event.value)
+        return True
+
+    def _dispatch_button_down_event(self, event):
+        handler = self._buttonDownHandlers.get(event.button)
+        if not handler:
+            return False
+
+        handler()
+        return True
+
+    def _dispatch_button_up_event(self, event):
+        handler = self._buttonUpHandlers.get(event.button)
+        if not handler:
+            return False
+
+        handler()
+        return True
+
+    def _dispatch_hat_event(self, event):
+        direction = event.value[0]
+        if direction in self._dpadHandlers:
+            self._dpadPressedDirection = direction
+            self._dpadHandlers[direction](1)
+        elif self._dpadPressedDirection:
+            # the d-pad was let go, so the direction that was pressed is released
+            handler = self._dpadHandlers[self._dpadPressedDirection]
+            self._dpadPressedDirection = 0
+            handler(0)
+        else:
+            return False
+
+        return True
+
     def _get_dpad_button(self, num):
         try:
             button = self._joyHatMotionToButtons[num]
@@ -128,5 +257,5 @@ class XboxControl:
 
         return controller
 
-class NoControllerDetected(Exception):
+class NoControllerDetected(StartupError):
     pass
\ No newline at end of file
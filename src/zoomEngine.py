@@ -0,0 +1,56 @@
+import cv2
+
+class ZoomEngine:
+    def __init__(self, resolution):
+        self._dispW, self._dispH = resolution
+        self._centerX = int(self._dispW / 2)
+        self._centerY = int(self._dispH / 2)
+
+        self._zoomLevels = {}
+        self._outputBuffer = None
+
+    def zoom(self, image, zoomValue):
+        zoomLevel = self._zoomLevels.get(zoomValue)
+        if not zoomLevel:
+            zoomLevel = self._prepare_zoom_level(zoomValue)
+            self._zoomLevels[zoomValue] = zoomLevel
+
+        (top, bottom, left, right), interpolation = zoomLevel
+        regionOfInterest = image[top:bottom, left:right]
+        outputSize = (self._dispW, self._dispH)
+
+        # resize into the same output buffer every frame instead of allocating a new one
+        if self._check_if_output_buffer_fits(image):
+            cv2.resize(regionOfInterest, outputSize, dst=self._outputBuffer, interpolation=interpolation)
+        else:
+            self._outputBuffer = cv2.resize(regionOfInterest, outputSize, interpolation=interpolation)
+
+        return self._outputBuffer
+
+    def get_crop_bounds(self, zoomValue):
+        halfZoomDisplayWidth = int(self._dispW / (2 * zoomValue))
+        halfZoomDisplayHeight = int(self._dispH / (2 * zoomValue))
+
+        return (self._centerY - halfZoomDisplayHeight, self._centerY + halfZoomDisplayHeight,
+                self._centerX - halfZoomDisplayWidth, self._centerX + halfZoomDisplayWidth)
+
+    def _prepare_zoom_level(self, zoomValue):
+        cropBounds = self.get_crop_bounds(zoomValue)
+        top, bottom, left, right = cropBounds
+
+        cropWidth = right - left
+        cropHeight = bottom - top
+
+        # when the zoom is an exact integer ratio every pixel is just repeated
+        if self._dispW % cropWidth == 0 and self._dispH % cropHeight == 0 and \
+                self._dispW // cropWidth == self._dispH // cropHeight:
+            return cropBounds, cv2.INTER_NEAREST
+
+        return cropBounds, cv2.INTER_LINEAR
+
+    def _check_if_output_buffer_fits(self, image):
+        if self._outputBuffer is None:
+            return False
+
+        shape = (self._dispH, self._dispW) + image.shape[2:]
+        return self._outputBuffer.shape == shape and self._outputBuffer.dtype == image.dtype